@@ -34,6 +34,8 @@ class InterviewSession(Base):
     resume_analysis = Column(JSON, nullable=True) # Detailed strengths/weaknesses
     tone_analysis = Column(JSON, nullable=True) # Confidence, hesitations, assertiveness
     transcript = Column(JSON, default=[]) # Stores the chat history
+    transcript_summary = Column(JSON, nullable=True) # {"text": "...", "turns_folded": 4} rolling summary of older turns (current round)
+    prompt_token_log = Column(JSON, default=[]) # Per-turn prompt size for question generation
     score = Column(Float, nullable=True) # Current round score
     feedback = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
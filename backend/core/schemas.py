@@ -17,11 +17,17 @@ class InterviewResponse(BaseModel):
     sub_role: str
     first_question: str
     company_intelligence: Optional[dict] = None
+    discovery_job_id: Optional[str] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class DiscoveryJobCreate(BaseModel):
+    company_name: str
+    job_description: Optional[str] = None
+    priority: int = 1  # 0 interactive, 1 background, 2 bulk
+
 class AnswerSubmit(BaseModel):
     interview_id: int
     answer: str
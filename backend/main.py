@@ -1,17 +1,29 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 from core import models, schemas, database
 from services.gemini_service import gemini_service
+from services.llm_json import LLMJSONError
+from services.llm_cache import get_llm_cache
+from services.llm_resilience import CircuitOpenError
 import pypdf
 import io
 import json
 import asyncio
+import time
 from datetime import datetime
 from auth import auth_utils
 from services.intelligence_service import get_intelligence_service
 from services.memory_service import get_memory_service
 from services.company_intelligence import get_company_intelligence
+from services.transcript_budget import get_transcript_budget
+from services.task_graph import TaskGraph
+from services.pregeneration_service import get_pregeneration_service
+from services.discovery_store import get_discovery_store
+from services.discovery_jobs import get_discovery_jobs, DiscoveryQueueFull, PRIORITY_INTERACTIVE, PRIORITY_BULK
+from services import metrics
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 import os
@@ -22,10 +34,17 @@ from contextlib import asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handles startup and shutdown events."""
     print("LOG: Application is booting up...")
-    # Temporarily back to Lazy Loading to resolve the 4GB VRAM overflow error
-    get_intelligence_service(eager_load=False)
+    # The local model loads in a background thread; requests never wait for it (see /health "local_model")
+    get_intelligence_service().start_model_warmup()
+    # Build the discovery memory index once, off the event loop, and fold the discovery logs periodically
+    discovery_store = get_discovery_store()
+    await asyncio.to_thread(discovery_store.refresh)
+    compaction_task = asyncio.create_task(discovery_store.run_compaction())
+    get_discovery_jobs().start()
     yield
     print("LOG: Application is shutting down...")
+    compaction_task.cancel()
+    await get_discovery_jobs().stop()
 
 app = FastAPI(
     title="Interview Prep AI Platform",
@@ -44,9 +63,48 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Route template (e.g. /interviews/start) keeps label cardinality bounded
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status
+        )
+
+# Scrape-time gauges
+metrics.DB_POOL_CONNECTIONS.set_function(lambda: metrics.pool_snapshot(database.engine))
+metrics.GEMINI_CONCURRENCY_LIMIT.set_function(lambda: gemini_service.resilience.limiter._capacity())
+metrics.GEMINI_IN_FLIGHT.set_function(lambda: gemini_service.resilience.limiter.in_flight)
+metrics.GEMINI_CIRCUIT_OPEN.set_function(lambda: int(gemini_service.resilience.breaker.state != "closed"))
+metrics.LLM_CACHE_REQUESTS.set_function(lambda: get_llm_cache().request_counts() if get_llm_cache() else {})
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request, exc: CircuitOpenError):
+    # Gemini is failing fast: tell the client when to come back instead of hanging
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "AI service is temporarily unavailable. Please try again shortly."},
+        headers={"Retry-After": str(int(exc.retry_after) + 1)}
+    )
+
 @app.get("/health")
 async def health():
-    return {"status": "ok", "version": "2.1.0"}
+    circuit = gemini_service.resilience.breaker.state
+    return {"status": "ok" if circuit == "closed" else "degraded", "version": "2.1.0", "gemini_circuit": circuit, "local_model": get_intelligence_service().model_status(), "discovery_jobs": get_discovery_jobs().stats(), "llm_cache": get_llm_cache().stats() if get_llm_cache() else {"enabled": False}}
 
 # --- AUTH ENDPOINTS ---
 @app.post("/auth/signup", response_model=schemas.Token)
@@ -125,35 +183,69 @@ async def get_company_suggestions(db: Session = Depends(database.get_db), curren
     except Exception as e:
         print(f"DEBUG: Failed to load curated companies: {e}")
     
-    # 2. Project Data Files
+    # 2. Discovery Memory (Gold discoveries + Stealth registry), served from the in-memory index
     try:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        data_dir = os.path.join(base_dir, "data")
-        
-        # Gold Discoveries (AI Scanned)
-        gold_path = os.path.join(data_dir, "discoveries.json")
-        if os.path.exists(gold_path):
-            with open(gold_path, 'r', encoding='utf-8') as f:
-                gold_data = json.load(f)
-                if isinstance(gold_data, list):
-                    for d in gold_data:
-                        name = d.get('company_name')
-                        if name: suggestions.add(name)
-        
-        # Stealth Registry (Internal Tracking)
-        stealth_path = os.path.join(data_dir, "stealth_registry.json")
-        if os.path.exists(stealth_path):
-            with open(stealth_path, 'r', encoding='utf-8') as f:
-                stealth_data = json.load(f)
-                if isinstance(stealth_data, dict):
-                    suggestions.update(stealth_data.keys())
-                    
+        suggestions.update(await get_discovery_store().all_names())
     except Exception as e:
         print(f"DEBUG: Failed to load data markers: {e}")
     
     # Clean and sort: remove empty strings, Nones, and specific placeholders
     final_list = sorted([s for s in suggestions if s and s.lower() not in ["none", "null", "undefined"]])
     return final_list
+# --- DISCOVERY JOB ENDPOINTS ---
+
+async def _company_intel_or_job(company: str, jd: str = None):
+    """(intel, None) for known companies; (None, job_id) while an unknown company is discovered in the background."""
+    if not company:
+        return None, None
+    try:
+        job = await get_discovery_jobs().submit(company, jd, priority=PRIORITY_INTERACTIVE)
+    except DiscoveryQueueFull as e:
+        print(f"WARNING: {e} Proceeding with industry defaults.")
+        return None, None
+    if job.status == "done":
+        return job.result, None
+    print(f"INFO: Discovery job {job.id} queued for {company}. Proceeding with industry defaults.")
+    return None, job.id
+
+async def _get_discovery_job(job_id: str, company: str = None):
+    # Any uvicorn worker can answer: jobs owned by another worker come from the shared table
+    job = await get_discovery_jobs().lookup(job_id, company)
+    if not job:
+        raise HTTPException(status_code=404, detail="Discovery job not found or expired")
+    return job
+
+@app.post("/discovery/jobs", status_code=202)
+async def submit_discovery_job(data: schemas.DiscoveryJobCreate, current_user: models.User = Depends(auth_utils.get_current_user)):
+    """Queues company discovery and returns immediately; known companies come back already `done`."""
+    try:
+        priority = min(max(data.priority, PRIORITY_INTERACTIVE), PRIORITY_BULK)
+        job = await get_discovery_jobs().submit(data.company_name, data.job_description, priority=priority)
+    except DiscoveryQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job.to_dict()
+
+@app.get("/discovery/jobs/{job_id}")
+async def get_discovery_job(job_id: str, company: str = None, current_user: models.User = Depends(auth_utils.get_current_user)):
+    """`company` lets an expired job still answer once its discovery has been saved."""
+    return await _get_discovery_job(job_id, company)
+
+@app.get("/discovery/jobs/{job_id}/events")
+async def stream_discovery_job(job_id: str, since: int = 0, current_user: models.User = Depends(auth_utils.get_current_user)):
+    """SSE progress per pipeline stage / LangGraph node; ends with a `done` or `failed` event carrying the job."""
+    await _get_discovery_job(job_id)
+
+    async def event_stream():
+        async for event in get_discovery_jobs().events(job_id, since):
+            if event["stage"] in ("done", "failed"):
+                yield _sse_event(event["stage"], await get_discovery_jobs().lookup(job_id))
+            else:
+                yield _sse_event("progress", event)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 # --- INTERVIEW ENDPOINTS ---
 
 @app.post("/interviews/upload-resume")
@@ -180,25 +272,22 @@ async def upload_resume(
     except Exception as e:
         raise HTTPException(status_code=400, detail="Could not read PDF file")
 
-    # 1. Start Foundation tasks (Intel and Analysis)
-    intel_service = get_intelligence_service()
-    intel_task = asyncio.create_task(intel_service.get_intelligence(target_company, job_description)) if target_company else None
+    # 1. Start Foundation tasks (Analysis; unknown companies become a background discovery job)
     analysis_task = asyncio.create_task(gemini_service.analyze_resume(resume_text, job_description))
+    company_intel, discovery_job_id = await _company_intel_or_job(target_company, job_description)
 
-    print(f"LOG: Parallel extraction started for {target_company or 'General Resume'}...")
-    
-    # Wait for the foundation data (up to 60s for deep discovery)
-    foundation_tasks = [analysis_task]
-    if intel_task:
-        foundation_tasks.append(intel_task)
-    
-    await asyncio.wait(foundation_tasks, timeout=60.0)
+    print(f"LOG: Resume analysis started for {target_company or 'General Resume'}...")
+    await asyncio.wait([analysis_task], timeout=60.0)
     
     # Extract results
-    analysis_raw = analysis_task.result() if analysis_task.done() and not analysis_task.exception() else "Analysis timed out."
-    company_intel = intel_task.result() if intel_task and intel_task.done() and not intel_task.exception() else None
+    if analysis_task.done() and not analysis_task.exception():
+        analysis_obj = analysis_task.result()
+    else:
+        if analysis_task.done():
+            print(f"WARNING: Resume analysis failed: {analysis_task.exception()}")
+        analysis_obj = {"error": "Resume analysis unavailable (timed out or invalid response)."}
     
-    # 2. Now generate the FIRST QUESTION using the intel we just got
+    # 2. Now generate the FIRST QUESTION using the intel we have (industry defaults while discovery runs)
     print("LOG: Generating first contextual question...")
     current_time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     first_question = await gemini_service.generate_interview_question(
@@ -215,12 +304,6 @@ async def upload_resume(
     )
 
     # 4. Save to DB
-    clean_analysis = analysis_raw.replace('```json', '').replace('```', '').strip()
-    try:
-        analysis_obj = json.loads(clean_analysis)
-    except:
-        analysis_obj = analysis_raw
-
     new_session = models.InterviewSession(
         user_id=current_user.id, 
         role_category=role_category,
@@ -239,32 +322,144 @@ async def upload_resume(
     db.add(new_session)
     db.commit()
     db.refresh(new_session)
+    _schedule_pregeneration(new_session)
 
     return {
         "id": new_session.id,
         "first_question": first_question,
-        "resume_analysis": analysis_raw,
-        "company_intelligence": company_intel
+        "resume_analysis": analysis_obj,
+        "company_intelligence": company_intel,
+        "discovery_job_id": discovery_job_id
     }
 
-@app.post("/interviews/submit-answer")
-async def submit_answer(
-    data: schemas.AnswerSubmit, 
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth_utils.get_current_user)
-):
-    from core.round_config import get_round_config, get_next_round, should_proceed_to_next_round
-    
-    # 1. Fetch current session
+def _stage_emitter(emit, stage: str):
+    """Adapts an SSE `emit(stage, text)` callback into a per-stage Gemini `on_chunk` callback."""
+    if emit is None:
+        return None
+
+    async def on_chunk(text: str):
+        await emit(stage, text)
+    return on_chunk
+
+def _sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+# Strong references to running stream flows: the event loop only keeps weak ones, and a flow
+# must outlive its generator when the client disconnects
+_sse_flows = set()
+
+async def _sse_stream(flow):
+    """
+    Runs `flow(emit)` in its own task and relays streamed tokens as Server-Sent Events.
+    The flow keeps running if the client disconnects, so the final state is always persisted.
+    """
+    queue = asyncio.Queue()
+
+    async def emit(stage: str, text: str):
+        await queue.put(("token", {"stage": stage, "text": text}))
+
+    async def runner():
+        try:
+            payload = await flow(emit)
+            await queue.put(("done", payload))
+        except HTTPException as e:
+            await queue.put(("error", {"status_code": e.status_code, "detail": e.detail}))
+        except CircuitOpenError as e:
+            await queue.put(("error", {"status_code": 503, "detail": "AI service is temporarily unavailable. Please try again shortly.", "retry_after": int(e.retry_after) + 1}))
+        except Exception as e:
+            print(f"ERROR: Streaming flow failed: {e}")
+            await queue.put(("error", {"status_code": 500, "detail": str(e)}))
+
+    task = asyncio.create_task(runner())
+    _sse_flows.add(task)
+    task.add_done_callback(_sse_flows.discard)
+    while True:
+        event, data = await queue.get()
+        yield _sse_event(event, data)
+        if event != "token":
+            break
+    await task
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def _get_owned_session(db: Session, interview_id: int, user_id: int) -> models.InterviewSession:
     session = db.query(models.InterviewSession).filter(
-        models.InterviewSession.id == data.interview_id,
-        models.InterviewSession.user_id == current_user.id
+        models.InterviewSession.id == interview_id,
+        models.InterviewSession.user_id == user_id
     ).first()
     if not session:
         raise HTTPException(status_code=404, detail="Interview not found or unauthorized")
+    return session
+
+def _schedule_pregeneration(session: models.InterviewSession):
+    """
+    Warms the per-session pre-generation slots for the NEXT submit while the candidate types:
+    the transcript-summary fold if the round continues, otherwise the company intel and
+    the next round's opening question.
+    """
+    from core.round_config import get_round_config, get_next_round
+
+    pregen = get_pregeneration_service()
+    if not pregen.enabled:
+        return
+
+    # Snapshot plain values; the ORM session is closed once the request ends
+    session_id = session.id
+    current_round = session.interview_round
+    transcript = list(session.transcript or [])
+    summary_state = session.transcript_summary
+    company = session.target_company
+    jd = session.job_description
+
+    if (session.questions_count or 0) + 1 < get_round_config(current_round)["min_questions"]:
+        # The next answer is always in the verbatim window, so the turns that age out are already known
+        async def fold_summary():
+            state, _ = await get_transcript_budget().compact(
+                transcript + [{"role": "user", "content": ""}],
+                summary_state,
+                gemini_service.summarize_transcript
+            )
+            return state
+        pregen.schedule(session_id, "summary", (current_round, len(transcript)), fold_summary)
+        return
+
+    # The next answer closes the round
+    if company:
+        pregen.schedule(session_id, "intel", (company, jd), lambda: get_discovery_jobs().intel_if_ready(company, jd))
+
+    next_round_name = get_next_round(current_round, session.role_category, session.difficulty_level)
+    if next_round_name:
+        question_kwargs = dict(
+            role=session.role_category,
+            sub_role=session.sub_role,
+            difficulty=session.difficulty_level,
+            company=company,
+            round_name=next_round_name,
+            jd=jd,
+            resume_text=session.resume_text,
+            chat_history=[],
+            current_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            interviewer_name=session.interviewer_name
+        )
+        pregen.schedule(
+            session_id, "opening_question", (current_round, next_round_name),
+            lambda: gemini_service.generate_interview_question(**question_kwargs)
+        )
+
+async def _run_submit_answer(session: models.InterviewSession, answer: str, db: Session, emit=None) -> dict:
+    """
+    Core of /interviews/submit-answer, shared by the JSON and the SSE endpoint.
+    When `emit` is given, question/evaluation/report tokens are streamed as they arrive.
+    """
+    from core.round_config import get_round_config, get_next_round, should_proceed_to_next_round
+
+    pregen = get_pregeneration_service()
+    summary_key = (session.interview_round, len(session.transcript))
 
     # 2. Update transcript with user's answer
-    session.transcript.append({"role": "user", "content": data.answer})
+    # (re-assign + flag so SQLAlchemy persists the JSON column change)
+    session.transcript = session.transcript + [{"role": "user", "content": answer}]
+    flag_modified(session, "transcript")
     session.questions_count += 1
     
     # 3. Get current round configuration by NAME (domain-aware)
@@ -275,7 +470,18 @@ async def submit_answer(
     # 4. Determine if we should continue or evaluate current round
     if session.questions_count < MIN_QUESTIONS:
         # Continue asking questions in current round - NO EVALUATION YET
+        # Token budget: last N turns verbatim, older turns folded into the session's rolling summary
+        # (usually already folded in the background while the candidate was typing)
+        warmed, warm_summary = await pregen.take(session.id, "summary", summary_key)
+        summary_state, recent_turns = await get_transcript_budget().compact(
+            session.transcript,
+            warm_summary if warmed else session.transcript_summary,
+            gemini_service.summarize_transcript
+        )
+        session.transcript_summary = summary_state
+
         current_time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        usage = {}
         next_question = await gemini_service.generate_interview_question(
             role=session.role_category,
             sub_role=session.sub_role,
@@ -284,12 +490,27 @@ async def submit_answer(
             round_name=session.interview_round,
             jd=session.job_description,
             resume_text=session.resume_text,
-            chat_history=[m["content"] for m in session.transcript],
+            chat_history=[m["content"] for m in recent_turns],
             current_time=current_time_str,
-            interviewer_name=session.interviewer_name
+            interviewer_name=session.interviewer_name,
+            on_chunk=_stage_emitter(emit, "question"),
+            history_summary=summary_state["text"],
+            prior_turns=summary_state["turns_folded"],
+            usage=usage
         )
-        session.transcript.append({"role": "assistant", "content": next_question})
+        session.transcript = session.transcript + [{"role": "assistant", "content": next_question}]
+        flag_modified(session, "transcript")
+        prompt_tokens = {
+            "round": session.interview_round,
+            "turn": session.questions_count,
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "estimated_prompt_tokens": usage.get("estimated_prompt_tokens"),
+            "verbatim_turns": len(recent_turns),
+            "summarized_turns": summary_state["turns_folded"]
+        }
+        session.prompt_token_log = (session.prompt_token_log or []) + [prompt_tokens]
         db.commit()
+        _schedule_pregeneration(session)
         
         return {
             "evaluation": None,
@@ -298,85 +519,173 @@ async def submit_answer(
             "round_completed": False,
             "current_round": session.interview_round,
             "current_round_number": session.current_round_number,
-            "questions_asked": session.questions_count
+            "questions_asked": session.questions_count,
+            "prompt_tokens": prompt_tokens
         }
     else:
-        # Evaluate current round after sufficient questions
+        # Evaluate current round after sufficient questions.
+        # The slow steps run as a dependency graph (intel -> evaluation -> report/learning);
+        # the next round's opening question is generated speculatively alongside the
+        # evaluation and discarded if the candidate does not pass this round.
+        current_round = session.interview_round
         last_question = next((m["content"] for m in reversed(session.transcript) if m["role"] == "assistant"), None)
-        
-        # Get tailored intelligence (DATABASE -> AGENT -> FALLBACK)
-        try:
-            intel_service = get_intelligence_service()
-            # Pass job_description to help agents reverse-engineer stealth companies
-            company_intel = await intel_service.get_intelligence(
-                session.target_company, 
-                session.job_description
+        next_round_name = get_next_round(
+            current_round,
+            session.role_category,
+            session.difficulty_level
+        )
+        prior_scores = dict(session.round_scores or {})
+        rounds_completed = list(session.rounds_completed or [])
+
+        def round_passed(eval_data):
+            return should_proceed_to_next_round(eval_data.get("score", 0), current_round)
+
+        def scores_with(eval_data):
+            return {**prior_scores, current_round: eval_data.get("score", 0)}
+
+        async def fetch_intel(results):
+            warmed, company_intel = await pregen.take(session.id, "intel", (session.target_company, session.job_description))
+            if warmed and company_intel:
+                return company_intel
+            # Get tailored intelligence (DATABASE -> DISCOVERY JOB -> FALLBACK)
+            try:
+                # Never waits on the agentic pipeline: the intel is absorbed on the first turn after its job lands
+                return await get_discovery_jobs().intel_if_ready(
+                    session.target_company,
+                    session.job_description
+                )
+            except Exception as e:
+                print(f"Error fetching company intelligence: {e}")
+                return None
+
+        async def evaluate(results):
+            # Evaluate using Gemini with round-specific criteria (schema-validated, one repair retry)
+            return await gemini_service.evaluate_answer(
+                question=last_question,
+                answer=answer,
+                role=session.role_category,
+                round_name=current_round,
+                company=session.target_company,
+                company_intel=results["intel"], # Pass company intelligence to evaluation
+                on_chunk=_stage_emitter(emit, "evaluation")
             )
-        except Exception as e:
-            print(f"Error fetching company intelligence: {e}")
-            company_intel = None
 
-        # Evaluate using Gemini with round-specific criteria
-        evaluation_raw = await gemini_service.evaluate_answer(
-            question=last_question,
-            answer=data.answer,
-            role=session.role_category,
-            round_name=session.interview_round,
-            company=session.target_company,
-            company_intel=company_intel # Pass company intelligence to evaluation
-        )
+        async def opening_question(results):
+            # Not streamed token-by-token: the candidate may still fail this round
+            warmed, question = await pregen.take(session.id, "opening_question", (current_round, next_round_name))
+            if warmed:
+                return question
+            return await gemini_service.generate_interview_question(
+                role=session.role_category,
+                sub_role=session.sub_role,
+                difficulty=session.difficulty_level,
+                company=session.target_company,
+                round_name=next_round_name,
+                jd=session.job_description,
+                resume_text=session.resume_text,
+                chat_history=[],
+                current_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                interviewer_name=session.interviewer_name
+            )
 
-        # Clean the JSON from Gemini
-        clean_json = evaluation_raw.replace('```json', '').replace('```', '').strip()
-        try:
-            eval_data = json.loads(clean_json)
-        except:
-            eval_data = {"score": 5, "feedback": evaluation_raw, "can_proceed": False}
+        async def master_report(results):
+            eval_data = results["evaluation"]
+            if not round_passed(eval_data):
+                return None
+            round_scores = scores_with(eval_data)
+            # Generate Master Report (Executive Scorecard)
+            session_dict = {
+                "transcript": session.transcript,
+                "round_scores": round_scores,
+                "sub_role": session.sub_role,
+                "target_company": session.target_company
+            }
+            try:
+                return await gemini_service.generate_master_report(
+                    session_dict,
+                    on_chunk=_stage_emitter(emit, "report")
+                )
+            except LLMJSONError as e:
+                # Report only what we actually measured; no made-up verdict
+                print(f"ERROR: Master report output invalid after repair: {e}")
+                return {
+                    "overall_score": sum(round_scores.values()) / len(round_scores),
+                    "final_verdict": None,
+                    "recruiter_closing_note": "The detailed scorecard could not be generated. Round scores are shown above.",
+                    "is_fallback": True
+                }
+
+        async def learn(results):
+            # TIERED LEARNING: Save to Crowdsourced Stealth Registry (finished sessions only)
+            eval_data = results["evaluation"]
+            passed = round_passed(eval_data)
+            if passed and next_round_name:
+                return None
+            round_scores = scores_with(eval_data)
+            try:
+                memory_service = get_memory_service()
+                if passed:
+                    session_full_data = {
+                        "target_company": session.target_company,
+                        "role_category": session.role_category,
+                        "rounds_completed": rounds_completed + ([current_round] if current_round not in rounds_completed else []),
+                        "score": sum(round_scores.values()) / len(round_scores)
+                    }
+                else:
+                    # Struggle/failure data (Structural only)
+                    session_full_data = {
+                        "target_company": session.target_company,
+                        "role_category": session.role_category,
+                        "rounds_completed": rounds_completed + [current_round],
+                        "score": eval_data.get("score", 0)
+                    }
+                await memory_service.learn_from_session(session_full_data, eval_data)
+            except Exception as e:
+                print(f"ERROR: Memory Learning failed: {e}")
+
+        graph = TaskGraph("submit_answer")
+        graph.add("intel", fetch_intel)
+        graph.add("evaluation", evaluate, deps=["intel"])
+        if next_round_name:
+            graph.add("next_question", opening_question, keep_if=("evaluation", round_passed))
+        else:
+            graph.add("master_report", master_report, deps=["evaluation"])
+        graph.add("learning", learn, deps=["evaluation"])
 
+        try:
+            results = await graph.run()
+        except LLMJSONError as e:
+            # Never invent a score: nothing is committed, so the candidate can simply resubmit
+            print(f"ERROR: Evaluation output invalid after repair: {e}")
+            db.rollback()
+            raise HTTPException(status_code=502, detail="Evaluation could not be generated. Please submit your answer again.")
+
+        eval_data = results["evaluation"]
         current_score = eval_data.get("score", 0)
         session.score = current_score
         
         # Store round score
-        if not session.round_scores:
-            session.round_scores = {}
-        session.round_scores[session.interview_round] = current_score
+        session.round_scores = scores_with(eval_data)
         
         # Check if candidate passed this round
-        passed_round = should_proceed_to_next_round(current_score, session.interview_round)
+        passed_round = round_passed(eval_data)
         
         if passed_round:
-            # Check if there's a next round
-            # Get next round NAME for this domain
-            next_round_name = get_next_round(
-                session.interview_round,
-                session.role_category,
-                session.difficulty_level
-            )
-            
             if next_round_name:
                 # Progress to next round
-                session.rounds_completed.append(session.interview_round)
+                session.rounds_completed = session.rounds_completed + [session.interview_round]
                 session.current_round_number += 1  # increment index for tracking
                 session.interview_round = next_round_name
                 session.questions_count = 0  # Reset for new round
-                session.transcript = []  # Clear transcript for new round
+                session.transcript_summary = None
                 
-                # Generate first question of next round
-                current_time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                next_question = await gemini_service.generate_interview_question(
-                    role=session.role_category,
-                    sub_role=session.sub_role,
-                    difficulty=session.difficulty_level,
-                    company=session.target_company,
-                    round_name=session.interview_round,
-                    jd=session.job_description,
-                    resume_text=session.resume_text,
-                    chat_history=[],
-                    current_time=current_time_str,
-                    interviewer_name=session.interviewer_name
-                )
-                session.transcript.append({"role": "assistant", "content": next_question})
+                # First question of next round (generated speculatively during evaluation)
+                next_question = results["next_question"]
+                if emit:
+                    await emit("question", next_question)
+                session.transcript = [{"role": "assistant", "content": next_question}]
                 db.commit()
+                _schedule_pregeneration(session)
                 
                 return {
                     "evaluation": eval_data,
@@ -393,41 +702,11 @@ async def submit_answer(
             else:
                 # No more rounds - Interview complete!
                 if session.interview_round not in session.rounds_completed:
-                    session.rounds_completed.append(session.interview_round)
+                    session.rounds_completed = session.rounds_completed + [session.interview_round]
                 session.overall_status = "completed"
-                
-                # Generate Master Report (Executive Scorecard)
-                session_dict = {
-                    "transcript": session.transcript,
-                    "round_scores": session.round_scores,
-                    "sub_role": session.sub_role,
-                    "target_company": session.target_company
-                }
-                master_report_raw = await gemini_service.generate_master_report(session_dict)
-                clean_report_json = master_report_raw.replace('```json', '').replace('```', '').strip()
-                try:
-                    master_report = json.loads(clean_report_json)
-                except:
-                    master_report = {
-                        "overall_score": sum(session.round_scores.values()) / len(session.round_scores) if session.round_scores else session.score,
-                        "final_verdict": "HIRE",
-                        "recruiter_closing_note": master_report_raw
-                    }
-
+                master_report = results["master_report"]
                 db.commit()
-
-                # TIERED LEARNING: Save to Crowdsourced Stealth Registry
-                try:
-                    memory_service = get_memory_service()
-                    session_full_data = {
-                        "target_company": session.target_company,
-                        "role_category": session.role_category,
-                        "rounds_completed": session.rounds_completed,
-                        "score": sum(session.round_scores.values()) / len(session.round_scores) if session.round_scores else session.score
-                    }
-                    await memory_service.learn_from_session(session_full_data, eval_data)
-                except Exception as e:
-                    print(f"ERROR: Memory Learning failed: {e}")
+                pregen.discard(session.id)
                 
                 return {
                     "evaluation": eval_data,
@@ -444,19 +723,7 @@ async def submit_answer(
         else:
             session.overall_status = "failed"
             db.commit()
-
-            # TIERED LEARNING: Save struggle/failure data (Structural only)
-            try:
-                memory_service = get_memory_service()
-                session_full_data = {
-                    "target_company": session.target_company,
-                    "role_category": session.role_category,
-                    "rounds_completed": session.rounds_completed + [session.interview_round],
-                    "score": session.score
-                }
-                await memory_service.learn_from_session(session_full_data, eval_data)
-            except Exception as e:
-                print(f"ERROR: Struggle Memory Learning failed: {e}")
+            pregen.discard(session.id)
             
             return {
                 "evaluation": eval_data,
@@ -469,27 +736,45 @@ async def submit_answer(
                 "round_scores": session.round_scores,
                 "overall_message": f"Interview terminated. You did not pass the {session.interview_round} round."
             }
-@app.post("/interviews/start", response_model=schemas.InterviewResponse)
-async def start_interview(
-    data: schemas.InterviewCreate, 
+
+@app.post("/interviews/submit-answer")
+async def submit_answer(
+    data: schemas.AnswerSubmit, 
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth_utils.get_current_user)
 ):
+    # 1. Fetch current session
+    session = _get_owned_session(db, data.interview_id, current_user.id)
+    return await _run_submit_answer(session, data.answer, db)
+
+@app.post("/interviews/submit-answer/stream")
+async def submit_answer_stream(
+    data: schemas.AnswerSubmit, 
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth_utils.get_current_user)
+):
+    """SSE variant of /interviews/submit-answer: streams `token` events, then a final `done` event."""
+    # Ownership check up-front so a bad id is still a plain 404
+    _get_owned_session(db, data.interview_id, current_user.id)
+    user_id = current_user.id
+
+    async def flow(emit):
+        # Own DB session: the request-scoped one may be closed while we are still streaming
+        stream_db = database.SessionLocal()
+        try:
+            session = _get_owned_session(stream_db, data.interview_id, user_id)
+            return await _run_submit_answer(session, data.answer, stream_db, emit)
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(_sse_stream(flow), media_type="text/event-stream", headers=SSE_HEADERS)
+
+async def _run_start_interview(data: schemas.InterviewCreate, user_id: int, db: Session, emit=None) -> dict:
+    """Core of /interviews/start, shared by the JSON and the SSE endpoint."""
     current_time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    # 1. Fetch Company Intelligence FIRST (Task)
+    # 1. Company Intelligence: instant for known companies, otherwise a background discovery job
     print(f"LOG: Initializing non-resume interview for {data.target_company}...")
-    intel_task = None
-    if data.target_company:
-        intel_service = get_intelligence_service()
-        intel_task = asyncio.create_task(intel_service.get_intelligence(data.target_company, data.job_description))
-
-    # Wait for intel (Discovery is the bottleneck)
-    company_intel = None
-    if intel_task:
-        await asyncio.wait([intel_task], timeout=60.0)
-        company_intel = intel_task.result() if intel_task.done() and not intel_task.exception() else None
-        if intel_task and not intel_task.done():
-            print("WARNING: Start-Discovery timeout. Proceeding with industry defaults.")
+    company_intel, discovery_job_id = await _company_intel_or_job(data.target_company, data.job_description)
 
     # 2. Now generate the FIRST QUESTION with context
     print("LOG: Generating first contextual question...")
@@ -502,14 +787,15 @@ async def start_interview(
         jd=data.job_description,
         current_time=current_time_str,
         interviewer_name=data.interviewer_name,
-        company_intel=company_intel
+        company_intel=company_intel,
+        on_chunk=_stage_emitter(emit, "question")
     )
 
     from core.round_config import get_first_round
 
     # 2. Save session to DB
     new_session = models.InterviewSession(
-        user_id=current_user.id, 
+        user_id=user_id, 
         role_category=data.role_category,
         sub_role=data.sub_role,
         difficulty_level=data.difficulty_level,
@@ -524,6 +810,7 @@ async def start_interview(
     db.add(new_session)
     db.commit()
     db.refresh(new_session)
+    _schedule_pregeneration(new_session)
 
     return {
         "id": new_session.id,
@@ -531,9 +818,35 @@ async def start_interview(
         "sub_role": new_session.sub_role,
         "first_question": first_question,
         "company_intelligence": company_intel,
+        "discovery_job_id": discovery_job_id,
         "created_at": new_session.created_at
     }
 
+@app.post("/interviews/start", response_model=schemas.InterviewResponse)
+async def start_interview(
+    data: schemas.InterviewCreate, 
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth_utils.get_current_user)
+):
+    return await _run_start_interview(data, current_user.id, db)
+
+@app.post("/interviews/start/stream")
+async def start_interview_stream(
+    data: schemas.InterviewCreate, 
+    current_user: models.User = Depends(auth_utils.get_current_user)
+):
+    """SSE variant of /interviews/start: streams the first question, then a final `done` event."""
+    user_id = current_user.id
+
+    async def flow(emit):
+        stream_db = database.SessionLocal()
+        try:
+            return await _run_start_interview(data, user_id, stream_db, emit)
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(_sse_stream(flow), media_type="text/event-stream", headers=SSE_HEADERS)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,183 @@
+"""
+CPU benchmark for the local fine-tuned model.
+Compares the current loading path (float32 base + LoRA adapter applied at start) with the
+CPU path from services/cpu_model.py (merged artifact, mmap'd safetensors, int8 or not).
+
+Each mode runs in its own subprocess so resident memory is measured from a clean start.
+Reported per mode: load time, resident memory after load (private heap vs mmap'd file
+pages, which the page cache shares between workers), peak RSS, generation throughput
+in new tokens/sec at each batch size, and time-to-first-token for an architect prompt with
+a full prefill vs. the cached policy prefix, all through the same TransformersBatchGenerator
+the inference worker uses.
+
+Run (after scripts/export_cpu_model.py):
+    python scripts/benchmark_local_model.py
+    python scripts/benchmark_local_model.py --modes int8,mmap --batch-sizes 1,4 --threads 8 --max-new-tokens 64
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cpu_model import HAS_LOCAL_ML_LIBS, resident_memory_mb
+
+MODES = {
+    "adapter": "float32 base + LoRA adapter (current path)",
+    "int8": "merged, mmap'd, dynamic int8 Linear layers",
+    "mmap": "merged, mmap'd, stored dtype (no quantisation)",
+}
+
+PROMPTS = [
+    "Summarise the interview process at Acme for a backend engineer in three sentences.",
+    "List four behavioral questions a fintech startup is likely to ask a product manager.",
+    "Describe a typical system design round for a senior data engineer.",
+    "What should a candidate prepare for in a final onsite loop with the team?",
+]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # KB on Linux
+    except ImportError:
+        return None
+
+
+def load(mode: str, threads: int):
+    if mode == "adapter":
+        from services.intelligence_service import IntelligenceService
+        from services.cpu_model import configure_cpu_threads
+        os.environ["LOCAL_CPU_MODEL_PATH"] = os.path.join(os.devnull, "none")  # never take the CPU path here
+        configure_cpu_threads(threads)
+        service = IntelligenceService()
+        service.device = "cpu"
+        if not service._load_local_model():
+            raise RuntimeError(service.model_error or "adapter load failed")
+        return service.model, service.tokenizer
+    from services.cpu_model import load_cpu_model
+    model_dir = os.getenv("LOCAL_CPU_MODEL_PATH") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "interview_ai_model_cpu")
+    model, tokenizer, _ = load_cpu_model(model_dir, quantize="int8" if mode == "int8" else "none", threads=threads)
+    return model, tokenizer
+
+
+ARCHITECT_SUFFIX = """
+        Create a detailed Interview Intelligence Profile for 'Acme Robotics' following the policies and SCHEMA above.
+        
+        COMPANY: Acme Robotics
+        INDUSTRY: Technology
+
+        DATA:
+        [RECENT] Candidates report a recruiter screen, a take-home robotics exercise and an onsite loop.
+        [GENERAL] Acme values ownership and clear written communication.
+        """
+
+
+def measure_ttft(generator) -> Dict:
+    from services.intelligence_service import ARCHITECT_PROMPT_PREFIX
+    from services.local_inference import GenerationRequest
+
+    prompt = ARCHITECT_PROMPT_PREFIX + ARCHITECT_SUFFIX
+    started = time.perf_counter()
+    generator([GenerationRequest(prompt, 1)])
+    full = time.perf_counter() - started
+    generator.warm_prefix(ARCHITECT_PROMPT_PREFIX)
+    started = time.perf_counter()
+    generator([GenerationRequest(prompt, 1, prefix=ARCHITECT_PROMPT_PREFIX)])
+    cached = time.perf_counter() - started
+    return {"full_prefill": round(full, 3), "prefix_cached": round(cached, 3), "prefix_tokens": generator.prefix_stats["reused_tokens"]}
+
+
+def run_child(mode: str, threads: int, batch_sizes: List[int], max_new_tokens: int) -> Dict:
+    from services.local_inference import TransformersBatchGenerator, GenerationRequest
+
+    started = time.perf_counter()
+    model, tokenizer = load(mode, threads)
+    result = {"mode": mode, "load_seconds": round(time.perf_counter() - started, 1), "memory_after_load": resident_memory_mb()}
+    generator = TransformersBatchGenerator(model, tokenizer)
+    generator([GenerationRequest(PROMPTS[0], 4)])  # warm-up: first call pays for kernel/alloc setup
+
+    result["throughput"] = {}
+    for size in batch_sizes:
+        prompts = (PROMPTS * size)[:size]
+        started = time.perf_counter()
+        outputs = generator([GenerationRequest(p, max_new_tokens) for p in prompts])
+        elapsed = time.perf_counter() - started
+        tokens = sum(len(tokenizer(text, add_special_tokens=False)["input_ids"]) for text, _ in outputs)
+        result["throughput"][str(size)] = {"tokens": tokens, "seconds": round(elapsed, 2), "tokens_per_second": round(tokens / elapsed, 2)}
+    result["ttft_seconds"] = measure_ttft(generator)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def print_table(results: List[Dict], batch_sizes: List[int]):
+    print("\n" + "=" * 98)
+    print(" LOCAL MODEL CPU BENCHMARK")
+    print("=" * 98)
+    header = f" {'mode':<8} {'load s':>7} {'RSS MB':>8} {'anon MB':>8} {'file MB':>8} {'peak MB':>8}"
+    header += "".join(f" {'tok/s b' + str(b):>10}" for b in batch_sizes) + f" {'TTFT full':>10} {'TTFT pfx':>9}"
+    print(header)
+    for r in results:
+        if "error" in r:
+            print(f" {r['mode']:<8} ERROR: {r['error']}")
+            continue
+        mem = r["memory_after_load"]
+        row = f" {r['mode']:<8} {r['load_seconds']:>7} {mem['rss'] or '-':>8} {mem['anon'] or '-':>8} {mem['file'] or '-':>8} {r['peak_rss_mb'] or '-':>8}"
+        row += "".join(f" {r['throughput'][str(b)]['tokens_per_second']:>10}" for b in batch_sizes)
+        row += f" {r['ttft_seconds']['full_prefill']:>10} {r['ttft_seconds']['prefix_cached']:>9}"
+        print(row)
+    print("-" * 98)
+    for mode in [r["mode"] for r in results]:
+        print(f" {mode:<8} {MODES[mode]}")
+    print(" file MB is mmap'd weights in the page cache, shared by every worker mapping the same artifact.")
+    print(" TTFT = architect prompt to first token, full prefill vs. cached policy prefix (seconds).")
+    print("=" * 98)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare local model loading paths on CPU")
+    parser.add_argument("--modes", default="adapter,int8,mmap", help=f"Comma-separated subset of {', '.join(MODES)}")
+    parser.add_argument("--batch-sizes", default="1,4", help="Batch sizes to measure throughput at")
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=int(os.getenv("LOCAL_CPU_THREADS", "0")) or (os.cpu_count() or 1))
+    parser.add_argument("--report-json", help="Also write the results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b.strip()]
+
+    if not HAS_LOCAL_ML_LIBS:
+        sys.exit("ERROR: torch and transformers are required for the benchmark.")
+    if args.child:
+        print(json.dumps(run_child(args.child, args.threads, batch_sizes, args.max_new_tokens)))
+        return
+
+    results = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        if mode not in MODES:
+            parser.error(f"Unknown mode '{mode}'")
+        print(f"LOG: Benchmarking {mode} ({MODES[mode]})...")
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode, "--batch-sizes", args.batch_sizes,
+             "--max-new-tokens", str(args.max_new_tokens), "--threads", str(args.threads)],
+            capture_output=True, text=True
+        )
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            error = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+            results.append({"mode": mode, "error": error})
+        else:
+            results.append(json.loads(lines[-1]))
+
+    print_table(results, batch_sizes)
+    if args.report_json:
+        with open(args.report_json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+One-off export of the fine-tuned model for CPU deployment.
+Merges the LoRA adapter (interview_ai_model/) into an unquantised Llama-3 base and writes a
+single safetensors artifact plus tokenizer to interview_ai_model_cpu/. On CPU hosts the
+backend loads that folder instead of rebuilding base + adapter on every start (see
+services/cpu_model.py).
+
+The bnb-4bit base used on GPU cannot be merged into, so the export uses the full-precision
+instruct base of the same model. Merging needs roughly 2x the model size in RAM once; the
+result is ~16GB in bfloat16.
+
+Run:
+    python scripts/export_cpu_model.py
+    python scripts/export_cpu_model.py --base unsloth/llama-3-8b-instruct --output /models/interview_ai_cpu
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cpu_model import HAS_LOCAL_ML_LIBS, merge_adapter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge the LoRA adapter into its base model for CPU inference")
+    parser.add_argument("--adapter", default=os.path.join(BACKEND_DIR, "interview_ai_model"), help="Fine-tuned LoRA adapter folder")
+    parser.add_argument("--base", default="unsloth/llama-3-8b-instruct", help="Unquantised base model id or path")
+    parser.add_argument("--output", default=os.path.join(BACKEND_DIR, "interview_ai_model_cpu"), help="Where to write the merged artifact")
+    parser.add_argument("--dtype", default="bfloat16", choices=["bfloat16", "float16", "float32"], help="Stored weight dtype")
+    args = parser.parse_args()
+
+    if not HAS_LOCAL_ML_LIBS:
+        sys.exit("ERROR: torch, transformers and peft are required for the export.")
+    if not os.path.exists(args.adapter):
+        sys.exit(f"ERROR: Adapter folder not found at {args.adapter}")
+    os.makedirs(args.output, exist_ok=True)
+    merge_adapter(args.base, args.adapter, args.output, dtype=args.dtype)
+    print(f"INFO: Point LOCAL_CPU_MODEL_PATH at {args.output} if it is not the default location.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Local Gemini stand-in server for load tests and benchmarks.
+Speaks the subset of the Gemini REST API the google-genai SDK uses
+(generateContent and streamGenerateContent?alt=sse) and answers with the canned,
+schema-valid output from services/llm_backends.py after a sampled latency.
+
+Run:
+    python scripts/fake_gemini_server.py --port 8089 --latency "lognormal:0.8,0.4;evaluate_answer=normal:2,0.5"
+
+Then start the backend against it:
+    GEMINI_API_KEY=fake GEMINI_BASE_URL=http://127.0.0.1:8089 uvicorn main:app
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.llm_backends import FakeBackend, prompt_text
+from services.transcript_budget import estimate_tokens
+
+
+def _request_text(body: dict) -> str:
+    system = body.get("systemInstruction") or body.get("system_instruction") or {}
+    return "\n".join(filter(None, [prompt_text(system.get("parts", [])), prompt_text(body.get("contents", []))]))
+
+
+def _payload(text: str, model: str, prompt_tokens: int = None, output_tokens: int = None, finished: bool = True) -> dict:
+    payload = {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": text}]},
+            "index": 0,
+            **({"finishReason": "STOP"} if finished else {})
+        }],
+        "modelVersion": model
+    }
+    if prompt_tokens is not None:
+        payload["usageMetadata"] = {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens
+        }
+    return payload
+
+
+def make_handler(backend: FakeBackend):
+    class GeminiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            path = self.path.split("?")[0]
+            if ":" not in path or "/models/" not in path:
+                return self._send_json(404, {"error": {"code": 404, "message": f"Unknown path {path}", "status": "NOT_FOUND"}})
+            model, method = path.rsplit("/models/", 1)[1].split(":", 1)
+
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            text_in = _request_text(body)
+            call_type = backend.resolve_call_type(text_in)
+            latency = backend.sample_latency(call_type)
+            text = backend.respond(text_in, call_type)
+            prompt_tokens, output_tokens = estimate_tokens(text_in), estimate_tokens(text)
+
+            error_code = backend.sample_error()
+            if error_code:
+                time.sleep(latency * backend.first_token_fraction)
+                status = "RESOURCE_EXHAUSTED" if error_code == 429 else "UNAVAILABLE"
+                return self._send_json(error_code, {"error": {"code": error_code, "message": f"Injected by fake server ({status})", "status": status}})
+
+            if method == "generateContent":
+                time.sleep(latency)
+                return self._send_json(200, _payload(text, model, prompt_tokens, output_tokens))
+
+            if method == "streamGenerateContent":
+                parts = backend.chunks(text)
+                time.sleep(latency * backend.first_token_fraction)
+                gap = latency * (1 - backend.first_token_fraction) / len(parts)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, part in enumerate(parts):
+                    if i:
+                        time.sleep(gap)
+                    last = i == len(parts) - 1
+                    payload = _payload(part, model, *((prompt_tokens, output_tokens) if last else (None, None)), finished=last)
+                    event = f"data: {json.dumps(payload)}\r\n\r\n".encode("utf-8")
+                    self.wfile.write(f"{len(event):X}\r\n".encode() + event + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+                return
+
+            return self._send_json(404, {"error": {"code": 404, "message": f"Unsupported method {method}", "status": "NOT_FOUND"}})
+
+    return GeminiHandler
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8089, latency: str = "fixed:0", seed: int = None, error_rate: float = 0.0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(FakeBackend(latency=latency, seed=seed, error_rate=error_rate)))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default=os.getenv("LLM_FAKE_LATENCY", "lognormal:0.8,0.4"),
+                        help='Latency spec in seconds, e.g. "lognormal:0.8,0.4;evaluate_answer=normal:2,0.5"')
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--error-rate", type=float, default=float(os.getenv("LLM_FAKE_ERROR_RATE", "0")),
+                        help="Fraction of requests answered with 429/503, to exercise retries and the circuit breaker")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.latency, args.seed, args.error_rate)
+    print(f"LOG: Fake Gemini server listening on http://{args.host}:{args.port} (latency: {args.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("LOG: Fake Gemini server shutting down...")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Bulk pre-warming of company discovery.
+Runs a list of companies (optionally with JDs) through IntelligenceService ahead of
+demand, so the first candidate targeting them gets a memory-tier hit instead of a
+full agentic discovery.
+
+- Companies already answered by a cheap tier (curated / gold / stealth / quarantine)
+  are skipped without an LLM call.
+- --concurrency bounds parallel pipelines; --rate-per-minute bounds how many new
+  pipelines start per minute (each one makes roughly 5-8 Gemini calls).
+- Every finished company is appended to a JSONL checkpoint. Re-running the same command
+  skips what is already done (failures are retried), so an interrupted run resumes.
+- Results land in the discovery log through the normal save path; the logs are
+  compacted into discoveries.json / quarantine_discoveries.json at the end.
+
+Run:
+    python scripts/prewarm_discoveries.py companies.csv --concurrency 2 --rate-per-minute 10
+    python scripts/prewarm_discoveries.py --companies "Acme Stealth, Globex" --dry-run
+
+CSV input needs a `company_name` (or `company`) column; `job_description` (or `jd`) is optional.
+Plain text input is one company per line.
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import asyncio
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.discovery_store import normalize_name
+
+DEFAULT_CHECKPOINT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "prewarm_checkpoint.jsonl")
+DONE_OUTCOMES = {"gold", "quarantine", "curated", "stealth", "known"}
+
+
+def load_companies(path: str = None, inline: str = None) -> List[Dict[str, Optional[str]]]:
+    """Reads companies from a CSV / text file and/or a comma-separated string. Duplicates are dropped."""
+    rows = []
+    if path:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            if path.lower().endswith(".csv"):
+                for record in csv.DictReader(f):
+                    record = {(k or "").strip().lower(): (v or "").strip() for k, v in record.items()}
+                    name = record.get("company_name") or record.get("company")
+                    if name:
+                        rows.append({"company_name": name, "job_description": record.get("job_description") or record.get("jd") or None})
+            else:
+                rows.extend({"company_name": line.strip(), "job_description": None} for line in f if line.strip() and not line.startswith("#"))
+    if inline:
+        rows.extend({"company_name": name.strip(), "job_description": None} for name in inline.split(",") if name.strip())
+
+    seen, unique = set(), []
+    for row in rows:
+        key = normalize_name(row["company_name"])
+        if key not in seen:
+            seen.add(key)
+            unique.append(row)
+    return unique
+
+
+def load_checkpoint(path: str) -> Dict[str, Dict]:
+    """Latest checkpoint record per normalized company name."""
+    records = {}
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn line from an interrupted write
+                records[normalize_name(record.get("company_name"))] = record
+    return records
+
+
+def append_checkpoint(path: str, record: Dict):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class RateBudget:
+    """Spaces pipeline starts so no more than `per_minute` begin in any minute."""
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute and per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _prewarm_one(service, store, row: Dict, budget: RateBudget, dry_run: bool) -> Tuple[str, Optional[str], float]:
+    """Returns (outcome, error, seconds). Outcome is the tier that now answers for the company."""
+    name = row["company_name"]
+    tier, profile = await service.resolve_known_profile(name)
+    if profile:
+        return tier, None, 0.0
+    if dry_run:
+        return "needs_discovery", None, 0.0
+
+    await budget.acquire()
+    started = time.perf_counter()
+    result = await service.get_intelligence(name, row.get("job_description"))
+    seconds = time.perf_counter() - started
+    if not result or "error" in result:
+        return "failed", (result or {}).get("error", "Discovery failed."), seconds
+    saved_tier, _ = await store.lookup(name)
+    return saved_tier or "unsaved", None, seconds
+
+
+async def run_prewarm(
+    rows: List[Dict],
+    service,
+    store,
+    concurrency: int = 2,
+    rate_per_minute: float = 10,
+    checkpoint_path: str = DEFAULT_CHECKPOINT,
+    retry_failed: bool = True,
+    dry_run: bool = False
+) -> Dict:
+    checkpoint = load_checkpoint(checkpoint_path) if not dry_run else {}
+    pending = []
+    skipped = 0
+    for row in rows:
+        previous = checkpoint.get(normalize_name(row["company_name"]))
+        if previous and (previous["outcome"] in DONE_OUTCOMES or not retry_failed):
+            skipped += 1
+        else:
+            pending.append(row)
+    print(f"LOG: {len(rows)} companies, {skipped} already in the checkpoint, {len(pending)} to process "
+          f"(concurrency {concurrency}, {rate_per_minute or 'unlimited'}/min).")
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    budget = RateBudget(rate_per_minute)
+    outcomes, durations, errors = Counter(), [], {}
+    started = time.perf_counter()
+
+    async def worker(index: int, row: Dict):
+        async with semaphore:
+            try:
+                outcome, error, seconds = await _prewarm_one(service, store, row, budget, dry_run)
+            except Exception as e:
+                outcome, error, seconds = "failed", str(e), 0.0
+        outcomes[outcome] += 1
+        if seconds:
+            durations.append(seconds)
+        if error:
+            errors[row["company_name"]] = error
+        if not dry_run:
+            append_checkpoint(checkpoint_path, {
+                "company_name": row["company_name"], "outcome": outcome, "error": error,
+                "seconds": round(seconds, 2), "at": time.time()
+            })
+        done = sum(outcomes.values())
+        print(f"INFO: [{done}/{len(pending)}] {row['company_name']} -> {outcome}" + (f" ({seconds:.1f}s)" if seconds else "") + (f" ERROR: {error}" if error else ""))
+
+    await asyncio.gather(*(worker(i, row) for i, row in enumerate(pending)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "total": len(rows),
+        "skipped_from_checkpoint": skipped,
+        "processed": len(pending),
+        "outcomes": dict(outcomes),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_per_minute": round(len(pending) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "discovery_seconds_p50": round(_percentile(durations, 50), 2),
+        "discovery_seconds_p95": round(_percentile(durations, 95), 2),
+    }
+
+
+def print_report(report: Dict):
+    print("\n" + "=" * 60)
+    print(" PRE-WARM REPORT")
+    print("=" * 60)
+    print(f" Companies:      {report['total']} ({report['skipped_from_checkpoint']} skipped from checkpoint)")
+    print(f" Processed:      {report['processed']} in {report['elapsed_seconds']}s "
+          f"({report['throughput_per_minute']}/min)")
+    print(f" Discovery time: p50 {report['discovery_seconds_p50']}s | p95 {report['discovery_seconds_p95']}s")
+    print(" Outcomes:")
+    for outcome, count in sorted(report["outcomes"].items(), key=lambda item: -item[1]):
+        print(f"   {outcome:<16} {count}")
+    for company, error in list(report["errors"].items())[:10]:
+        print(f"   ! {company}: {error}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warm company discovery for a list of companies")
+    parser.add_argument("source", nargs="?", help="CSV (company_name[,job_description]) or text file, one company per line")
+    parser.add_argument("--companies", help="Comma-separated company names (in addition to the file)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Parallel discovery pipelines")
+    parser.add_argument("--rate-per-minute", type=float, default=10, help="Max new pipelines started per minute (0 = unlimited)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="JSONL checkpoint used to resume interrupted runs")
+    parser.add_argument("--no-retry-failed", action="store_true", help="Skip companies that failed in a previous run")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which companies still need discovery")
+    parser.add_argument("--report-json", help="Also write the final report to this file")
+    args = parser.parse_args()
+
+    rows = load_companies(args.source, args.companies)
+    if not rows:
+        parser.error("No companies given. Pass a CSV/text file and/or --companies.")
+
+    from services.intelligence_service import get_intelligence_service
+    from services.discovery_store import get_discovery_store
+
+    service = get_intelligence_service()
+    store = get_discovery_store()
+    try:
+        report = asyncio.run(run_prewarm(
+            rows, service, store,
+            concurrency=args.concurrency,
+            rate_per_minute=args.rate_per_minute,
+            checkpoint_path=args.checkpoint,
+            retry_failed=not args.no_retry_failed,
+            dry_run=args.dry_run
+        ))
+    except KeyboardInterrupt:
+        print("\nWARNING: Interrupted. Finished companies are checkpointed; re-run the same command to resume.")
+        store.compact()
+        sys.exit(130)
+
+    if not args.dry_run:
+        store.compact()
+    print_report(report)
+    if args.report_json:
+        with open(args.report_json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
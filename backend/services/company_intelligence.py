@@ -12,6 +12,7 @@ class CompanyIntelligenceService:
     def __init__(self):
         self.company_data = {}
         self.company_aliases = {}  # Common name variations
+        self._profile_memo = {}  # input name -> matched profile (or None); the DB is static once loaded
         self.load_company_profiles()
         self._build_aliases()
     
@@ -24,6 +25,7 @@ class CompanyIntelligenceService:
             with open(data_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 self.company_data = data.get('companies', {})
+                self._profile_memo = {}
                 print(f"INFO: Loaded {len(self.company_data)} company profiles")
         except FileNotFoundError:
             print("WARNING: Company profiles database not found. Using AI fallback only.")
@@ -103,6 +105,18 @@ class CompanyIntelligenceService:
         return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
     
     def get_company_profile(self, company_name: str) -> Optional[Dict[str, Any]]:
+        """Memoized front of `_match_company_profile`: repeat lookups (hits and misses) skip the fuzzy scans."""
+        if not company_name:
+            return None
+        if company_name in self._profile_memo:
+            return self._profile_memo[company_name]
+        profile = self._match_company_profile(company_name)
+        if len(self._profile_memo) >= 4096:
+            self._profile_memo.clear()
+        self._profile_memo[company_name] = profile
+        return profile
+
+    def _match_company_profile(self, company_name: str) -> Optional[Dict[str, Any]]:
         """
         Get company profile with Smart Tiered Matching:
         Tier 1: Exact Match (Case-insensitive)
@@ -0,0 +1,167 @@
+"""
+CPU Model
+Loading path for the fine-tuned Llama model on machines without a GPU.
+
+The default path builds the 8B base model in float32 and applies the LoRA adapter on every
+start, which is slow and needs ~32GB of RAM. The CPU path instead loads a single artifact
+prepared once by `scripts/export_cpu_model.py` (adapter merged into the base weights, saved as
+safetensors) and then:
+
+- memory-maps the safetensors shards and assigns them into a meta-initialised model, so the
+  weights are never copied into the process heap. With LOCAL_CPU_QUANTIZE=none the pages are
+  file-backed and shared by every uvicorn worker that loads the same artifact.
+- with LOCAL_CPU_QUANTIZE=int8 (default), swaps every nn.Linear for a dynamically quantised
+  int8 one. Each process then holds its own ~4x smaller copy, and matmuls run on int8 kernels.
+- pins torch's intra-op threads to LOCAL_CPU_THREADS (default: the cores available to this
+  process) and uses one inter-op thread, since generation is a sequential loop.
+"""
+
+import os
+import glob
+import json
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import torch
+    from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer
+    from safetensors.torch import load_file
+    HAS_LOCAL_ML_LIBS = True
+except ImportError:
+    HAS_LOCAL_ML_LIBS = False
+
+QUANTIZE_MODES = ("int8", "none")
+EXPORT_MANIFEST = "cpu_export.json"
+
+
+def cpu_settings() -> Dict[str, Any]:
+    """CPU loading options from the environment."""
+    quantize = os.getenv("LOCAL_CPU_QUANTIZE", "int8").lower()
+    if quantize not in QUANTIZE_MODES:
+        raise ValueError(f"Unknown LOCAL_CPU_QUANTIZE '{quantize}' (expected int8 or none)")
+    threads = os.getenv("LOCAL_CPU_THREADS")
+    return {"quantize": quantize, "threads": int(threads) if threads else available_cores()}
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))  # Respects taskset / container CPU pinning
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def is_cpu_export(path: str) -> bool:
+    """True when `path` holds a merged artifact written by scripts/export_cpu_model.py."""
+    return bool(path) and os.path.exists(os.path.join(path, EXPORT_MANIFEST))
+
+
+def configure_cpu_threads(threads: int) -> int:
+    """Sets torch's intra-op pool size. With several workers on one host, give each cores / workers."""
+    threads = max(1, threads)
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Only settable before the first parallel op; already fixed for this process
+    return threads
+
+
+def merge_adapter(base_model_id: str, adapter_path: str, output_dir: str, dtype: str = "bfloat16") -> Dict[str, Any]:
+    """
+    Merges a LoRA adapter into its base model and writes one safetensors artifact plus tokenizer.
+    The base must be unquantised: LoRA deltas cannot be folded into bitsandbytes 4-bit weights.
+    """
+    from peft import PeftModel
+
+    torch_dtype = getattr(torch, dtype)
+    print(f"LOG: Loading base model {base_model_id} ({dtype}) for merging...")
+    base = AutoModelForCausalLM.from_pretrained(base_model_id, dtype=torch_dtype, low_cpu_mem_usage=True)
+    print(f"LOG: Merging LoRA adapter from {adapter_path}...")
+    merged = PeftModel.from_pretrained(base, adapter_path).merge_and_unload()
+    merged.save_pretrained(output_dir, safe_serialization=True, max_shard_size="2GB")
+    AutoTokenizer.from_pretrained(adapter_path).save_pretrained(output_dir)
+
+    manifest = {"base_model": base_model_id, "adapter": os.path.abspath(adapter_path), "dtype": dtype}
+    with open(os.path.join(output_dir, EXPORT_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"SUCCESS: Merged model written to {output_dir}")
+    return manifest
+
+
+def load_mmap_weights(model_dir: str):
+    """Builds the model on the meta device and assigns the memory-mapped safetensors into it."""
+    config = AutoConfig.from_pretrained(model_dir)
+    with torch.device("meta"):
+        dtype = getattr(config, "dtype", None) or getattr(config, "torch_dtype", None) or torch.float32
+        model = AutoModelForCausalLM.from_config(config, dtype=dtype)
+
+    state_dict = {}
+    for shard in sorted(glob.glob(os.path.join(model_dir, "*.safetensors"))):
+        state_dict.update(load_file(shard, device="cpu"))
+    if not state_dict:
+        raise FileNotFoundError(f"No .safetensors weights in {model_dir}")
+    # assign=True keeps the mmap-backed tensors instead of copying into freshly allocated parameters
+    missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+    if getattr(model.config, "tie_word_embeddings", False):
+        model.tie_weights()
+        missing = [k for k in missing if k != "lm_head.weight"]
+    if missing:
+        raise ValueError(f"Merged model is missing weights: {missing[:5]}")
+    # Non-persistent buffers (e.g. rotary inv_freq) are not in the file; rebuild them on CPU
+    for module in model.modules():
+        if hasattr(module, "inv_freq") and module.inv_freq.is_meta and hasattr(module, "rope_init_fn"):
+            inv_freq, _ = module.rope_init_fn(module.config, "cpu")
+            module.register_buffer("inv_freq", inv_freq, persistent=False)
+            module.original_inv_freq = inv_freq
+    return model
+
+
+def quantize_linear_int8(model):
+    """
+    Dynamic int8 quantisation (int8 weights, activations quantised per batch at run time).
+    Linear layers are converted one at a time so only one layer is ever held in float32,
+    instead of upcasting the whole bf16 model first.
+    """
+    for module in list(model.modules()):
+        for name, child in list(module.named_children()):
+            if isinstance(child, torch.nn.Linear):
+                wrapped = torch.nn.Sequential(child.float())
+                setattr(module, name, torch.ao.quantization.quantize_dynamic(wrapped, {torch.nn.Linear}, dtype=torch.qint8)[0])
+    # Quantised layers take and return float32, so the rest (embeddings, norms) follows
+    return model.float()
+
+
+def load_cpu_model(model_dir: str, quantize: str = None, threads: int = None) -> Tuple[Any, Any, Dict[str, Any]]:
+    """Loads an exported artifact for CPU inference. Returns (model, tokenizer, info for /health)."""
+    settings = cpu_settings()
+    quantize = quantize or settings["quantize"]
+    threads = configure_cpu_threads(threads or settings["threads"])
+
+    print(f"LOG: Loading CPU model from {model_dir} (quantize={quantize}, threads={threads})...")
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = load_mmap_weights(model_dir)
+    if quantize == "int8":
+        model = quantize_linear_int8(model)
+    model.eval()
+    return model, tokenizer, {"path": model_dir, "quantize": quantize, "threads": threads}
+
+
+def resident_memory_mb() -> Dict[str, Optional[float]]:
+    """
+    Resident memory of this process. `anon` is private heap; `file` is mmap'd pages, which the
+    page cache shares between processes mapping the same file.
+    """
+    fields = {"VmRSS:": "rss", "RssAnon:": "anon", "RssFile:": "file"}
+    usage: Dict[str, Optional[float]] = {"rss": None, "anon": None, "file": None}
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                key = line.split(" ", 1)[0].split("\t", 1)[0]
+                if key in fields:
+                    usage[fields[key]] = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        try:
+            import psutil
+            usage["rss"] = round(psutil.Process().memory_info().rss / 1024 / 1024, 1)
+        except ImportError:
+            pass
+    return usage
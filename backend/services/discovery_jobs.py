@@ -0,0 +1,410 @@
+"""
+Discovery Jobs
+Agentic company discovery as a job system instead of a blocking call inside a request.
+
+- submit() returns a job immediately. Companies already known to the cheap tiers (curated,
+  gold, stealth, quarantine) come back as an already-finished job. While that check runs the
+  job is "resolving", and concurrent submits for the same company get the same job.
+- A bounded pool of DISCOVERY_WORKERS tasks drains a priority queue, so a burst of unknown
+  companies cannot run unbounded LangGraph pipelines against Gemini and the CPU.
+- Each job records progress events (tier resolution, industry detection, every LangGraph
+  node start/finish) that clients poll or stream over SSE. A "resolved" event from the
+  pipeline (memory answered after all) sets the job's tier; otherwise it is "agentic".
+
+Progress reaches the job through a contextvar, so the intelligence pipeline only needs to
+call report_progress() and never knows which job (if any) it is running for.
+
+The queue and its workers live in one process. With several uvicorn workers, every job event
+is also written to a SharedJobTable (SQLite, next to the discovery lease table), so any
+worker can answer a poll or follow the event stream of a job another worker owns.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+import itertools
+import contextvars
+from typing import Any, AsyncIterator, Callable, Awaitable, Dict, List, Optional
+
+from .discovery_store import normalize_name
+
+PRIORITY_INTERACTIVE = 0  # a candidate is waiting (interview start / upload)
+PRIORITY_BACKGROUND = 1   # mid-interview refresh, pre-generation
+PRIORITY_BULK = 2         # prewarming scripts
+
+TERMINAL_STATES = ("done", "failed")
+
+_progress_callback: contextvars.ContextVar[Optional[Callable[[str, Dict[str, Any]], None]]] = contextvars.ContextVar(
+    "discovery_progress_callback", default=None
+)
+
+
+def report_progress(stage: str, **details):
+    """Records a progress event on the discovery job running in this context (no-op outside a job)."""
+    callback = _progress_callback.get()
+    if callback is not None:
+        callback(stage, details)
+
+
+class DiscoveryQueueFull(RuntimeError):
+    """Raised by submit() when DISCOVERY_MAX_QUEUED jobs are already waiting."""
+
+
+class DiscoveryJob:
+    def __init__(self, company_name: str, job_description: str = None, priority: int = PRIORITY_BACKGROUND):
+        self.id = uuid.uuid4().hex
+        self.company_name = company_name
+        self.job_description = job_description
+        self.priority = priority
+        self.status = "queued"
+        self.tier: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self._changed = asyncio.Event()
+        self._on_event: Optional[Callable[["DiscoveryJob"], None]] = None
+
+    def add_event(self, stage: str, details: Dict[str, Any] = None):
+        self.events.append({"seq": len(self.events), "stage": stage, "at": time.time(), **(details or {})})
+        if self._on_event is not None:
+            self._on_event(self)
+        # Wake every subscriber, then re-arm for the next event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def finish(self, result: Optional[Dict[str, Any]], tier: str = None):
+        self.result = result
+        self.tier = tier or self.tier
+        failed = not result or "error" in result
+        self.status = "failed" if failed else "done"
+        self.error = (result or {}).get("error", "Discovery failed.") if failed else None
+        self.finished_at = time.time()
+        self.add_event(self.status, {"tier": self.tier} if not failed else {"error": self.error})
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "company_name": self.company_name,
+            "status": self.status,
+            "priority": self.priority,
+            "tier": self.tier,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.events[-1]["stage"] if self.events else None,
+        }
+        if include_result:
+            data["result"] = self.result if self.status == "done" else None
+        return data
+
+
+class SharedJobTable:
+    """
+    Job snapshots in SQLite, so a job submitted to one uvicorn worker can be polled or streamed
+    through any other. Only the owning worker writes a job's row; the others read it.
+    """
+    def __init__(self, db_path: str = None, poll_seconds: float = None, ttl_seconds: float = 3600):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.db_path = db_path or os.path.join(base_dir, "data", "discovery_leases.sqlite3")
+        self.poll_seconds = poll_seconds if poll_seconds is not None else float(os.getenv("DISCOVERY_LEASE_POLL_SECONDS", "1"))
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # Writes happen on the event loop for every job event; WAL keeps them well under a millisecond
+        self._conn = sqlite3.connect(self.db_path, timeout=2, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS discovery_jobs (id TEXT PRIMARY KEY, company TEXT, status TEXT, data TEXT, updated_at REAL)"
+            )
+            self._conn.execute("DELETE FROM discovery_jobs WHERE updated_at < ?", (time.time() - 86400,))
+
+    def save(self, job: DiscoveryJob):
+        data = json.dumps({**job.to_dict(), "events": job.events}, default=str)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO discovery_jobs (id, company, status, data, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (job.id, normalize_name(job.company_name), job.status, data, time.time())
+                )
+        except sqlite3.Error as e:
+            print(f"WARNING: Could not share discovery job {job.id} with other workers: {e}")
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job's last snapshot (to_dict() plus "events"), or None when unknown or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, status, updated_at FROM discovery_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if not row or (row[1] in TERMINAL_STATES and row[2] < time.time() - self.ttl_seconds):
+            return None
+        return json.loads(row[0])
+
+
+async def _default_resolver(company_name: str):
+    from .intelligence_service import get_intelligence_service
+    return await get_intelligence_service().resolve_known_profile(company_name)
+
+async def _default_runner(company_name: str, job_description: str = None):
+    from .intelligence_service import get_intelligence_service
+    # submit() already ran the fast path for this job
+    return await get_intelligence_service().get_intelligence(company_name, job_description, known_missed=True)
+
+
+class DiscoveryJobQueue:
+    def __init__(
+        self,
+        workers: int = None,
+        max_queued: int = None,
+        job_ttl: float = 3600,
+        resolver: Callable[[str], Awaitable] = None,
+        runner: Callable[..., Awaitable[Dict[str, Any]]] = None,
+        shared: Optional[SharedJobTable] = None
+    ):
+        self.workers = max(1, workers if workers is not None else int(os.getenv("DISCOVERY_WORKERS", "2")))
+        self.max_queued = max_queued if max_queued is not None else int(os.getenv("DISCOVERY_MAX_QUEUED", "100"))
+        self.job_ttl = job_ttl
+        self._resolver = resolver or _default_resolver
+        self._runner = runner or _default_runner
+        self._shared = shared
+        self._jobs: Dict[str, DiscoveryJob] = {}
+        self._active: Dict[str, DiscoveryJob] = {}  # normalized company -> resolving/queued/running job
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {"submitted": 0, "instant": 0, "deduplicated": 0, "completed": 0, "failed": 0}
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """Starts the worker pool on the running loop (called from the app lifespan)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        # Jobs submitted before start() (none in practice) are re-queued
+        for job in self._active.values():
+            if job.status == "queued":
+                self._queue.put_nowait((job.priority, next(self._seq), job.id))
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        print(f"LOG: Discovery job pool started with {self.workers} workers.")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # --- Submission ---
+
+    def _prune(self):
+        cutoff = time.time() - self.job_ttl
+        for job_id in [j.id for j in self._jobs.values() if j.status in TERMINAL_STATES and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def queued_count(self) -> int:
+        return sum(1 for j in self._active.values() if j.status == "queued")
+
+    async def submit(self, company_name: str, job_description: str = None, priority: int = PRIORITY_BACKGROUND) -> DiscoveryJob:
+        """Returns immediately: a finished job for known companies, else a queued (or already active) one."""
+        company_name = (company_name or "").strip()
+        if not company_name:
+            raise ValueError("Company name is required.")
+        self._prune()
+        self._stats["submitted"] += 1
+        key = normalize_name(company_name)
+
+        active = self._active.get(key)
+        if active is not None:
+            self._stats["deduplicated"] += 1
+            if priority < active.priority and active.status in ("resolving", "queued"):
+                # Re-queue at the higher priority; the worker skips the stale entry (a resolving job,
+                # or one submitted before start(), is queued at its current priority later)
+                active.priority = priority
+                if active.status == "queued" and self._queue is not None:
+                    self._queue.put_nowait((priority, next(self._seq), active.id))
+            return active
+
+        job = DiscoveryJob(company_name, job_description, priority)
+        job.status = "resolving"
+        if self._shared is not None:
+            job._on_event = self._shared.save
+        self._jobs[job.id] = job
+        # Registered before the first await so concurrent submits for the same company share this job
+        self._active[key] = job
+
+        try:
+            tier, profile = await self._resolver(company_name)
+        except BaseException as e:
+            self._active.pop(key, None)
+            del self._jobs[job.id]
+            job.finish({"error": f"Discovery lookup failed: {e}"})
+            raise
+        if profile:
+            self._active.pop(key, None)
+            self._stats["instant"] += 1
+            job.started_at = time.time()
+            job.add_event("resolved", {"tier": tier})
+            job.finish(profile, tier)
+            return job
+
+        if self.queued_count() >= self.max_queued:
+            self._active.pop(key, None)
+            del self._jobs[job.id]
+            job.finish({"error": "Discovery queue is full."})  # wakes anyone who joined this job meanwhile
+            raise DiscoveryQueueFull(f"{self.max_queued} discoveries are already queued. Try again later.")
+        job.status = "queued"
+        job.add_event("queued", {"priority": job.priority})
+        if self._queue is not None:
+            self._queue.put_nowait((job.priority, next(self._seq), job.id))
+        return job
+
+    def get(self, job_id: str) -> Optional[DiscoveryJob]:
+        """A job owned by this process (see lookup() for jobs owned by any worker)."""
+        return self._jobs.get(job_id)
+
+    async def lookup(self, job_id: str, company_name: str = None) -> Optional[Dict[str, Any]]:
+        """
+        The job as to_dict(), whichever worker owns it. A job that is unknown here and in the shared
+        table (expired, or sharing disabled) is answered from the cheap tiers when `company_name`
+        is given, since a finished discovery is saved to the discovery store.
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self._shared is not None:
+            data = await asyncio.to_thread(self._shared.load, job_id)
+            if data is not None:
+                data.pop("events", None)
+                return data
+        if company_name and company_name.strip():
+            tier, profile = await self._resolver(company_name.strip())
+            if profile:
+                now = time.time()
+                return {
+                    "id": job_id, "company_name": company_name.strip(), "status": "done", "priority": None,
+                    "tier": tier, "error": None, "created_at": None, "started_at": None, "finished_at": now,
+                    "progress": "done", "result": profile,
+                }
+        return None
+
+    def active_job(self, company_name: str) -> Optional[DiscoveryJob]:
+        return self._active.get(normalize_name(company_name or ""))
+
+    async def intel_if_ready(self, company_name: str, job_description: str = None, priority: int = PRIORITY_BACKGROUND) -> Optional[Dict[str, Any]]:
+        """Intel when it is already known, else None after making sure a discovery is queued. Never waits on the pipeline."""
+        if not company_name:
+            return None
+        try:
+            job = await self.submit(company_name, job_description, priority)
+        except DiscoveryQueueFull:
+            return None
+        return job.result if job.status == "done" else None
+
+    # --- Waiting ---
+
+    async def wait(self, job_id: str, timeout: float = None) -> DiscoveryJob:
+        job = self._jobs[job_id]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while job.status not in TERMINAL_STATES:
+            changed = job._changed
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return job
+
+    async def events(self, job_id: str, since: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Replays events from `since`, then follows the job until it finishes."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            async for event in self._shared_events(job_id, since):
+                yield event
+            return
+        cursor = since
+        while True:
+            changed = job._changed
+            while cursor < len(job.events):
+                yield job.events[cursor]
+                cursor += 1
+            if job.status in TERMINAL_STATES:
+                return
+            await changed.wait()
+
+    async def _shared_events(self, job_id: str, since: int) -> AsyncIterator[Dict[str, Any]]:
+        """Follows a job owned by another worker by polling the shared table."""
+        cursor = since
+        while self._shared is not None:
+            data = await asyncio.to_thread(self._shared.load, job_id)
+            if data is None:
+                return
+            for event in data["events"][cursor:]:
+                yield event
+            cursor = max(cursor, len(data["events"]))
+            if data["status"] in TERMINAL_STATES:
+                return
+            await asyncio.sleep(self._shared.poll_seconds)
+
+    # --- Workers ---
+
+    @staticmethod
+    def _on_progress(job: DiscoveryJob, stage: str, details: Dict[str, Any]):
+        if stage == "resolved":
+            job.tier = details.get("tier")
+        job.add_event(stage, details)
+
+    async def _worker(self, worker_id: int):
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue  # stale entry from a priority bump
+            job.status = "running"
+            job.started_at = time.time()
+            job.add_event("started", {"worker": worker_id, "queued_seconds": round(job.started_at - job.created_at, 3)})
+            token = _progress_callback.set(lambda stage, details: self._on_progress(job, stage, details))
+            try:
+                result = await self._runner(job.company_name, job.job_description)
+            except asyncio.CancelledError:
+                job.finish({"error": "Discovery cancelled (server shutting down)."})
+                raise
+            except Exception as e:
+                result = {"error": str(e)}
+            finally:
+                _progress_callback.reset(token)
+                self._active.pop(normalize_name(job.company_name), None)
+            job.finish(result, job.tier or "agentic")
+            self._stats["failed" if job.status == "failed" else "completed"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "workers": self.workers,
+            "queued": self.queued_count(),
+            "running": sum(1 for j in self._active.values() if j.status == "running"),
+        }
+
+
+# Singleton
+_discovery_jobs = None
+
+def get_discovery_jobs() -> DiscoveryJobQueue:
+    global _discovery_jobs
+    if _discovery_jobs is None:
+        shared = None
+        if os.getenv("DISCOVERY_JOBS_SHARED", "true").lower() not in ("0", "false", "no"):
+            try:
+                shared = SharedJobTable(db_path=os.getenv("DISCOVERY_LEASE_PATH") or None)
+            except Exception as e:
+                print(f"WARNING: Shared discovery job table unavailable ({e}). Jobs are visible to their own worker only.")
+        _discovery_jobs = DiscoveryJobQueue(shared=shared)
+    return _discovery_jobs
@@ -0,0 +1,186 @@
+"""
+Discovery Lease
+Cross-process single-flight for agentic company discovery.
+
+IntelligenceService._active_discoveries only deduplicates within one process. With several
+uvicorn workers, the first worker to claim a company (keyed by normalized name) in a shared
+SQLite table runs the LangGraph pipeline and heartbeats its lease. Every other worker
+polls the table and returns the leader's persisted result instead of running its own
+pipeline. If the leader dies, its lease expires after DISCOVERY_LEASE_TTL_SECONDS without
+a heartbeat and one follower takes over.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class DiscoveryLeaseTimeout(RuntimeError):
+    """Raised when a follower waited longer than wait_timeout for the leader's result."""
+
+
+class DiscoveryLeaseManager:
+    def __init__(
+        self,
+        db_path: str = None,
+        ttl_seconds: float = None,
+        poll_seconds: float = None,
+        wait_timeout: float = None,
+        result_ttl: float = 300,
+        failure_ttl: float = 30,
+        owner: str = None
+    ):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.db_path = db_path or os.path.join(base_dir, "data", "discovery_leases.sqlite3")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("DISCOVERY_LEASE_TTL_SECONDS", "30"))
+        self.heartbeat_seconds = self.ttl_seconds / 3
+        self.poll_seconds = poll_seconds if poll_seconds is not None else float(os.getenv("DISCOVERY_LEASE_POLL_SECONDS", "1"))
+        self.wait_timeout = wait_timeout if wait_timeout is not None else float(os.getenv("DISCOVERY_LEASE_WAIT_SECONDS", "600"))
+        # A finished result answers late followers for result_ttl; a failure is retried after failure_ttl
+        self.result_ttl = result_ttl
+        self.failure_ttl = failure_ttl
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._lock = threading.Lock()
+        self._stats = {"led": 0, "followed": 0, "takeovers": 0}
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS discovery_leases ("
+                "key TEXT PRIMARY KEY, owner TEXT, status TEXT, expires_at REAL, result TEXT, updated_at REAL)"
+            )
+            self._conn.execute("DELETE FROM discovery_leases WHERE updated_at < ?", (time.time() - 86400,))
+
+    # --- Sync core (runs in a worker thread) ---
+
+    def try_acquire(self, key: str) -> bool:
+        """Claims the lease when it is free, expired, or holds a stale result."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT owner, status, expires_at, updated_at FROM discovery_leases WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    owner, status, expires_at, updated_at = row
+                    free = (
+                        (status == "running" and expires_at < now)
+                        or (status == "done" and updated_at < now - self.result_ttl)
+                        or (status == "failed" and updated_at < now - self.failure_ttl)
+                    )
+                    if not free:
+                        self._conn.execute("COMMIT")
+                        return False
+                    if status == "running":
+                        self._stats["takeovers"] += 1
+                        print(f"WARNING: Discovery lease for '{key}' expired (owner {owner}). Taking over.")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO discovery_leases (key, owner, status, expires_at, result, updated_at) "
+                    "VALUES (?, ?, 'running', ?, NULL, ?)",
+                    (key, self.owner, now + self.ttl_seconds, now)
+                )
+                self._conn.execute("COMMIT")
+                return True
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, key: str) -> bool:
+        """Extends our lease. False means another worker took it over."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE discovery_leases SET expires_at = ?, updated_at = ? WHERE key = ? AND owner = ? AND status = 'running'",
+                (now + self.ttl_seconds, now, key, self.owner)
+            )
+            return cursor.rowcount > 0
+
+    def complete(self, key: str, result: Dict[str, Any]):
+        status = "failed" if not result or "error" in result else "done"
+        with self._lock:
+            self._conn.execute(
+                "UPDATE discovery_leases SET status = ?, result = ?, updated_at = ? WHERE key = ? AND owner = ?",
+                (status, json.dumps(result, default=str), time.time(), key, self.owner)
+            )
+
+    def release(self, key: str):
+        """Drops an unfinished lease (leader cancelled) so a follower can take over right away."""
+        with self._lock:
+            self._conn.execute("DELETE FROM discovery_leases WHERE key = ? AND owner = ? AND status = 'running'", (key, self.owner))
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT owner, status, expires_at, result FROM discovery_leases WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"owner": row[0], "status": row[1], "expires_at": row[2], "result": json.loads(row[3]) if row[3] else None}
+
+    # --- Async API ---
+
+    async def _keep_alive(self, key: str):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            if not await asyncio.to_thread(self.heartbeat, key):
+                print(f"WARNING: Lost discovery lease for '{key}'. Finishing anyway; the result is still persisted.")
+                return
+
+    async def single_flight(self, key: str, leader: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Runs `leader()` in exactly one worker per key; the others wait for its persisted result."""
+        deadline = time.monotonic() + self.wait_timeout
+        announced = False
+        while True:
+            if await asyncio.to_thread(self.try_acquire, key):
+                self._stats["led"] += 1
+                keep_alive = asyncio.create_task(self._keep_alive(key))
+                try:
+                    result = await leader()
+                except BaseException:
+                    keep_alive.cancel()
+                    # Sync on purpose: this must run even while the task is being cancelled
+                    self.release(key)
+                    raise
+                keep_alive.cancel()
+                await asyncio.to_thread(self.complete, key, result)
+                return result
+
+            lease = await asyncio.to_thread(self.read, key)
+            if lease and lease["status"] in ("done", "failed"):
+                self._stats["followed"] += 1
+                return lease["result"] or {"error": "Discovery failed."}
+            if not announced:
+                print(f"INFO: Discovery for '{key}' is running in another worker. Waiting for its result...")
+                announced = True
+            if time.monotonic() > deadline:
+                raise DiscoveryLeaseTimeout(f"Timed out waiting for the discovery of '{key}'.")
+            await asyncio.sleep(self.poll_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "owner": self.owner}
+
+
+# Singleton
+_discovery_lease = None
+
+def get_discovery_lease() -> Optional[DiscoveryLeaseManager]:
+    """Returns the shared lease manager, or None when disabled via DISCOVERY_LEASE_ENABLED=false."""
+    global _discovery_lease
+    if os.getenv("DISCOVERY_LEASE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    if _discovery_lease is None:
+        try:
+            _discovery_lease = DiscoveryLeaseManager(db_path=os.getenv("DISCOVERY_LEASE_PATH") or None)
+        except Exception as e:
+            print(f"WARNING: Discovery lease unavailable ({e}). Deduplicating within this worker only.")
+            return None
+    return _discovery_lease
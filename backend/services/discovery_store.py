@@ -0,0 +1,323 @@
+"""
+Discovery Store
+In-memory index over the discovery memory files in data/:
+
+- discoveries.json              (Gold: validated agentic discoveries)
+- stealth_registry.json         (Crowdsourced: written by MemoryService)
+- quarantine_discoveries.json   (Unverified or synthetic discoveries)
+
+Each file is parsed once into a normalized-name dict, so a lookup is a dict hit instead
+of a full JSON parse and linear scan per request. Files are re-checked (one os.stat each)
+at most every DISCOVERY_STORE_CHECK_SECONDS and only the ones whose mtime/size changed
+are reloaded. All disk work runs in a worker thread, off the event loop.
+
+New discoveries are never written by rewriting the JSON snapshot. They are appended as
+one line to <snapshot>.log.jsonl (exclusive file lock, fsync), so a write costs one entry
+and concurrent discoveries, in this or another worker process, cannot lose each other.
+compact() periodically folds the log back into the snapshot (temp file + fsync + atomic
+rename, then truncates the log). A crash between the two steps only leaves duplicates,
+which the index ignores.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+LOG_SUFFIX = ".log.jsonl"
+
+# Lookup order: the first tier that knows the company answers
+TIERS = (
+    ("gold", "discoveries.json"),
+    ("stealth", "stealth_registry.json"),
+    ("quarantine", "quarantine_discoveries.json"),
+)
+# Tiers written by agentic discovery (stealth belongs to MemoryService)
+LOGGED_TIERS = ("gold", "quarantine")
+
+
+def normalize_name(name: str) -> str:
+    """'  AP  Guru ' and 'ap guru' share one key."""
+    return re.sub(r"\s+", " ", (name or "").strip()).casefold()
+
+
+def _lock(f):
+    """Exclusive, blocking, cross-process lock on an open file."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class _TierFile:
+    def __init__(self, tier: str, path: str, logged: bool = False):
+        self.tier = tier
+        self.path = path
+        self.log_path = path + LOG_SUFFIX if logged else None
+        self.signature = None
+        self.log_inode = None
+        self.log_offset = 0
+        self.loaded = False
+        self.raw: Any = None
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self.names: Dict[str, str] = {}
+
+    def _add(self, name: str, profile) -> bool:
+        key = normalize_name(name)
+        if key in self.index:
+            return False
+        self.index[key] = profile
+        self.names[key] = name
+        return True
+
+    def load(self, signature):
+        """Full reload: snapshot, then the whole log."""
+        raw = None
+        if signature is not None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        self.raw = raw
+        self.signature = signature
+        self.index, self.names = {}, {}
+        if isinstance(raw, dict):
+            # Registry format: {"Company Name": profile}
+            for name, profile in raw.items():
+                self._add(name, profile)
+        elif isinstance(raw, list):
+            # Discovery format: [{"company_name": ..., "interview_intelligence_profile": ...}]
+            for entry in raw:
+                if isinstance(entry, dict) and entry.get("company_name"):
+                    self._add(entry["company_name"], entry.get("interview_intelligence_profile", entry))
+        self.log_inode, self.log_offset = None, 0
+        self.loaded = True
+        self.read_log_tail()
+
+    def read_log_tail(self) -> int:
+        """Indexes log lines written since the last read. Returns the number of new entries."""
+        if not self.log_path:
+            return 0
+        signature = _signature(self.log_path)
+        if signature is None:
+            self.log_inode, self.log_offset = None, 0
+            return 0
+        inode, _, size = signature
+        if inode != self.log_inode or size < self.log_offset:
+            # New or truncated log: the snapshot was compacted, so reload it too
+            if self.log_inode is not None:
+                self.load(_signature(self.path))
+                return 0
+            self.log_inode, self.log_offset = inode, 0
+        if size == self.log_offset:
+            return 0
+        with open(self.log_path, "rb") as f:
+            f.seek(self.log_offset)
+            chunk = f.read(size - self.log_offset)
+        # A torn last line (writer crashed mid-append) is left for the next read
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        self.log_offset += len(complete)
+        added = 0
+        for line in complete.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and entry.get("company_name"):
+                added += self._add(entry["company_name"], entry.get("interview_intelligence_profile", entry))
+        return added
+
+    def is_stale(self) -> bool:
+        if not self.loaded or _signature(self.path) != self.signature:
+            return True
+        if self.log_path:
+            signature = _signature(self.log_path)
+            return (signature[0], signature[2]) != (self.log_inode, self.log_offset) if signature else self.log_inode is not None
+        return False
+
+
+class DiscoveryStore:
+    def __init__(self, data_dir: str = None, check_interval: float = None):
+        self.data_dir = data_dir or DATA_DIR
+        self.check_interval = check_interval if check_interval is not None else float(os.getenv("DISCOVERY_STORE_CHECK_SECONDS", "2"))
+        self._tiers = {tier: _TierFile(tier, os.path.join(self.data_dir, filename), tier in LOGGED_TIERS) for tier, filename in TIERS}
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._stats = {"lookups": 0, "reloads": 0, "appends": 0, "compactions": 0}
+
+    # --- Sync core (runs in a worker thread) ---
+
+    def refresh(self, force: bool = False) -> List[str]:
+        """Reloads the tier files whose mtime/size changed and tails the discovery logs. Returns the reloaded tiers."""
+        reloaded = []
+        with self._lock:
+            for tier_file in self._tiers.values():
+                try:
+                    if force or not tier_file.loaded or _signature(tier_file.path) != tier_file.signature:
+                        tier_file.load(_signature(tier_file.path))
+                        reloaded.append(tier_file.tier)
+                    elif tier_file.read_log_tail():
+                        reloaded.append(tier_file.tier)
+                except Exception as e:
+                    # Keep serving the last good index (e.g. file caught mid-write by another process)
+                    print(f"WARNING: Discovery store could not reload {os.path.basename(tier_file.path)}: {e}")
+            self._last_check = time.monotonic()
+        if reloaded:
+            self._stats["reloads"] += len(reloaded)
+            print(f"LOG: Discovery store indexed {', '.join(f'{t}={len(self._tiers[t].index)}' for t in reloaded)}")
+        return reloaded
+
+    def lookup_local(self, company_name: str, tiers=None) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """O(1) lookup against the current in-memory index. Returns (tier, profile)."""
+        key = normalize_name(company_name)
+        self._stats["lookups"] += 1
+        for tier in tiers or [t for t, _ in TIERS]:
+            profile = self._tiers[tier].index.get(key)
+            if profile is not None:
+                return tier, profile
+        return None, None
+
+    def _append_sync(self, tier: str, company_name: str, profile: Dict[str, Any]) -> bool:
+        tier_file = self._tiers[tier]
+        entry = {
+            "company_name": company_name,
+            "interview_intelligence_profile": profile,
+            "discovered_at": datetime.now().isoformat()
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock, open(tier_file.log_path, "ab") as log:
+            _lock(log)
+            try:
+                # Catch up with other writers first so the duplicate check is exact
+                if tier_file.is_stale():
+                    if _signature(tier_file.path) != tier_file.signature or not tier_file.loaded:
+                        tier_file.load(_signature(tier_file.path))
+                    else:
+                        tier_file.read_log_tail()
+                if normalize_name(company_name) in tier_file.index:
+                    return False
+                log.seek(0, os.SEEK_END)
+                log.write(line)
+                log.flush()
+                os.fsync(log.fileno())
+                tier_file.read_log_tail()
+            finally:
+                _unlock(log)
+        self._stats["appends"] += 1
+        return True
+
+    def compact(self, tier: str = None) -> int:
+        """Folds the discovery log(s) into the JSON snapshot. Returns the number of entries moved."""
+        moved = 0
+        for name in ([tier] if tier else LOGGED_TIERS):
+            tier_file = self._tiers[name]
+            if not os.path.exists(tier_file.log_path) or os.path.getsize(tier_file.log_path) == 0:
+                continue
+            with self._lock, open(tier_file.log_path, "r+b") as log:
+                _lock(log)
+                try:
+                    tier_file.load(_signature(tier_file.path))
+                    snapshot = tier_file.raw if isinstance(tier_file.raw, list) else []
+                    in_snapshot = {normalize_name(d.get("company_name")) for d in snapshot if isinstance(d, dict)}
+                    log.seek(0)
+                    new_entries = []
+                    for line in log.read().splitlines():
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        key = normalize_name(entry.get("company_name")) if isinstance(entry, dict) else ""
+                        if key and key not in in_snapshot:
+                            in_snapshot.add(key)
+                            new_entries.append(entry)
+                    merged = snapshot + new_entries
+
+                    tmp_path = tier_file.path + ".tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump(merged, f, indent=4)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, tier_file.path)
+                    log.truncate(0)
+                    log.flush()
+                    os.fsync(log.fileno())
+                    tier_file.load(_signature(tier_file.path))
+                    moved += len(new_entries)
+                finally:
+                    _unlock(log)
+        if moved:
+            self._stats["compactions"] += 1
+            print(f"LOG: Discovery store compacted {moved} logged discoveries into the snapshots")
+        return moved
+
+    # --- Async API ---
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._last_check >= self.check_interval
+
+    async def ensure_fresh(self):
+        if self._is_stale():
+            await asyncio.to_thread(self.refresh)
+
+    async def lookup(self, company_name: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        await self.ensure_fresh()
+        return self.lookup_local(company_name)
+
+    async def add_discovery(self, company_name: str, profile: Dict[str, Any], quarantine: bool = False) -> bool:
+        """Persists an agentic discovery (gold or quarantine). Returns False if it was already known."""
+        return await asyncio.to_thread(self._append_sync, "quarantine" if quarantine else "gold", company_name, profile)
+
+    async def all_names(self, tiers=("gold", "stealth")) -> List[str]:
+        await self.ensure_fresh()
+        names = []
+        for tier in tiers:
+            names.extend(self._tiers[tier].names.values())
+        return names
+
+    async def run_compaction(self, interval: float = None):
+        """Background loop started from the app lifespan."""
+        interval = interval if interval is not None else float(os.getenv("DISCOVERY_COMPACT_SECONDS", "300"))
+        while True:
+            try:
+                await asyncio.to_thread(self.compact)
+            except Exception as e:
+                print(f"WARNING: Discovery log compaction failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, **{f"{tier}_entries": len(f.index) for tier, f in self._tiers.items()}}
+
+
+# Singleton
+_discovery_store = None
+
+def get_discovery_store() -> DiscoveryStore:
+    global _discovery_store
+    if _discovery_store is None:
+        _discovery_store = DiscoveryStore()
+    return _discovery_store
@@ -2,51 +2,179 @@ from google import genai
 from google.genai import types
 import os
 import json
+import time
+import asyncio
 from typing import Dict, Any
 from dotenv import load_dotenv
 from .company_intelligence import get_company_intelligence
+from .llm_cache import get_llm_cache, request_fingerprint
+from .transcript_budget import estimate_tokens
+from .llm_json import parse_llm_json, is_valid_llm_json, LLMJSONError
+from .llm_schemas import ResumeAnalysis, AnswerEvaluation, Scorecard, LearningRoadmap
+from .llm_backends import create_llm_backend
+from .llm_resilience import LLMResilience, CircuitOpenError
+from .metrics import LLM_CALL_SECONDS, LLM_TOKENS
 
 load_dotenv()
 
 class GeminiService:
     def __init__(self):
         api_key = os.getenv("GEMINI_API_KEY")
+        # Optional: point the SDK at scripts/fake_gemini_server.py (or any Gemini-compatible proxy)
+        base_url = os.getenv("GEMINI_BASE_URL")
         if not api_key:
-            print("WARNING: GEMINI_API_KEY not found in environment. AI services will be unavailable.")
+            if os.getenv("LLM_BACKEND", "gemini").lower() in ("gemini", "record"):
+                print("WARNING: GEMINI_API_KEY not found in environment. AI services will be unavailable.")
             self.client = None
         else:
-            self.client = genai.Client(api_key=api_key)
+            http_options = types.HttpOptions(base_url=base_url) if base_url else None
+            self.client = genai.Client(api_key=api_key, http_options=http_options)
         self.model_name = "gemini-2.0-flash"
 
-    async def generate_text(self, prompt: str) -> str:
-        """Generic method to generate plain text response."""
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt
+        # Transport for every call: real Gemini, fake, record or replay (see llm_backends.py)
+        self.backend = create_llm_backend(self.client)
+
+        # Per-attempt timeout; retries, adaptive concurrency and the circuit breaker live in llm_resilience.py
+        self.timeout = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "45"))
+        self.resilience = LLMResilience()
+
+    async def _generate(self, contents, config: types.GenerateContentConfig = None, timeout: float = None, on_chunk=None, call_type: str = "generate_text", cache: bool = False, usage: dict = None, accept=None) -> str:
+        """
+        Single non-blocking entry point for every Gemini call (sent through `self.backend`).
+        Uses the async client so the event loop keeps serving other candidates
+        while a call is in flight, bounded by the adaptive concurrency limit and
+        retried / short-circuited by `self.resilience`.
+        If `on_chunk` (async callable) is given, the response is streamed and each
+        text chunk is pushed to it as it arrives; the full text is still returned.
+        If `cache` is set, the response is served from / stored in the LLM cache
+        under `call_type` (see llm_cache.CACHE_TTLS).
+        If `usage` (dict) is given, it is filled with the reported token counts.
+        `accept(text) -> bool` can veto caching of a response (e.g. invalid JSON).
+        Latency and token counts are recorded per `call_type` (see metrics.py).
+        """
+        started = time.perf_counter()
+        usage = usage if usage is not None else {}
+        outcome = "error"
+        try:
+            text, outcome = await self._generate_once(contents, config, timeout, on_chunk, call_type, cache, usage, accept)
+            return text
+        except CircuitOpenError:
+            outcome = "circuit_open"
+            raise
+        except asyncio.CancelledError:
+            # e.g. a discarded speculative question
+            outcome = "cancelled"
+            raise
+        finally:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - started, call_type=call_type, outcome=outcome)
+            for kind in ("prompt", "output"):
+                if usage.get(f"{kind}_tokens"):
+                    LLM_TOKENS.inc(usage[f"{kind}_tokens"], call_type=call_type, kind=kind)
+
+    async def _generate_once(self, contents, config, timeout, on_chunk, call_type, cache, usage, accept):
+        """Body of _generate; returns (text, outcome) where outcome is cached / ok / fallback."""
+        llm_cache = get_llm_cache() if cache else None
+        cache_key = None
+        if llm_cache and llm_cache.is_cacheable(call_type):
+            cache_key = request_fingerprint(self.model_name, contents, config, call_type)
+            cached = await llm_cache.get(call_type, cache_key)
+            if cached is not None:
+                usage.update({"prompt_tokens": 0, "output_tokens": 0, "cached": True})
+                if on_chunk:
+                    await on_chunk(cached)
+                return cached, "cached"
+
+        async def _call():
+            if on_chunk is None:
+                response = await self.backend.generate(self.model_name, contents, config, call_type)
+                self._record_usage(usage, response)
+                return response.text or ""
+
+            parts = []
+            async for chunk in self.backend.stream(self.model_name, contents, config, call_type):
+                self._record_usage(usage, chunk)
+                if chunk.text:
+                    parts.append(chunk.text)
+                    streamed.append(chunk.text)
+                    await on_chunk(chunk.text)
+            return "".join(parts)
+
+        streamed = []
+        text, from_fallback = await self.resilience.call(
+            _call, call_type, timeout or self.timeout, contents=contents, config=config,
+            # A retry would re-send tokens the client already received
+            can_retry=lambda: not streamed
         )
-        return response.text
+        if from_fallback:
+            if on_chunk:
+                await on_chunk(text)
+            return text, "fallback"
 
-    async def generate_json(self, prompt: str) -> Dict[str, Any]:
-        """Generic method to generate and parse JSON response."""
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt
+        if cache_key and text.strip() and (accept is None or accept(text)):
+            await llm_cache.set(call_type, cache_key, text)
+        return text, "ok"
+
+    @staticmethod
+    def _record_usage(usage: dict, response):
+        """Copies Gemini's usage metadata (if any) into the caller's `usage` dict."""
+        metadata = getattr(response, "usage_metadata", None)
+        if usage is None or metadata is None:
+            return
+        if metadata.prompt_token_count is not None:
+            usage["prompt_tokens"] = metadata.prompt_token_count
+        if metadata.candidates_token_count is not None:
+            usage["output_tokens"] = metadata.candidates_token_count
+
+    async def generate_text(self, prompt: str, timeout: float = None, call_type: str = "generate_text", cache: bool = False) -> str:
+        """Generic method to generate plain text response."""
+        return await self._generate(prompt, timeout=timeout, call_type=call_type, cache=cache)
+
+    @staticmethod
+    def _json_config(schema=None, config: types.GenerateContentConfig = None) -> types.GenerateContentConfig:
+        """JSON mode, plus a response schema when Gemini can enforce it (see llm_schemas)."""
+        config = config.model_copy() if config else types.GenerateContentConfig()
+        config.response_mime_type = "application/json"
+        if schema is not None and schema.gemini_schema:
+            config.response_schema = schema
+        return config
+
+    async def _generate_json(self, contents, schema=None, config: types.GenerateContentConfig = None, timeout: float = None, on_chunk=None, call_type: str = "generate_json", cache: bool = False, usage: dict = None) -> Dict[str, Any]:
+        """
+        Structured-output call shared by every JSON prompt.
+        Parses with the shared llm_json parser; on failure, makes exactly ONE repair
+        call and raises LLMJSONError if that also fails (never silently defaults).
+        """
+        json_config = self._json_config(schema, config)
+        text = await self._generate(
+            contents, config=json_config, timeout=timeout, on_chunk=on_chunk,
+            call_type=call_type, cache=cache, usage=usage,
+            accept=lambda t: is_valid_llm_json(t, schema)
         )
-        text = response.text
-        # Clean up JSON if wrapped in markdown code blocks
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
-        
         try:
-            return json.loads(text.strip())
-        except json.JSONDecodeError:
-            print(f"DEBUG: Failed to parse JSON. Raw text: {text}")
-            return {}
+            return parse_llm_json(text, schema)
+        except LLMJSONError as e:
+            error = str(e)
+            print(f"WARNING: {call_type} returned invalid JSON ({error[:200]}). Attempting one repair.")
+
+        repair_prompt = f"""
+        The following output was supposed to be a single JSON object{f" matching the {schema.__name__} schema" if schema else ""}, but it failed to parse.
+        
+        ERROR: {error}
+        
+        OUTPUT:
+        {text[:6000]}
+        
+        Return ONLY the corrected JSON object. Keep all the original content; fix only the structure and types.
+        """
+        repaired = await self._generate(repair_prompt, config=json_config, timeout=timeout, call_type=f"{call_type}_repair")
+        return parse_llm_json(repaired, schema)
+
+    async def generate_json(self, prompt: str, timeout: float = None, call_type: str = "generate_json", cache: bool = False, schema=None) -> Dict[str, Any]:
+        """Generic method to generate and parse JSON response (validated against `schema` if given)."""
+        return await self._generate_json(prompt, schema=schema, timeout=timeout, call_type=call_type, cache=cache)
 
     async def analyze_resume(self, resume_text: str, jd: str = None):
-        """Premium Feature: Analyzes resume against a JD and provides ATS score + Gap Analysis."""
+        """Premium Feature: Analyzes resume against a JD and provides ATS score + Gap Analysis (validated dict)."""
         prompt = f"""
         You are a Senior Technical Recruiter and ATS Optimization Expert.
         
@@ -69,14 +197,14 @@ class GeminiService:
             "tips": []
         }}
         """
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt
-        )
-        return response.text
+        return await self._generate_json(prompt, schema=ResumeAnalysis, call_type="resume_analysis", cache=True)
 
-    async def generate_interview_question(self, role: str, sub_role: str, difficulty: int, company: str = None, round_name: str = "Technical", is_panel: bool = False, jd: str = None, resume_text: str = None, chat_history: list = [], current_time: str = None, interviewer_name: str = "Adinath", company_intel: dict = None):
-        """Generates a contextual interview question for different rounds."""
+    async def generate_interview_question(self, role: str, sub_role: str, difficulty: int, company: str = None, round_name: str = "Technical", is_panel: bool = False, jd: str = None, resume_text: str = None, chat_history: list = [], current_time: str = None, interviewer_name: str = "Adinath", company_intel: dict = None, on_chunk=None, history_summary: str = None, prior_turns: int = 0, usage: dict = None):
+        """
+        Generates a contextual interview question for different rounds. Streams chunks to `on_chunk` if given.
+        `chat_history` may be only the most recent turns; older turns of the round arrive as
+        `history_summary` covering `prior_turns` turns (see transcript_budget.py).
+        """
         
         difficulty_map = {1: "Junior", 2: "Mid-level", 3: "Senior/Lead"}
         level = difficulty_map.get(difficulty, "Junior")
@@ -157,7 +285,7 @@ class GeminiService:
         - Turn 1 (After Intro): Acknowledge their background. Mention something specific from their intro or resume.
         - Turn 2+: Start the core {round_name} interview questions.
         
-        { "PRESSURE MODE: Ask a follow-up optimization question and challenge the candidate's last answer." if len(chat_history) > 6 else "" }
+        { "PRESSURE MODE: Ask a follow-up optimization question and challenge the candidate's last answer." if len(chat_history) + prior_turns > 6 else "" }
 
         YOUR GOAL:
         - Ask ONE question at a time.
@@ -166,6 +294,11 @@ class GeminiService:
         - Tie questions to projects in resume if provided: {resume_text[:300] if resume_text else "None"}
         - For {round_name} round, focus on {round_name.lower()}-specific competencies.
         """
+        if history_summary:
+            system_prompt += f"""
+        EARLIER IN THIS ROUND (summary of {prior_turns} earlier turns, do not repeat these questions):
+        {history_summary}
+        """
 
         # Convert simple transcript list back to Gemini content objects
         contents = []
@@ -176,19 +309,38 @@ class GeminiService:
         # Add the instruction for the next turn
         instruction = f"Please ask the first {round_name} question." if not contents else f"Please ask the next {round_name} follow-up question based on the conversation."
         contents.append(types.Content(role="user", parts=[types.Part(text=instruction)]))
+
+        if usage is not None:
+            usage["estimated_prompt_tokens"] = estimate_tokens(system_prompt) + sum(estimate_tokens(m) for m in chat_history) + estimate_tokens(instruction)
         
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=contents,
+        return await self._generate(
+            contents,
             config=types.GenerateContentConfig(
                 system_instruction=system_prompt
-            )
+            ),
+            on_chunk=on_chunk,
+            call_type="interview_question",
+            usage=usage
         )
+
+    async def summarize_transcript(self, previous_summary: str, turn_lines: list) -> str:
+        """Extends the rolling summary of a round with turns that left the verbatim window."""
+        prompt = f"""
+        You maintain a compact running summary of a mock interview round.
+        
+        CURRENT SUMMARY:
+        {previous_summary if previous_summary else "(empty)"}
+        
+        NEW TURNS TO FOLD IN:
+        {chr(10).join(turn_lines)}
         
-        return response.text
+        Return the updated summary as plain text (max 120 words). Keep: topics already asked,
+        key claims/projects the candidate mentioned, and notable weak or strong answers.
+        """
+        return await self._generate(prompt, call_type="transcript_summary")
 
-    async def evaluate_answer(self, question: str, answer: str, role: str, round_name: str = "Technical", company: str = None, company_intel: dict = None):
-        """Evaluates answer with round-specific criteria and behavioral analysis."""
+    async def evaluate_answer(self, question: str, answer: str, role: str, round_name: str = "Technical", company: str = None, company_intel: dict = None, on_chunk=None):
+        """Evaluates answer with round-specific criteria and behavioral analysis (validated dict). Streams chunks to `on_chunk` if given."""
         
         # Round-specific evaluation criteria
         eval_criteria = {
@@ -247,14 +399,10 @@ class GeminiService:
             "can_proceed": boolean
         }}
         """
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt
-        )
-        return response.text
+        return await self._generate_json(prompt, schema=AnswerEvaluation, on_chunk=on_chunk, call_type="evaluate_answer")
 
-    async def generate_master_report(self, session: dict):
-        """Generates a final Executive Scorecard after all rounds are finished."""
+    async def generate_master_report(self, session: dict, on_chunk=None):
+        """Generates a final Executive Scorecard after all rounds are finished (validated dict). Streams chunks to `on_chunk` if given."""
         prompt = f"""
         TRANSCRIPT SUMMARY: {str(session['transcript'])[:2000]}
         ROUND SCORES: {session['round_scores']}
@@ -278,14 +426,10 @@ class GeminiService:
             "recruiter_closing_note": "A final direct feedback note."
         }}
         """
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt
-        )
-        return response.text
+        return await self._generate_json(prompt, schema=Scorecard, on_chunk=on_chunk, call_type="master_report")
 
     async def generate_learning_roadmap(self, role: str, sub_role: str, failed_topics: list):
-        """Generates a 7-Day Curriculum after a failed round."""
+        """Generates a 7-Day Curriculum after a failed round (validated dict)."""
         prompt = f"""
         The candidate failed their {sub_role} interview in these topics: {failed_topics}.
         Generate a strict 7-Day Learning Roadmap.
@@ -303,10 +447,6 @@ class GeminiService:
             "resources": []
         }}
         """
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt
-        )
-        return response.text
+        return await self._generate_json(prompt, schema=LearningRoadmap, call_type="learning_roadmap")
 
 gemini_service = GeminiService()
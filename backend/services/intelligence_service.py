@@ -2,15 +2,18 @@
 # PROJECT: InterviewAI - Advanced Intelligence System
 # ROLE: Lead Architect & AI Engineer
 import os
+import re
 import json
+import time
 import asyncio
+import threading
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Annotated
+from urllib.parse import urlsplit
+from typing import Dict, Any, List, Optional, Tuple, Annotated
 from typing_extensions import TypedDict
 
 # LangChain / LangGraph imports
 from langgraph.graph import StateGraph, END
-from duckduckgo_search import DDGS
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from rapidfuzz import process, fuzz
@@ -27,6 +30,16 @@ except ImportError:
 # Service imports
 from .company_intelligence import get_company_intelligence
 from .gemini_service import gemini_service
+from .llm_json import parse_llm_json, LLMJSONError
+from .llm_schemas import RouterDecision, AuditResult, CompanyProfile
+from .llm_backends import prompt_text
+from .metrics import LANGGRAPH_NODE_SECONDS, DISCOVERY_TIER_HITS, DISCOVERY_TIER_SECONDS, ARCHITECT_OUTCOMES, ARCHITECT_HEDGE_WINS, ARCHITECT_HEDGE_SECONDS
+from .discovery_store import get_discovery_store, normalize_name
+from .discovery_lease import get_discovery_lease, DiscoveryLeaseTimeout
+from .discovery_jobs import report_progress
+from .search_providers import get_search_provider
+from .local_inference import LocalInferenceWorker, TransformersBatchGenerator
+from .cpu_model import is_cpu_export, load_cpu_model
 
 # TypedDict for the Agent State
 class AgentState(TypedDict):
@@ -41,30 +54,174 @@ class AgentState(TypedDict):
     iterations: int
     sources: List[Dict[str, str]]
     search_query: Optional[str]
+    detected_location: Optional[str]
     audited_data: Optional[str]
     audit_log: List[str]
     error: Optional[str]
 
+# Fixed part of the architect prompt. It leads the prompt so the local model can keep its
+# past-key-values and prefill only the company-specific suffix (see local_inference.py).
+ARCHITECT_PROMPT_PREFIX = """
+        DYNAMIC ROUNDS POLICY:
+        Instead of a fixed set of rounds, identify the 3-4 MOST LIKELY rounds for this specific industry.
+        - For Healthcare: Focus on Clinical rounds, Patient Management, and Behavioral.
+        - For Finance: Focus on Quantitative, Market Knowledge, and Culture.
+        - For Tech: Focus on Coding, System Design, and leadership.
+        
+        HYBRID INTELLIGENCE (JD + WORLD KNOWLEDGE):
+        1. If a Job Description is provided, use it for SPECIALIZED KEYWORDS and CORE VALUES.
+        2. HOWEVER, for the INTERVIEW STRUCTURE and DIFFICULTY, if the JD seems "Aspirational" (e.g. asking for 10 years experience for a Junior role or having no tech round for a dev role), you MUST reconcile it with Industry Standards.
+        3. Never let a JD "soften" the interview if the Industry is known to be high-bar.
+        4. If it's a "Stealth Mode" startup, use the JD as Evidence but the Industry Standard as the Anchor.
+
+        NEGATIVE EVIDENCE POLICY:
+        If the research data shows the company primarily hires for non-tech roles (Administrative, Clinical, Legal, etc.) and you found NO SPECIFIC evidence of tech hiring, you MUST:
+        1. State this clearly in 'interview_style'.
+        2. DO NOT include tech rounds unless the JD explicitly asks for it.
+        3. Replace Tech rounds with 'Industry Standard [Role Type] Assessment'.
+
+        STRICT BIAS GUARD: 
+        1. If NO Job Description is provided AND the Industry is non-Tech (Healthcare, Legal, etc.), DO NOT include 'Coding', 'LeetCode', or 'System Design (Software)' rounds unless the search data explicitly mentions them.
+        2. Instead, use domain-appropriate rounds like 'Clinical Case Study', 'Regulatory Compliance', or 'Practical Skills Test'.
+        3. If research is sparse, use 'Industry Standard [Domain] Round'.
+
+        SCHEMA:
+        {
+            "name": "string",
+            "industry": "string",
+            "size": "string",
+            "interview_style": "string",
+            "difficulty_level": "string",
+            "cultural_values": ["list"],
+            "intelligence_reconciliation": "EXPERT INSIGHT: Briefly explain how you merged the JD requirements with industry reality. (e.g. 'While the JD focuses on frontend, industry data shows this firm prioritizes systems knowledge.')",
+            "interview_rounds": {
+                "Round Name 1": { "focus": "string", "common_topics": ["list"], "style": "string", "tips": "string" },
+                "Round Name 2": { "focus": "string", "common_questions": ["list"], "style": "string" },
+                "Round Name 3": { "focus": "string", "common_topics": ["list"], "style": "string" }
+            },
+            "red_flags": ["list"],
+            "average_process_duration": "string",
+            "interview_count": "string",
+            "role_company_alignment": "Explain how the role fits this industry in 2 sentences."
+        }
+"""
+
+# Constrains local decoding of the architect (same shape as data/company_template.json)
+ARCHITECT_JSON_SCHEMA = CompanyProfile.model_json_schema()
+# local = used the local profile; the rest went to Gemini. not_ready is expected while loading or on Gemini-only hosts.
+# outrun = hedged mode only: Gemini returned a valid profile first and the local row was cancelled.
+ARCHITECT_OUTCOME_NAMES = ("local", "invalid", "no_output", "outrun", "not_ready")
+ARCHITECT_HEDGE_WINNERS = ("local", "gemini", "none")
+
+RESEARCH_BUDGET_SECONDS = 15.0
+RESULTS_PER_QUERY = 6
+MAX_RESEARCH_SOURCES = 12
+SNIPPET_DUPLICATE_THRESHOLD = 90
+
+def _hedge_delay() -> Optional[float]:
+    """ARCHITECT_HEDGE: seconds before Gemini joins a running local architect call, None when hedging is off."""
+    if os.getenv("ARCHITECT_HEDGE", "false").lower() != "true":
+        return None
+    return max(0.0, float(os.getenv("ARCHITECT_HEDGE_DELAY_SECONDS", "0")))
+
+def _extract_role(job_description: Optional[str]) -> Optional[str]:
+    """Cheap (no LLM) guess at the role title in a JD, for the role-specific search query."""
+    if not job_description:
+        return None
+    match = re.search(r"(?:job title|position|role|title)\s*[:\-\u2013]\s*([^\n.,;|]{3,60})", job_description, re.IGNORECASE)
+    if match:
+        return match.group(1).strip()
+    first_line = next((line.strip() for line in job_description.splitlines() if line.strip()), "")
+    if 3 <= len(first_line) <= 60 and len(first_line.split()) <= 8 and not first_line.endswith("."):
+        return first_line
+    match = re.search(
+        r"\b((?:senior|junior|lead|staff|principal|associate)?\s*[a-z]+\s+"
+        r"(?:engineer|developer|analyst|manager|scientist|designer|consultant|architect|nurse|accountant|specialist))\b",
+        job_description, re.IGNORECASE
+    )
+    return match.group(1).strip() if match else None
+
+def _research_queries(state: AgentState) -> List[Tuple[str, str]]:
+    """(label, query) pairs the researcher runs concurrently: recent (router's query), general, role."""
+    company_name = state['company_name']
+    current_year = datetime.now().year
+    location = state.get('detected_location')
+    queries = [
+        ("RECENT", state.get('search_query') or f"{company_name} interview questions {current_year}"),
+        ("GENERAL", f"{company_name} {location + ' ' if location else ''}interview process rounds"),
+    ]
+    # Only with a JD: the router is told not to invent roles for bare company names
+    role = _extract_role(state.get('job_description'))
+    if role:
+        queries.append(("ROLE", f"{company_name} {role} interview questions"))
+    return queries
+
+def _normalize_url(url: str) -> str:
+    """Collapses trivial URL variants (scheme, www, trailing slash, fragment, tracking params)."""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = "&".join(p for p in parts.query.split("&") if p and not p.lower().startswith(("utm_", "ref=", "fbclid=")))
+    return f"{host}{parts.path.rstrip('/')}{'?' + query if query else ''}"
+
+def _merge_search_results(batches: List[Tuple[str, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """Interleaves per-query results (so every query contributes its top hits), dropping repeated
+    URLs and near-duplicate snippets (syndicated copies of the same post)."""
+    merged, seen_urls, seen_snippets = [], set(), []
+    for rank in range(max((len(results) for _, results in batches), default=0)):
+        for label, results in batches:
+            if rank >= len(results):
+                continue
+            result = results[rank]
+            url = _normalize_url(result.get('href', ''))
+            snippet = (result.get('body') or '').lower()
+            if url in seen_urls:
+                continue
+            if snippet and process.extractOne(snippet, seen_snippets, scorer=fuzz.token_sort_ratio, score_cutoff=SNIPPET_DUPLICATE_THRESHOLD):
+                continue
+            seen_urls.add(url)
+            if snippet:
+                seen_snippets.append(snippet)
+            merged.append({**result, "label": label})
+    return merged
+
 class IntelligenceService:
     def __init__(self, eager_load=False):
         self.model = None
         self.tokenizer = None
+        self._inference = None
+        self._generator = None
         self.device = "cuda" if HAS_LOCAL_ML_LIBS and torch.cuda.is_available() else "cpu"
         self.local_model_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "interview_ai_model")
+        # Merged adapter + base exported by scripts/export_cpu_model.py; preferred over the adapter on CPU
+        self.cpu_model_path = os.getenv("LOCAL_CPU_MODEL_PATH") or self.local_model_path + "_cpu"
+        self.cpu_model_info: Optional[Dict[str, Any]] = None
         
         # Startup status log
         status = "READY" if HAS_LOCAL_ML_LIBS else "DISABLED (Libraries missing)"
         print(f"--- INTERVIEW AI INTELLIGENCE SYSTEM ---")
         print(f"DEVICE: {self.device}")
         print(f"LOCAL MODEL STATUS: {status}")
-        print(f"LOAD MODE: {'Eager' if eager_load else 'Lazy'}")
+        print(f"LOAD MODE: {'Eager' if eager_load else 'Background'}")
         print(f"----------------------------------------")
         
         # New: Request deduplication cache to keep system lean
         self._active_discoveries = {} 
+
+        # When Gemini is down (circuit open / retries exhausted), the discovery agents fall back to the local model
+        if HAS_LOCAL_ML_LIBS:
+            gemini_service.resilience.register_fallback(["router", "auditor", "critic", "industry_detection"], self._local_fallback)
         
+        # Local model lifecycle: pending → loading → ready | failed, or disabled. Only "ready" is ever used.
+        self.model_state = "pending"
+        self.model_error: Optional[str] = None
+        self.model_load_seconds: Optional[float] = None
+        self._warmup_thread: Optional[threading.Thread] = None
+        self.architect_outcomes = {outcome: 0 for outcome in ARCHITECT_OUTCOME_NAMES}
+        self.hedge_wins = {winner: 0 for winner in ARCHITECT_HEDGE_WINNERS}
+        self.hedge_win_seconds = {"local": 0.0, "gemini": 0.0}
+
         if eager_load:
-            self._load_local_model()
+            self._warm_up()
         
     def _load_local_model(self):
         """Lazy loader for the fine-tuned Llama model."""
@@ -75,6 +232,9 @@ class IntelligenceService:
             print("WARNING: Local ML libraries (torch, transformers, peft) not found. Falling back to Gemini.")
             return False
             
+        if self.device == "cpu" and is_cpu_export(self.cpu_model_path):
+            return self._load_cpu_model()
+
         if not os.path.exists(self.local_model_path):
             print(f"WARNING: Local model folder not found at {self.local_model_path}. Falling back to Gemini.")
             return False
@@ -129,47 +289,151 @@ class IntelligenceService:
                 max_memory=max_memory
             )
             self.model.eval()
+            self._start_inference()
             print("SUCCESS: Fine-Tuned Llama-3 loaded and ready.")
             return True
         except Exception as e:
             print(f"ERROR: Failed to load local model: {e}")
             self.model = None # Ensure it doesn't try again
+            self.model_error = str(e)
             return False
 
-    async def _generate_with_local_model(self, prompt: str) -> str:
-        """Generation wrapper for local Llama-3."""
-        if not self._load_local_model():
-            return None # Trigger Gemini fallback
-            
+    def _load_cpu_model(self):
+        """CPU path: merged artifact, memory-mapped weights, int8 Linear layers, pinned thread count."""
         try:
-            # Move inputs to the actual device where the model's first layer resides
-            inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
-            print(f"LOG: Local model is thinking (CPU/GPU hybrid)... 60s timeout active.")
-            
-            def run_gen_sync():
-                with torch.no_grad():
-                    return self.model.generate(
-                        **inputs, 
-                        max_new_tokens=450,       # Optimized length for CPU speed
-                        do_sample=False,          # Greedy search is faster
-                        repetition_penalty=1.1,
-                        use_cache=True,
-                        pad_token_id=self.tokenizer.eos_token_id
-                    )
+            self.model, self.tokenizer, self.cpu_model_info = load_cpu_model(self.cpu_model_path)
+            self._start_inference()
+            print(f"SUCCESS: Fine-Tuned Llama-3 loaded for CPU ({self.cpu_model_info['quantize']}, {self.cpu_model_info['threads']} threads).")
+            return True
+        except Exception as e:
+            print(f"ERROR: Failed to load CPU model from {self.cpu_model_path}: {e}")
+            self.model = None
+            self.model_error = str(e)
+            return False
 
-            # Safeguard: If CPU generation takes > 60s, swap to Gemini to prevent UI hang
+    def _start_inference(self):
+        """Wraps the loaded model in the batching worker, with the architect's static prefix pre-encoded."""
+        self._generator = TransformersBatchGenerator(self.model, self.tokenizer)
+        try:
+            started = time.perf_counter()
+            self._generator.warm_prefix(ARCHITECT_PROMPT_PREFIX)
+            print(f"LOG: Architect prompt prefix cached in {time.perf_counter() - started:.1f}s.")
+        except Exception as e:
+            # Not fatal: requests just prefill the whole prompt
+            print(f"WARNING: Could not pre-encode the architect prefix: {e}")
+        self._inference = LocalInferenceWorker(self._generator)
+
+    def _warm_up(self):
+        """Loads the local model and records the outcome (runs in the warm-up thread)."""
+        self.model_state = "loading"
+        started = time.perf_counter()
+        try:
+            loaded = self._load_local_model()
+        except Exception as e:
+            loaded = False
+            print(f"ERROR: Failed to load local model: {e}")
+            self.model_error = str(e)
+        self.model_load_seconds = round(time.perf_counter() - started, 1)
+        if loaded:
+            self.model_state = "ready"
+            print(f"LOG: Local model ready after {self.model_load_seconds}s. Architect will use it from now on.")
+        else:
+            self.model_state = "failed"
+            self.model_error = self.model_error or "Model load failed (see logs)."
+
+    def start_model_warmup(self) -> str:
+        """Starts loading the local model in a background thread (called from the app lifespan). Never blocks."""
+        if self.model_state != "pending":
+            return self.model_state
+        if os.getenv("LOCAL_MODEL_WARMUP", "true").lower() in ("0", "false", "no"):
+            self.model_state, self.model_error = "disabled", "LOCAL_MODEL_WARMUP=false"
+        elif not HAS_LOCAL_ML_LIBS:
+            self.model_state, self.model_error = "disabled", "Local ML libraries (torch, transformers, peft) not installed."
+        elif not os.path.exists(self.local_model_path) and not (self.device == "cpu" and is_cpu_export(self.cpu_model_path)):
+            self.model_state, self.model_error = "disabled", f"No fine-tuned model at {self.local_model_path}."
+        else:
+            self.model_state = "loading"
+            self._warmup_thread = threading.Thread(target=self._warm_up, name="local-model-warmup", daemon=True)
+            self._warmup_thread.start()
+            print("LOG: Loading the local model in the background. Gemini serves the architect until it is ready.")
+            return self.model_state
+        print(f"INFO: Local model disabled ({self.model_error}). Gemini serves the architect.")
+        return self.model_state
+
+    def model_status(self) -> Dict[str, Any]:
+        status = {
+            "state": self.model_state,
+            "device": self.device,
+            "load_seconds": self.model_load_seconds,
+            "error": self.model_error,
+        }
+        if self.cpu_model_info:
+            status["cpu"] = self.cpu_model_info
+        if self.model_state == "ready" and self._inference is not None:
+            status["batching"] = self._inference.stats()
+            if self._generator is not None:
+                status["prefix_cache"] = dict(self._generator.prefix_stats)
+                status["grammar"] = dict(self._generator.grammar_stats)
+        status["architect"] = self.architect_stats()
+        return status
+
+    def architect_stats(self) -> Dict[str, Any]:
+        """Architect outcome counts, how often a ready local model still needed Gemini, and hedged race results."""
+        outcomes = dict(self.architect_outcomes)
+        to_gemini = outcomes["invalid"] + outcomes["no_output"] + outcomes["outrun"]
+        attempted = outcomes["local"] + to_gemini
+        outcomes["gemini_fallback_rate"] = round(to_gemini / attempted, 3) if attempted else None
+        delay = _hedge_delay()
+        outcomes["hedge"] = {
+            "enabled": delay is not None,
+            "delay_seconds": delay,
+            "wins": dict(self.hedge_wins),
+            # Each backend's own time to a valid profile when it won; the gap between the two is the typical margin
+            "mean_win_seconds": {
+                backend: round(self.hedge_win_seconds[backend] / self.hedge_wins[backend], 2) if self.hedge_wins[backend] else None
+                for backend in ("local", "gemini")
+            }
+        }
+        return outcomes
+
+    def _record_architect(self, outcome: str):
+        self.architect_outcomes[outcome] += 1
+        ARCHITECT_OUTCOMES.inc(outcome=outcome)
+
+    async def _generate_with_local_model(self, prompt: str, stop_on_json: bool = False, prefix: str = None, schema: Dict[str, Any] = None) -> str:
+        """
+        Generation wrapper for local Llama-3. JSON prompts stop as soon as the object closes; every
+        call has a token and time budget, and a cancelled caller stops its row at the next token.
+        `prefix` is the static start of the prompt, whose KV-cache is reused across calls. `schema`
+        (a JSON schema) constrains decoding, so output that finishes within budget always validates.
+        """
+        if self.model_state != "ready":
+            return None # Still loading or unavailable: trigger Gemini fallback, never wait for the load
+            
+        max_new_tokens = int(os.getenv("LOCAL_MAX_NEW_TOKENS", "450"))  # Optimized length for CPU speed
+        time_budget = float(os.getenv("LOCAL_GENERATION_TIMEOUT_SECONDS", "60"))
+        try:
+            print(f"LOG: Local model is thinking (CPU/GPU hybrid)... {time_budget:.0f}s budget active.")
+            # The inference worker owns the model and batches concurrent prompts into one generate()
             try:
-                outputs = await asyncio.wait_for(asyncio.to_thread(run_gen_sync), timeout=60.0)
-            except asyncio.TimeoutError:
-                print("WARNING: Local model timed out (60s). Switching to Gemini fallback.")
+                return await self._inference.generate(prompt, max_new_tokens=max_new_tokens, timeout=time_budget, stop_on_json=stop_on_json, prefix=prefix, schema=schema)
+            except (asyncio.TimeoutError, TimeoutError):
+                # Safeguard: the row stops at its deadline, so the CPU is free again when we swap to Gemini
+                print(f"WARNING: Local model exceeded its {time_budget:.0f}s budget. Switching to Gemini fallback.")
                 return None
-            
-            decoded = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            return decoded.replace(prompt, "").strip()
         except Exception as e:
             print(f"ERROR: Local generation failed: {e}")
             return None
 
+    async def _local_fallback(self, contents, config, call_type: str) -> Optional[str]:
+        """Resilience fallback: answers a Gemini prompt with the local Llama model (None = unavailable)."""
+        print(f"INFO: Gemini unavailable for {call_type}. Trying local model...")
+        json_mode = getattr(config, "response_mime_type", None) == "application/json"
+        # Fixed-shape schemas Gemini would have enforced are enforced locally too
+        response_schema = getattr(config, "response_schema", None)
+        schema = response_schema.model_json_schema() if hasattr(response_schema, "model_json_schema") else None
+        return await self._generate_with_local_model(prompt_text(contents, config), stop_on_json=json_mode, schema=schema)
+
     async def router_node(self, state: AgentState):
         """
         Smart Router Agent Node:
@@ -207,7 +471,7 @@ class IntelligenceService:
         
         try:
             current_year = datetime.now().year
-            response = await gemini_service.generate_json(prompt)
+            response = await gemini_service.generate_json(prompt, call_type="router", cache=True, schema=RouterDecision)
             state['search_query'] = response.get('suggested_query', f"{company_name} interview questions {current_year}")
             state['industry'] = response.get('detected_industry')
             state['detected_location'] = response.get('detected_location')
@@ -221,29 +485,23 @@ class IntelligenceService:
         return state
 
     async def researcher_node(self, state: AgentState) -> AgentState:
-        """Dual-Search node: Captures established DNA + Recent trends"""
+        """Multi-Search node: recent, general and role-specific queries run concurrently, merged and deduplicated"""
         company_name = state['company_name']
-        current_year = datetime.now().year
-        query = state.get('search_query') or f"{company_name} interview questions {current_year}"
+        queries = _research_queries(state)
         
-        print(f"AGENT: Researcher looking for '{company_name}' using query: '{query}'...")
+        print(f"AGENT: Researcher looking for '{company_name}' with {len(queries)} concurrent queries: {[q for _, q in queries]}...")
         
         try:
-            def do_search():
-                try:
-                    with DDGS(timeout=10) as ddgs:
-                        # 1. Main Search
-                        return list(ddgs.text(query, max_results=8))
-                except Exception as e:
-                    print(f"SEARCH ERROR: {e}")
-                    return []
-            
-            # Use wait_for to ensure DDGS doesn't hang the entire flow
-            try:
-                results = await asyncio.wait_for(asyncio.to_thread(do_search), timeout=15.0)
-            except asyncio.TimeoutError:
-                print(f"TIMEOUT: Search for '{query}' timed out. Using synthetic fallback.")
-                results = []
+            search = get_search_provider()
+            # All queries share one budget so a hung search can't stall the flow; late ones are dropped
+            tasks = {asyncio.create_task(search.search(query, RESULTS_PER_QUERY)): label for label, query in queries}
+            done, pending = await asyncio.wait(tasks, timeout=RESEARCH_BUDGET_SECONDS)
+            for task in pending:
+                task.cancel()
+                print(f"TIMEOUT: {tasks[task]} search for '{company_name}' timed out. Continuing without it.")
+            batches = [(label, task.result() if task in done else []) for task, label in tasks.items()]
+            results = _merge_search_results(batches)
+            print(f"RESEARCH: {sum(len(b) for _, b in batches)} raw hits -> {len(results)} unique sources.")
             
             if not results:
                 print(f"WARNING: No public info found for {state['company_name']}. Switching to Synthetic Logic.")
@@ -261,21 +519,21 @@ class IntelligenceService:
                     "mindmajix.com", "careerride.com", "ambitionbox.com/advice"
                 ]
                 purged = [r for r in results if not any(d in r.get('href', '') for d in GENERIC_ARTICLE_DOMAINS)]
-                results = purged if purged else results  # fallback: keep all if purge wiped everything
+                results = (purged if purged else results)[:MAX_RESEARCH_SOURCES]  # fallback: keep all if purge wiped everything
                 print(f"PURGE: {len(results)} sources remain after generic-article domain filter.")
 
                 state['is_synthetic'] = False
                 state['confidence_score'] = min(85, len(results) * 15)
                 state['research_data'] = "\n".join([
-                    f"[{'RECENT' if i >= 3 else 'GENERAL'}] {r['title']}: {r['body']}"
-                    for i, r in enumerate(results)
+                    f"[{r['label']}] {r['title']}: {r['body']}"
+                    for r in results
                 ])
                 state['sources'] = [
                     {
-                        "title": f"{'[RECENT] ' if i >= 3 else ''}{r['title']}",
+                        "title": f"{'' if r['label'] == 'GENERAL' else '[' + r['label'] + '] '}{r['title']}",
                         "url": r['href'],
                         "content": r.get('body', '')[:500]
-                    } for i, r in enumerate(results)
+                    } for r in results
                 ]
                 print(f"RESEARCH: Successfully gathered intelligence ({len(results)} sources).")
 
@@ -326,7 +584,7 @@ class IntelligenceService:
         """
         
         try:
-            audit_result = await gemini_service.generate_json(prompt)
+            audit_result = await gemini_service.generate_json(prompt, call_type="auditor", cache=True, schema=AuditResult)
             state['audited_data'] = audit_result.get('relevant_snippets', research_data)
             state['audit_log'].extend(audit_result.get('audit_trail', []))
             
@@ -352,6 +610,100 @@ class IntelligenceService:
             
         return state
 
+    async def _architect_local(self, prompt: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Local attempt at the architect profile: ("local", profile), or ("invalid" | "no_output", None)
+        when Gemini has to answer. The caller records the outcome, since a hedge may discard the profile.
+        """
+        profile_raw = await self._generate_with_local_model(prompt, stop_on_json=True, prefix=ARCHITECT_PROMPT_PREFIX, schema=ARCHITECT_JSON_SCHEMA)
+        if not profile_raw:
+            print("INFO: Local model returned no profile. Falling back to Gemini for Architecting.")
+            return "no_output", None
+        try:
+            return "local", parse_llm_json(profile_raw, CompanyProfile)
+        except LLMJSONError as e:
+            # With constrained decoding this means the token budget ran out mid-document
+            print(f"WARNING: Local model output was not a valid profile ({e}). Falling back to Gemini for Architecting.")
+            return "invalid", None
+
+    async def _architect_gemini(self, prompt: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await gemini_service.generate_json(prompt, call_type="architect", schema=CompanyProfile)
+        except LLMJSONError as e:
+            print(f"ERROR: Architect could not produce a valid profile: {e}")
+            return None
+
+    async def _hedged_architect(self, prompt: str, delay: float) -> Optional[Dict[str, Any]]:
+        """
+        Races the local model against Gemini. Gemini starts `delay` seconds after the local row, or as
+        soon as the local attempt fails. The first schema-valid profile wins and the other call is
+        cancelled; a cancelled local row stops at its next token and frees the CPU.
+        """
+        print(f"AGENT: Architect hedging local model against Gemini (Gemini starts after {delay:g}s).")
+        loop = asyncio.get_running_loop()
+        started = {}
+        backends = {}
+
+        def launch(backend: str, coro):
+            task = asyncio.create_task(coro)
+            backends[task] = backend
+            started[backend] = loop.time()
+            return task
+
+        async def gemini_attempt():
+            profile = await self._architect_gemini(prompt)
+            return ("gemini" if profile else "invalid"), profile
+
+        pending = {launch("local", self._architect_local(prompt))}
+        gemini_task = None
+        winner, profile, win_seconds, gemini_error = None, None, 0.0, None
+        try:
+            while True:
+                if gemini_task is None and (not pending or loop.time() >= started["local"] + delay):
+                    gemini_task = launch("gemini", gemini_attempt())
+                    pending.add(gemini_task)
+                if not pending:
+                    break
+                timeout = None if gemini_task is not None else started["local"] + delay - loop.time()
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    backend = backends[task]
+                    elapsed = loop.time() - started[backend]
+                    outcome, result = ("no_output", None) if task.exception() is not None else task.result()
+                    if task.exception() is not None:
+                        gemini_error = task.exception() if backend == "gemini" else gemini_error
+                        print(f"WARNING: Hedged {backend} architect call failed: {task.exception()}")
+                    if result is None or winner is not None:
+                        ARCHITECT_HEDGE_SECONDS.observe(elapsed, backend=backend, result="failed" if result is None else "late")
+                    else:
+                        winner, profile, win_seconds = backend, result, elapsed
+                        ARCHITECT_HEDGE_SECONDS.observe(elapsed, backend=backend, result="won")
+                        self.hedge_win_seconds[backend] += elapsed
+                    if backend == "local":
+                        # A valid local profile that lost the race was discarded: it did not answer
+                        self._record_architect("outrun" if result is not None and winner == "gemini" else outcome)
+                if winner is not None:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            for task in pending:
+                backend = backends[task]
+                # A task that finished before the cancel landed is discarded all the same
+                ARCHITECT_HEDGE_SECONDS.observe(loop.time() - started[backend], backend=backend, result="cancelled" if task.cancelled() else "late")
+                if backend == "local" and winner == "gemini":
+                    self._record_architect("outrun")
+
+        self.hedge_wins[winner or "none"] += 1
+        ARCHITECT_HEDGE_WINS.inc(winner=winner or "none")
+        if winner is not None:
+            print(f"SUCCESS: Hedged architect won by {winner.upper()} in {win_seconds:.1f}s.")
+        elif gemini_error is not None:
+            raise gemini_error  # Same as the sequential path: Gemini transport errors surface to the caller
+        return profile
+
     async def architect_node(self, state: AgentState):
         """Generates the final profile using purified data"""
         company_name = state['company_name']
@@ -365,73 +717,30 @@ class IntelligenceService:
         if jd_context:
             input_data += f"\n\nROLE CONTEXT: {jd_context}"
 
-        prompt = f"""
-        Create a detailed Interview Intelligence Profile for '{company_name}'.
+        # Static policy first, company data last: the local model reuses the encoded policy block
+        prompt = ARCHITECT_PROMPT_PREFIX + f"""
+        Create a detailed Interview Intelligence Profile for '{company_name}' following the policies and SCHEMA above.
         
         {input_data}
-        
-        DYNAMIC ROUNDS POLICY:
-        Instead of a fixed set of rounds, identify the 3-4 MOST LIKELY rounds for this specific industry.
-        - For Healthcare: Focus on Clinical rounds, Patient Management, and Behavioral.
-        - For Finance: Focus on Quantitative, Market Knowledge, and Culture.
-        - For Tech: Focus on Coding, System Design, and leadership.
-        
-        HYBRID INTELLIGENCE (JD + WORLD KNOWLEDGE):
-        1. If a Job Description is provided, use it for SPECIALIZED KEYWORDS and CORE VALUES.
-        2. HOWEVER, for the INTERVIEW STRUCTURE and DIFFICULTY, if the JD seems "Aspirational" (e.g. asking for 10 years experience for a Junior role or having no tech round for a dev role), you MUST reconcile it with Industry Standards.
-        3. Never let a JD "soften" the interview if the Industry is known to be high-bar.
-        4. If it's a "Stealth Mode" startup, use the JD as Evidence but the Industry Standard as the Anchor.
-
-        NEGATIVE EVIDENCE POLICY:
-        If the research data shows the company primarily hires for non-tech roles (Administrative, Clinical, Legal, etc.) and you found NO SPECIFIC evidence of tech hiring, you MUST:
-        1. State this clearly in 'interview_style'.
-        2. DO NOT include tech rounds unless the JD explicitly asks for it.
-        3. Replace Tech rounds with 'Industry Standard [Role Type] Assessment'.
-
-        STRICT BIAS GUARD: 
-        1. If NO Job Description is provided AND the Industry is non-Tech (Healthcare, Legal, etc.), DO NOT include 'Coding', 'LeetCode', or 'System Design (Software)' rounds unless the search data explicitly mentions them.
-        2. Instead, use domain-appropriate rounds like 'Clinical Case Study', 'Regulatory Compliance', or 'Practical Skills Test'.
-        3. If research is sparse, use 'Industry Standard [Domain] Round'.
-
-        SCHEMA:
-        {{
-            "name": "string",
-            "industry": "string",
-            "size": "string",
-            "interview_style": "string",
-            "difficulty_level": "string",
-            "cultural_values": ["list"],
-            "intelligence_reconciliation": "EXPERT INSIGHT: Briefly explain how you merged the JD requirements with industry reality. (e.g. 'While the JD focuses on frontend, industry data shows this firm prioritizes systems knowledge.')",
-            "interview_rounds": {{
-                "Round Name 1": {{ "focus": "string", "common_topics": ["list"], "style": "string", "tips": "string" }},
-                "Round Name 2": {{ "focus": "string", "common_questions": ["list"], "style": "string" }},
-                "Round Name 3": {{ "focus": "string", "common_topics": ["list"], "style": "string" }}
-            }},
-            "red_flags": ["list"],
-            "average_process_duration": "string",
-            "interview_count": "string",
-            "role_company_alignment": "Explain how the role fits this industry in 2 sentences."
-        }}
         """
         
-        profile_raw = await self._generate_with_local_model(prompt)
-        
-        if profile_raw:
-            print("SUCCESS: Architect Node used LOCAL FINE-TUNED model.")
-            # Clean JSON from Llama output
-            try:
-                if "```json" in profile_raw:
-                    profile_raw = profile_raw.split("```json")[1].split("```")[0]
-                elif "```" in profile_raw:
-                    profile_raw = profile_raw.split("```")[1].split("```")[0]
-                profile = json.loads(profile_raw.strip())
-            except:
-                print("WARNING: Local model output was not valid JSON. Falling back to Gemini for Architecting.")
-                profile = await gemini_service.generate_json(prompt)
+        delay = _hedge_delay()
+        if self.model_state != "ready":
+            print(f"INFO: Architect Node falling back to GEMINI (local model {self.model_state}).")
+            self._record_architect("not_ready")
+            profile = await self._architect_gemini(prompt)
+        elif delay is not None:
+            profile = await self._hedged_architect(prompt, delay)
         else:
-            print("INFO: Architect Node falling back to GEMINI (either model failed to load or CPU mode).")
-            profile = await gemini_service.generate_json(prompt)
-            
+            outcome, profile = await self._architect_local(prompt)
+            self._record_architect(outcome)
+            if profile is None:
+                profile = await self._architect_gemini(prompt)
+            else:
+                print("SUCCESS: Architect Node used LOCAL FINE-TUNED model.")
+
+        if profile is None:
+            state['error'] = "Architect produced an invalid profile."
         state['generated_profile'] = profile
         state['iterations'] += 1
         return state
@@ -442,6 +751,11 @@ class IntelligenceService:
         industry = state.get('industry', 'Unknown')
         
         print("AGENT: Critic evaluating profile integrity...")
+
+        if not profile:
+            state['is_valid'] = False
+            state['audit_log'].append("CRITIC REJECTION: No valid profile to review.")
+            return state
         
         prompt = f"""
         Review this generated Interview Profile for correctness.
@@ -463,7 +777,7 @@ class IntelligenceService:
         If perfect, return 'APPROVED'. Else return corrections.
         """
         
-        critique = await gemini_service.generate_text(prompt)
+        critique = await gemini_service.generate_text(prompt, call_type="critic", cache=True)
         
         if "APPROVED" in critique.upper():
             state['is_valid'] = True
@@ -474,15 +788,27 @@ class IntelligenceService:
             
         return state
 
+    @staticmethod
+    def _timed_node(name: str, node):
+        """Wraps a LangGraph node so its latency lands in langgraph_node_duration_seconds."""
+        async def timed(state: AgentState):
+            report_progress("node_started", node=name)
+            started = time.perf_counter()
+            with LANGGRAPH_NODE_SECONDS.time(node=name):
+                result = await node(state)
+            report_progress("node_finished", node=name, seconds=round(time.perf_counter() - started, 3))
+            return result
+        return timed
+
     def create_workflow(self):
         workflow = StateGraph(AgentState)
 
         # Add Nodes
-        workflow.add_node("router", self.router_node)
-        workflow.add_node("researcher", self.researcher_node)
-        workflow.add_node("auditor", self.auditor_node)
-        workflow.add_node("architect", self.architect_node)
-        workflow.add_node("critic", self.critic_node)
+        workflow.add_node("router", self._timed_node("router", self.router_node))
+        workflow.add_node("researcher", self._timed_node("researcher", self.researcher_node))
+        workflow.add_node("auditor", self._timed_node("auditor", self.auditor_node))
+        workflow.add_node("architect", self._timed_node("architect", self.architect_node))
+        workflow.add_node("critic", self._timed_node("critic", self.critic_node))
 
         # Define Edges
         workflow.set_entry_point("router")
@@ -501,134 +827,155 @@ class IntelligenceService:
 
         return workflow.compile()
 
-    async def get_intelligence(self, company_name: str, job_description: str = None) -> Dict[str, Any]:
+    def _curated_tier(self, company_name: str) -> Optional[Dict[str, Any]]:
+        return get_company_intelligence().get_company_profile(company_name)
+
+    @staticmethod
+    def _memory_tier(tier: str):
+        async def lookup(company_name: str) -> Optional[Dict[str, Any]]:
+            store = get_discovery_store()
+            await store.ensure_fresh()
+            return store.lookup_local(company_name, tiers=(tier,))[1]
+        return lookup
+
+    async def resolve_known_profile(self, company_name: str, recheck: bool = False) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Fast path of the tiered resolver: curated -> gold -> stealth -> quarantine.
+        No LLM calls; returns (tier, profile) or (None, None) when only agentic discovery can answer.
+        `recheck`: an earlier pass already observed these misses, so only a hit is recorded.
+        """
+        tiers = [
+            ("curated", self._curated_tier),
+            ("gold", self._memory_tier("gold")),
+            ("stealth", self._memory_tier("stealth")),
+            ("quarantine", self._memory_tier("quarantine")),
+        ]
+        for tier, lookup in tiers:
+            started = time.perf_counter()
+            try:
+                profile = lookup(company_name)
+                if asyncio.iscoroutine(profile):
+                    profile = await profile
+            except Exception as e:
+                print(f"WARNING: {tier} lookup failed: {e}")
+                profile = None
+            if profile or not recheck:
+                DISCOVERY_TIER_SECONDS.observe(time.perf_counter() - started, tier=tier, result="hit" if profile else "miss")
+            if profile:
+                DISCOVERY_TIER_HITS.inc(tier=tier)
+                report_progress("resolved", tier=tier)
+                if tier == "stealth":
+                    print(f"INFO: Crowdsourced intelligence found for {company_name}")
+                return tier, profile
+        return None, None
+
+    async def _detect_industry(self, job_description: str) -> Optional[str]:
+        """Identify target industry from the JD to prevent name collisions during discovery."""
+        if not job_description:
+            return None
+        try:
+            industry_prompt = f"Identify the industry for this Job Description in 1 word (e.g. Tech, Healthcare, Finance, Legal, Manufacturing, Retail). JD: {job_description[:500]}"
+            target_industry = await gemini_service.generate_text(industry_prompt, call_type="industry_detection", cache=True)
+            target_industry = target_industry.strip().replace(".", "")
+            print(f"DOMAIN-GUARD: Detected target industry as '{target_industry}'")
+            return target_industry
+        except Exception:
+            return None
+
+    async def _run_agentic_discovery(self, company_name: str, job_description: str = None) -> Dict[str, Any]:
+        # Re-check memory: a discovery for this name may have finished while we were queued
+        tier, profile = await self.resolve_known_profile(company_name, recheck=True)
+        if profile:
+            return profile
+
+        started = time.perf_counter()
+        result = "miss"
+        try:
+            print(f"INFO: {company_name} not found in memory. Starting Agentic Discovery...")
+            # Expensive enrichment only happens once every cheap tier has missed
+            if job_description:
+                report_progress("industry_detection")
+            target_industry = await self._detect_industry(job_description)
+            app = self.create_workflow()
+            initial_state: AgentState = {
+                "company_name": company_name,
+                "industry": target_industry,
+                "job_description": job_description,
+                "research_data": None,
+                "is_synthetic": False,
+                "confidence_score": 0,
+                "generated_profile": None,
+                "is_valid": False,
+                "iterations": 0,
+                "sources": [],
+                "search_query": None,
+                "detected_location": None,
+                "audited_data": None,
+                "audit_log": [],
+                "error": None
+            }
+
+            final_state = await app.ainvoke(initial_state)
+            if final_state.get('generated_profile'):
+                profile = final_state['generated_profile']
+                profile['confidence_score'] = final_state.get('confidence_score', 0)
+                profile['is_synthetic'] = final_state.get('is_synthetic', False)
+                profile['sources'] = final_state.get('sources', [])
+
+                # Save Logic
+                try:
+                    is_valid = final_state.get('is_valid')
+                    is_synthetic = final_state.get('is_synthetic')
+                    await get_discovery_store().add_discovery(company_name, profile, quarantine=not (is_valid and not is_synthetic))
+                    report_progress("saved", quarantine=not (is_valid and not is_synthetic))
+                except Exception as e:
+                    print(f"WARNING: Could not save discovery for {company_name}: {e}")
+                result = "hit"
+                DISCOVERY_TIER_HITS.inc(tier="agentic")
+                return profile
+
+            return {"error": final_state.get('error', "Discovery failed.")}
+        except Exception as e:
+            return {"error": str(e)}
+        finally:
+            DISCOVERY_TIER_SECONDS.observe(time.perf_counter() - started, tier="agentic", result=result)
+
+    async def get_intelligence(self, company_name: str, job_description: str = None, known_missed: bool = False) -> Dict[str, Any]:
         """
         Entry point for the backend to get company intelligence.
-        DOMAIN-AWARE: Cross-references industry to prevent collisions.
+        Tiered resolver: curated -> gold -> stealth -> quarantine -> agentic.
+        DOMAIN-AWARE: the JD industry is detected only when the agentic tier runs.
+        `known_missed`: the caller already ran the fast path (discovery jobs), so misses aren't re-observed.
         """
         if not company_name:
             return {"error": "Company name is required."}
             
         # 0. Normalize name (remove trailing spaces like 'AP Guru ')
         company_name = company_name.strip()
-        
-        # 0.1 Deduplication: If already researching this company, wait for that task
+
+        # 1. Fast path: curated DB and discovery memory, no LLM round-trip
+        tier, profile = await self.resolve_known_profile(company_name, recheck=known_missed)
+        if profile:
+            return profile
+
+        # 2. Deduplication: If already researching this company, wait for that task
         if company_name in self._active_discoveries:
             print(f"INFO: Research for '{company_name}' is already in progress. Waiting for result...")
             return await self._active_discoveries[company_name]
 
-        # Use an internal function to wrap the logic so we can track the task
         async def _execute_discovery():
             try:
-                # 0. Identify target industry from JD if available to prevent collisions
-                target_industry = None
-                if job_description:
-                    try:
-                        industry_prompt = f"Identify the industry for this Job Description in 1 word (e.g. Tech, Healthcare, Finance, Legal, Manufacturing, Retail). JD: {job_description[:500]}"
-                        target_industry = await gemini_service.generate_text(industry_prompt)
-                        target_industry = target_industry.strip().replace(".", "")
-                        print(f"DOMAIN-GUARD: Detected target industry as '{target_industry}'")
-                    except:
-                        pass
-
-                # 1. First check the curated database
-                inst = get_company_intelligence()
-                profile = inst.get_company_profile(company_name)
-                
-                if profile:
-                    return profile
-
-                # 2. Check Discovery Memory (TIERED: GOLD -> QUARANTINE)
-                print("INFO: Checking Discovery Memory...")
+                # 3. Cross-worker single-flight: one worker runs the pipeline, the rest wait for its result
+                lease = get_discovery_lease()
+                if lease is None:
+                    return await self._run_agentic_discovery(company_name, job_description)
                 try:
-                    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                    data_dir = os.path.join(base_dir, "data")
-                    
-                    # Tier A: Gold Discoveries
-                    gold_path = os.path.join(data_dir, "discoveries.json")
-                    if os.path.exists(gold_path):
-                        with open(gold_path, 'r', encoding='utf-8') as f:
-                            gold_data = json.load(f)
-                            if isinstance(gold_data, dict) and company_name.title() in gold_data:
-                                return gold_data[company_name.title()]
-                            elif isinstance(gold_data, list):
-                                for d in gold_data:
-                                    if d.get('company_name', '').lower() == company_name.lower():
-                                        return d.get('interview_intelligence_profile', d)
-
-                    # Tier B: Crowdsourced Stealth Registry (NEW)
-                    stealth_path = os.path.join(data_dir, "stealth_registry.json")
-                    if os.path.exists(stealth_path):
-                        with open(stealth_path, 'r', encoding='utf-8') as f:
-                            stealth_data = json.load(f)
-                            if company_name.strip().title() in stealth_data:
-                                print(f"INFO: Crowdsourced intelligence found for {company_name}")
-                                return stealth_data[company_name.strip().title()]
-
-                    # Tier B: Quarantine
-                    quarantine_path = os.path.join(data_dir, "quarantine_discoveries.json")
-                    if os.path.exists(quarantine_path):
-                        with open(quarantine_path, 'r', encoding='utf-8') as f:
-                            q_data = json.load(f)
-                            for d in q_data:
-                                if d.get('company_name', '').lower() == company_name.lower():
-                                    return d.get('interview_intelligence_profile', d)
-                except Exception as e:
-                    print(f"WARNING: Memory lookup failed: {e}")
-
-                # 3. Trigger Agentic Workflow
-                print(f"INFO: {company_name} not found in memory. Starting Agentic Discovery...")
-                app = self.create_workflow()
-                initial_state: AgentState = {
-                    "company_name": company_name,
-                    "industry": target_industry,
-                    "job_description": job_description,
-                    "research_data": None,
-                    "is_synthetic": False,
-                    "confidence_score": 0,
-                    "generated_profile": None,
-                    "is_valid": False,
-                    "iterations": 0,
-                    "sources": [],
-                    "search_query": None,
-                    "audited_data": None,
-                    "audit_log": [],
-                    "error": None
-                }
-                
-                final_state = await app.ainvoke(initial_state)
-                if final_state.get('generated_profile'):
-                    profile = final_state['generated_profile']
-                    profile['confidence_score'] = final_state.get('confidence_score', 0)
-                    profile['is_synthetic'] = final_state.get('is_synthetic', False)
-                    profile['sources'] = final_state.get('sources', [])
-                    
-                    # Save Logic
-                    try:
-                        is_valid = final_state.get('is_valid')
-                        is_synthetic = final_state.get('is_synthetic')
-                        filename = "discoveries.json" if (is_valid and not is_synthetic) else "quarantine_discoveries.json"
-                        target_path = os.path.join(data_dir, filename)
-                        
-                        existing_data = []
-                        if os.path.exists(target_path):
-                            with open(target_path, 'r', encoding='utf-8') as f:
-                                existing_data = json.load(f)
-                        
-                        if not any(d.get('company_name', '').lower() == company_name.lower() for d in existing_data):
-                            existing_data.append({
-                                "company_name": company_name,
-                                "interview_intelligence_profile": profile,
-                                "discovered_at": datetime.now().isoformat()
-                            })
-                            with open(target_path, 'w', encoding='utf-8') as f:
-                                json.dump(existing_data, f, indent=4)
-                    except: pass
-                    return profile
-                
-                return {"error": final_state.get('error', "Discovery failed.")}
-            except Exception as e:
-                return {"error": str(e)}
+                    return await lease.single_flight(
+                        normalize_name(company_name),
+                        lambda: self._run_agentic_discovery(company_name, job_description)
+                    )
+                except DiscoveryLeaseTimeout as e:
+                    return {"error": str(e)}
             finally:
                 if company_name in self._active_discoveries:
                     del self._active_discoveries[company_name]
@@ -0,0 +1,292 @@
+"""
+JSON Grammar
+Incremental matcher for schema-constrained decoding with the local model.
+
+`JSONSchemaMatcher` consumes generated text one character at a time and rejects the first
+character that could not lead to a document valid under a JSON schema (the subset pydantic
+emits for llm_schemas models: object / array / string / number / boolean / null, `anyOf`,
+`properties`, `required`, `additionalProperties`, array `items`). The local generator asks a
+cloned matcher whether each candidate token fits and only lets the best-scoring one that
+does through, so a completed generation always parses and validates.
+
+Constraints beyond plain JSON:
+- keys of objects with declared `properties` must be declared, unseen keys
+- `}` is only accepted once every `required` key is present
+- raw control characters inside strings are rejected (json.loads would fail on them)
+- at most MAX_WHITESPACE_RUN whitespace characters in a row between tokens, so the model
+  cannot pad forever instead of writing the document
+"""
+
+import re
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Tuple
+
+WHITESPACE = " \t\n\r"
+MAX_WHITESPACE_RUN = 24
+ALL_TYPES = frozenset({"object", "array", "string", "number", "boolean", "null"})
+# Characters tried when no candidate token fits and the generator has to force one
+FALLBACK_CHARS = [chr(c) for c in range(32, 127)] + ["\n"]
+
+_NUMBER = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?")
+_HEX = set("0123456789abcdefABCDEF")
+_ESCAPES = set('"\\/bfnrt')
+_LITERAL_TYPES = {"true": "boolean", "false": "boolean", "null": "null"}
+
+
+def schema_types(schema: Any) -> FrozenSet[str]:
+    """JSON types a (sub)schema accepts; an empty or `true` schema accepts anything."""
+    if not isinstance(schema, dict) or not schema:
+        return ALL_TYPES
+    if "anyOf" in schema:
+        return frozenset().union(*(schema_types(s) for s in schema["anyOf"]))
+    kind = schema.get("type")
+    if kind is None:
+        return frozenset({"object"}) if "properties" in schema else ALL_TYPES
+    kinds = {kind} if isinstance(kind, str) else set(kind)
+    return frozenset("number" if k == "integer" else k for k in kinds)
+
+
+def schema_branch(schema: Any, kind: str) -> Dict[str, Any]:
+    """The part of a schema that applies once the value is known to be of `kind`."""
+    if isinstance(schema, dict) and "anyOf" in schema:
+        for option in schema["anyOf"]:
+            if kind in schema_types(option):
+                return schema_branch(option, kind)
+    return schema if isinstance(schema, dict) else {}
+
+
+class JSONSchemaMatcher:
+    """Character-level pushdown matcher. `feed` is all-or-nothing; use `clone` to try text out."""
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        self.stack: List[Dict[str, Any]] = [{"kind": "value", "schema": schema}]
+        self.whitespace_run = 0
+
+    @property
+    def complete(self) -> bool:
+        return not self.stack
+
+    def clone(self) -> "JSONSchemaMatcher":
+        other = JSONSchemaMatcher.__new__(JSONSchemaMatcher)
+        other.schema = self.schema
+        other.stack = [dict(frame) for frame in self.stack]  # frame values are immutable
+        other.whitespace_run = self.whitespace_run
+        return other
+
+    def accepts(self, text: str) -> bool:
+        """True if `text` can follow what has been fed so far (state unchanged)."""
+        return self.clone().feed(text)
+
+    def allowed_chars(self, candidates: List[str] = None) -> List[str]:
+        return [ch for ch in (candidates or FALLBACK_CHARS) if self.accepts(ch)]
+
+    def feed(self, text: str) -> bool:
+        """Advances over `text`. On rejection the matcher is left mid-way; feed a clone to test."""
+        for ch in text:
+            if not self._step(ch):
+                return False
+        return True
+
+    # --- Internals ---
+
+    def _space(self, ch: str) -> bool:
+        if ch in WHITESPACE:
+            self.whitespace_run += 1
+            return self.whitespace_run <= MAX_WHITESPACE_RUN
+        self.whitespace_run = 0
+        return False
+
+    def _finish_value(self):
+        """Pops a finished value; the parent container was already moved to its 'next' state."""
+        self.stack.pop()
+
+    def _step(self, ch: str) -> bool:
+        if not self.stack:
+            return self._space(ch)  # Only trailing whitespace after the document
+        frame = self.stack[-1]
+        kind = frame["kind"]
+
+        if kind == "string":
+            return self._string(frame, ch)
+        if kind == "number":
+            candidate = frame["text"] + ch
+            if _NUMBER.fullmatch(candidate) or _NUMBER.fullmatch(candidate + "0"):
+                frame["text"] = candidate
+                return True
+            if not _NUMBER.fullmatch(frame["text"]):
+                return False
+            self._finish_value()
+            return self._step(ch)  # The terminator belongs to the parent
+        if kind == "literal":
+            if not frame["rest"] or frame["rest"][0] != ch:
+                return False
+            frame["rest"] = frame["rest"][1:]
+            if not frame["rest"]:
+                self._finish_value()
+            return True
+
+        if self._space(ch):
+            return True
+        if ch in WHITESPACE:
+            return False  # Whitespace run too long
+        if kind == "value":
+            return self._start_value(frame, ch)
+        if kind == "object":
+            return self._object(frame, ch)
+        if kind == "array":
+            return self._array(frame, ch)
+        return False
+
+    def _start_value(self, frame: Dict[str, Any], ch: str) -> bool:
+        schema = frame["schema"]
+        types = schema_types(schema)
+        if ch == "{" and "object" in types:
+            branch = schema_branch(schema, "object")
+            properties = branch.get("properties")
+            frame.update(kind="object", schema=branch, state="open", seen=frozenset(), key=None,
+                         keys=frozenset(properties) if properties else None,
+                         required=frozenset(branch.get("required", ())))
+            return True
+        if ch == "[" and "array" in types:
+            frame.update(kind="array", schema=schema_branch(schema, "array"), state="open")
+            return True
+        if ch == '"' and "string" in types:
+            frame.update(kind="string", escape=None, text=None, keys=None)
+            return True
+        if (ch == "-" or ch in "0123456789") and "number" in types:
+            frame.update(kind="number", text=ch)
+            return True
+        for literal, literal_type in _LITERAL_TYPES.items():
+            if ch == literal[0] and literal_type in types:
+                frame.update(kind="literal", rest=literal[1:])
+                return True
+        return False
+
+    def _object(self, frame: Dict[str, Any], ch: str) -> bool:
+        state = frame["state"]
+        if state in ("open", "key") and ch == '"':
+            remaining = None if frame["keys"] is None else frame["keys"] - frame["seen"]
+            if remaining is not None and not remaining:
+                return False
+            frame["state"] = "colon"
+            self.stack.append({"kind": "string", "escape": None, "text": "", "keys": remaining, "seen": frame["seen"]})
+            return True
+        if state in ("open", "next") and ch == "}":
+            if state == "open" and frame["required"]:
+                return False
+            if not frame["required"] <= frame["seen"]:
+                return False
+            self._finish_value()
+            return True
+        if state == "colon" and ch == ":":
+            key = frame["key"]
+            schema = frame["schema"]
+            if key in (schema.get("properties") or {}):
+                value_schema = schema["properties"][key]
+            else:
+                extra = schema.get("additionalProperties", True)
+                value_schema = extra if isinstance(extra, dict) else {}
+            frame["state"] = "next"
+            self.stack.append({"kind": "value", "schema": value_schema})
+            return True
+        if state == "next" and ch == ",":
+            if frame["keys"] is not None and not (frame["keys"] - frame["seen"]):
+                return False  # Every declared key is already present
+            frame["state"] = "key"
+            return True
+        return False
+
+    def _array(self, frame: Dict[str, Any], ch: str) -> bool:
+        state = frame["state"]
+        if state in ("open", "next") and ch == "]":
+            self._finish_value()
+            return True
+        if state == "next" and ch == ",":
+            frame["state"] = "item"
+            return True
+        if state in ("open", "item"):
+            frame["state"] = "next"
+            item = {"kind": "value", "schema": frame["schema"].get("items", {})}
+            self.stack.append(item)
+            if not self._start_value(item, ch):
+                return False
+            return True
+        return False
+
+    def _string(self, frame: Dict[str, Any], ch: str) -> bool:
+        is_key = frame["text"] is not None
+        escape = frame["escape"]
+        if escape is not None:
+            if escape == "":
+                if ch == "u":
+                    frame["escape"] = "u"
+                elif ch in _ESCAPES:
+                    frame["escape"] = None
+                else:
+                    return False
+            else:
+                if ch not in _HEX:
+                    return False
+                frame["escape"] = None if len(escape) == 4 else escape + ch
+            if is_key:
+                if frame["keys"] is not None:
+                    return False  # Declared keys are plain text
+                frame["text"] += ch
+            return True
+        if ch == '"':
+            if is_key:
+                return self._close_key(frame)
+            self._finish_value()
+            return True
+        if ord(ch) < 0x20:
+            return False
+        if ch == "\\":
+            if is_key and frame["keys"] is not None:
+                return False
+            frame["escape"] = ""
+            if is_key:
+                frame["text"] += ch
+            return True
+        if is_key:
+            text = frame["text"] + ch
+            if frame["keys"] is not None and not any(k.startswith(text) for k in frame["keys"]):
+                return False
+            frame["text"] = text
+        return True
+
+    def _close_key(self, frame: Dict[str, Any]) -> bool:
+        key = frame["text"]
+        if not key or key in frame["seen"]:
+            return False
+        if frame["keys"] is not None and key not in frame["keys"]:
+            return False
+        self.stack.pop()
+        parent = self.stack[-1]
+        parent["key"] = key
+        parent["seen"] = parent["seen"] | {key}
+        return True
+
+
+def constrained_choice(
+    grammar: JSONSchemaMatcher,
+    ranked_tokens: Iterable[int],
+    token_text: Callable[[int], str],
+    char_tokens: Dict[str, int],
+    score: Callable[[int], float],
+    eos_token: int
+) -> Tuple[int, bool]:
+    """
+    Picks the next token for a constrained row: the first of `ranked_tokens` (best first) whose text
+    the grammar accepts, EOS once the document is complete. If none fits, the best-scoring
+    single-character token the grammar allows is forced. Returns (token, forced).
+    """
+    if grammar.complete:
+        return eos_token, False
+    for token in ranked_tokens:
+        text = token_text(token)
+        if text and grammar.accepts(text):
+            return token, False
+    allowed = [char_tokens[ch] for ch in grammar.allowed_chars() if ch in char_tokens]
+    if not allowed:
+        return eos_token, True
+    return max(allowed, key=score), True
@@ -0,0 +1,450 @@
+"""
+LLM Backends
+Pluggable transport behind GeminiService._generate, selected with LLM_BACKEND:
+
+- gemini : the real google-genai client (GEMINI_BASE_URL can point it at scripts/fake_gemini_server.py)
+- fake   : in-process stand-in with configurable latency and canned, schema-valid output per prompt type
+- record : calls Gemini and appends every request/response pair to a cassette file (LLM_CASSETTE)
+- replay : serves responses from a cassette deterministically, never touching the network
+
+Together they let us load-test and benchmark the orchestration (task graph, cache,
+SSE, LangGraph nodes) without spending Gemini quota.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import random
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .llm_cache import request_fingerprint
+from .transcript_budget import estimate_tokens
+
+
+@dataclass
+class LLMUsage:
+    prompt_token_count: Optional[int] = None
+    candidates_token_count: Optional[int] = None
+
+
+@dataclass
+class LLMResponse:
+    """Minimal stand-in for a genai GenerateContentResponse (what _generate reads from it)."""
+    text: str
+    usage_metadata: Optional[LLMUsage] = field(default=None)
+
+
+class LLMBackend:
+    """Interface: `generate` returns one response, `stream` yields response chunks."""
+    name = "base"
+
+    async def generate(self, model: str, contents, config=None, call_type: str = None):
+        raise NotImplementedError
+
+    async def stream(self, model: str, contents, config=None, call_type: str = None) -> AsyncIterator[Any]:
+        raise NotImplementedError
+        yield
+
+
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+
+    def __init__(self, client):
+        self.client = client
+
+    def _require_client(self):
+        if self.client is None:
+            raise RuntimeError("Gemini client is not configured (GEMINI_API_KEY missing).")
+
+    async def generate(self, model, contents, config=None, call_type=None):
+        self._require_client()
+        return await self.client.aio.models.generate_content(model=model, contents=contents, config=config)
+
+    async def stream(self, model, contents, config=None, call_type=None):
+        self._require_client()
+        stream = await self.client.aio.models.generate_content_stream(model=model, contents=contents, config=config)
+        async for chunk in stream:
+            yield chunk
+
+
+# --- Fake backend ---
+
+def prompt_text(contents, config=None) -> str:
+    """Flattens prompt strings / genai Content lists (+ system instruction) into plain text."""
+    def flatten(value) -> List[str]:
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value]
+        if isinstance(value, (list, tuple)):
+            return [t for item in value for t in flatten(item)]
+        if isinstance(value, dict):
+            return flatten(value.get("text")) + flatten(value.get("parts"))
+        return flatten(getattr(value, "text", None)) + flatten(getattr(value, "parts", None))
+
+    texts = flatten(getattr(config, "system_instruction", None)) + flatten(contents)
+    return "\n".join(texts)
+
+
+# Distinctive phrases of every prompt in gemini_service / intelligence_service, in match order.
+# Only needed when the caller's call_type is unknown (e.g. requests arriving at the REST stand-in).
+PROMPT_MARKERS = [
+    ("supposed to be a single JSON object", "repair"),
+    ("ATS Optimization Expert", "resume_analysis"),
+    ("RATING CRITERIA", "evaluate_answer"),
+    ("Executive Scorecard", "master_report"),
+    ("7-Day Learning Roadmap", "learning_roadmap"),
+    ("running summary of a mock interview round", "transcript_summary"),
+    ("Analyze this company name", "router"),
+    ("Analyze these research snippets", "auditor"),
+    ("HYBRID INTELLIGENCE", "architect"),
+    ("Review this generated Interview Profile", "critic"),
+    ("Identify the industry for this Job Description", "industry_detection"),
+]
+
+REPAIR_SCHEMAS = {
+    "ResumeAnalysis": "resume_analysis",
+    "AnswerEvaluation": "evaluate_answer",
+    "Scorecard": "master_report",
+    "LearningRoadmap": "learning_roadmap",
+    "RouterDecision": "router",
+    "AuditResult": "auditor",
+    "CompanyProfile": "architect",
+}
+
+def classify_prompt(text: str) -> str:
+    for marker, call_type in PROMPT_MARKERS:
+        if marker in text:
+            if call_type == "repair":
+                schema = re.search(r"matching the (\w+) schema", text)
+                return REPAIR_SCHEMAS.get(schema.group(1), "generate_json") if schema else "generate_json"
+            return call_type
+    return "interview_question"
+
+
+# Canned output that validates against the matching llm_schemas model
+CANNED_RESPONSES: Dict[str, Any] = {
+    "resume_analysis": {
+        "ats_score": 78,
+        "strengths": ["Clear project impact", "Relevant tech stack", "Consistent progression"],
+        "weaknesses": ["Few metrics", "No leadership examples", "Generic summary"],
+        "tips": ["Quantify outcomes", "Mirror the JD keywords"]
+    },
+    "interview_question": "I am Adinath, simulating this round. Walk me through a recent project where you had to make a difficult trade-off. What did you choose and why?",
+    "transcript_summary": "Covered the candidate's background and one project trade-off; answers were concrete but light on metrics.",
+    "evaluate_answer": {
+        "score": 7.0,
+        "feedback": "Solid structure and a clear example, but the impact was not quantified.",
+        "executive_summary": "Competent answer at industry standard.",
+        "vibe_analysis": {"confidence_score": 7, "hesitation_level": "Low", "assertiveness": "Steady and direct.", "technical_depth": "Moderate"},
+        "star_analysis": {"has_situation": True, "has_task": True, "has_action": True, "has_result": False, "missing_parts": ["R"]},
+        "can_proceed": True
+    },
+    "master_report": {
+        "overall_score": 7.0,
+        "final_verdict": "HIRE",
+        "key_strengths": ["Structured answers", "Good fundamentals"],
+        "key_weaknesses": ["Limited quantified impact"],
+        "competency_breakdown": {"Technical Skills": 7, "Communication": 8, "Leadership": 6, "Problem Solving": 7},
+        "recruiter_closing_note": "Strong baseline; sharpen how you present results."
+    },
+    "learning_roadmap": {
+        "focus_areas": ["System design trade-offs"],
+        "curriculum": {"Day 1": "Fundamentals", "Day 2": "Fundamentals", "Day 3": "Advanced", "Day 4": "Advanced", "Day 5": "Scenarios", "Day 6": "Mock", "Day 7": "Review"},
+        "resources": ["Designing Data-Intensive Applications"]
+    },
+    "router": {
+        "is_ambiguous": False,
+        "suggested_query": "company interview process experience",
+        "detected_industry": "Technology",
+        "detected_location": None,
+        "reasoning": "Unambiguous company name."
+    },
+    "auditor": {
+        "is_identity_verified": True,
+        "is_location_matched": True,
+        "relevant_snippets": "Candidates report a recruiter screen, one technical round and a behavioral round.",
+        "audit_trail": ["KEPT: first-hand interview report"],
+        "confidence_boost": 10
+    },
+    "architect": {
+        "name": "Fake Corp",
+        "industry": "Technology",
+        "size": "Medium (1000-5000)",
+        "interview_style": "Structured, practical problem-solving",
+        "difficulty_level": "Medium",
+        "cultural_values": ["Ownership", "Customer focus"],
+        "intelligence_reconciliation": "EXPERT INSIGHT: JD and industry data agree on a practical, hands-on bar.",
+        "interview_rounds": {
+            "Technical": {"focus": "Practical coding", "common_topics": ["APIs", "Data structures"], "style": "Collaborative", "tips": "Think aloud."},
+            "Behavioral": {"focus": "Ownership", "common_questions": ["Tell me about a failure."], "style": "STAR"}
+        },
+        "red_flags": ["Blaming others"],
+        "average_process_duration": "2-3 weeks",
+        "interview_count": "3",
+        "role_company_alignment": "The role is core to the product. It maps directly to the company's engineering needs."
+    },
+    "critic": "APPROVED",
+    "industry_detection": "Tech",
+    "generate_json": {},
+    "generate_text": "OK",
+}
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parses a latency distribution spec (seconds) into a sampler:
+    "fixed:0.5", "uniform:0.2,1.0", "normal:1.0,0.2", "lognormal:0.8,0.5" (median, sigma).
+    """
+    kind, _, args = (spec or "fixed:0").strip().partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()] if args else []
+    kind = kind.lower()
+    if kind == "fixed":
+        return lambda rng: values[0] if values else 0.0
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+
+def parse_latency_map(spec: str) -> Dict[str, Callable[[random.Random], float]]:
+    """'lognormal:0.8,0.4;evaluate_answer=normal:2,0.5' → {'default': ..., 'evaluate_answer': ...}"""
+    samplers = {"default": parse_latency("fixed:0")}
+    for part in (spec or "").split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        call_type, sep, dist = part.partition("=")
+        if sep:
+            samplers[call_type.strip()] = parse_latency(dist)
+        else:
+            samplers["default"] = parse_latency(part)
+    return samplers
+
+
+class FakeBackend(LLMBackend):
+    """In-process Gemini stand-in: sampled latency + canned output per prompt type."""
+    name = "fake"
+
+    def __init__(self, latency: str = "fixed:0", seed: int = None, responses: Dict[str, Any] = None, chunk_chars: int = 24, first_token_fraction: float = 0.3, error_rate: float = 0.0, rate_limit_share: float = 0.5):
+        self.latency = parse_latency_map(latency)
+        # Fault injection: fraction of calls that fail, and how many of those are 429s (rest are 503s)
+        self.error_rate = error_rate
+        self.rate_limit_share = rate_limit_share
+        self.responses = {**CANNED_RESPONSES, **(responses or {})}
+        self.chunk_chars = chunk_chars
+        self.first_token_fraction = first_token_fraction
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "FakeBackend":
+        seed = os.getenv("LLM_FAKE_SEED")
+        return cls(
+            latency=os.getenv("LLM_FAKE_LATENCY", "lognormal:0.8,0.4"),
+            seed=int(seed) if seed else None,
+            error_rate=float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))
+        )
+
+    def resolve_call_type(self, text: str, call_type: str = None) -> str:
+        if call_type and call_type.endswith("_repair"):
+            call_type = call_type[:-len("_repair")]
+        if call_type in self.responses and call_type not in ("generate_json", "generate_text"):
+            return call_type
+        return classify_prompt(text)
+
+    def respond(self, text: str, call_type: str = None) -> str:
+        call_type = self.resolve_call_type(text, call_type)
+        with self._lock:
+            self.calls[call_type] = self.calls.get(call_type, 0) + 1
+        canned = self.responses.get(call_type, "")
+        return canned if isinstance(canned, str) else json.dumps(canned)
+
+    def sample_latency(self, call_type: str = None) -> float:
+        sampler = self.latency.get(call_type) or self.latency["default"]
+        with self._lock:
+            return sampler(self._rng)
+
+    def sample_error(self) -> Optional[int]:
+        """HTTP status of an injected failure (429 or 503), or None."""
+        with self._lock:
+            if self.error_rate <= 0 or self._rng.random() >= self.error_rate:
+                return None
+            return 429 if self._rng.random() < self.rate_limit_share else 503
+
+    def _raise_injected(self):
+        code = self.sample_error()
+        if code is None:
+            return
+        from google.genai import errors
+        status = "RESOURCE_EXHAUSTED" if code == 429 else "UNAVAILABLE"
+        error_cls = errors.ClientError if code == 429 else errors.ServerError
+        raise error_cls(code, {"error": {"code": code, "message": f"Injected by fake backend ({status})", "status": status}})
+
+    def chunks(self, text: str) -> List[str]:
+        return [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or [""]
+
+    async def generate(self, model, contents, config=None, call_type=None):
+        text_in = prompt_text(contents, config)
+        call_type = self.resolve_call_type(text_in, call_type)
+        await asyncio.sleep(self.sample_latency(call_type))
+        self._raise_injected()
+        text = self.respond(text_in, call_type)
+        return LLMResponse(text=text, usage_metadata=LLMUsage(estimate_tokens(text_in), estimate_tokens(text)))
+
+    async def stream(self, model, contents, config=None, call_type=None):
+        text_in = prompt_text(contents, config)
+        call_type = self.resolve_call_type(text_in, call_type)
+        latency = self.sample_latency(call_type)
+        text = self.respond(text_in, call_type)
+        parts = self.chunks(text)
+        await asyncio.sleep(latency * self.first_token_fraction)
+        self._raise_injected()
+        gap = latency * (1 - self.first_token_fraction) / len(parts)
+        for i, part in enumerate(parts):
+            if i:
+                await asyncio.sleep(gap)
+            last = i == len(parts) - 1
+            yield LLMResponse(text=part, usage_metadata=LLMUsage(estimate_tokens(text_in), estimate_tokens(text)) if last else None)
+
+
+# --- Record / replay ---
+
+_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}")
+
+def cassette_key(model: str, contents, config=None, call_type: str = None) -> str:
+    """request_fingerprint with wall-clock timestamps masked, so recorded prompts replay on another day."""
+    if getattr(config, "system_instruction", None) is not None:
+        # The system instruction is part of prompt_text (masked) below
+        config = config.model_copy(update={"system_instruction": None})
+    return request_fingerprint(model, _TIMESTAMP.sub("<time>", prompt_text(contents, config)), config, call_type)
+
+
+def _usage_dict(response) -> Dict[str, Optional[int]]:
+    metadata = getattr(response, "usage_metadata", None)
+    return {
+        "prompt_tokens": getattr(metadata, "prompt_token_count", None),
+        "output_tokens": getattr(metadata, "candidates_token_count", None)
+    }
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class RecordingBackend(LLMBackend):
+    """Wraps another backend and appends every request/response pair to a JSONL cassette."""
+    name = "record"
+
+    def __init__(self, inner: LLMBackend, cassette_path: str):
+        self.inner = inner
+        self.cassette_path = cassette_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(cassette_path)), exist_ok=True)
+
+    def _append(self, model, contents, config, call_type, text, usage, started):
+        entry = {
+            "key": cassette_key(model, contents, config, call_type),
+            "call_type": call_type,
+            "model": model,
+            "prompt_preview": prompt_text(contents, config)[:200],
+            "text": text,
+            "usage": usage,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+        with self._lock:
+            with open(self.cassette_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    async def generate(self, model, contents, config=None, call_type=None):
+        started = time.perf_counter()
+        response = await self.inner.generate(model, contents, config, call_type)
+        await asyncio.to_thread(self._append, model, contents, config, call_type, response.text or "", _usage_dict(response), started)
+        return response
+
+    async def stream(self, model, contents, config=None, call_type=None):
+        started = time.perf_counter()
+        parts, usage = [], {}
+        async for chunk in self.inner.stream(model, contents, config, call_type):
+            if getattr(chunk, "usage_metadata", None) is not None:
+                usage = _usage_dict(chunk)
+            if chunk.text:
+                parts.append(chunk.text)
+            yield chunk
+        await asyncio.to_thread(self._append, model, contents, config, call_type, "".join(parts), usage, started)
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Serves recorded responses. Identical requests recorded several times are replayed
+    in recording order (the last one repeats). Set `replay_latency` to sleep the recorded latency.
+    """
+    name = "replay"
+
+    def __init__(self, cassette_path: str, replay_latency: bool = False, chunk_chars: int = 24):
+        self.cassette_path = cassette_path
+        self.replay_latency = replay_latency
+        self.chunk_chars = chunk_chars
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(cassette_path):
+            with open(cassette_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], []).append(entry)
+        print(f"INFO: Replay backend loaded {sum(len(v) for v in self._entries.values())} recorded calls from {cassette_path}")
+
+    def _next(self, model, contents, config, call_type) -> Dict[str, Any]:
+        key = cassette_key(model, contents, config, call_type)
+        entries = self._entries.get(key)
+        if not entries:
+            raise CassetteMissError(f"No recorded response for {call_type or 'request'} ({key[:12]}) in {self.cassette_path}")
+        with self._lock:
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+        return entries[min(index, len(entries) - 1)]
+
+    async def generate(self, model, contents, config=None, call_type=None):
+        entry = self._next(model, contents, config, call_type)
+        if self.replay_latency:
+            await asyncio.sleep(entry.get("latency_ms", 0) / 1000)
+        usage = entry.get("usage") or {}
+        return LLMResponse(text=entry["text"], usage_metadata=LLMUsage(usage.get("prompt_tokens"), usage.get("output_tokens")))
+
+    async def stream(self, model, contents, config=None, call_type=None):
+        response = await self.generate(model, contents, config, call_type)
+        text = response.text
+        parts = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or [""]
+        for i, part in enumerate(parts):
+            yield LLMResponse(text=part, usage_metadata=response.usage_metadata if i == len(parts) - 1 else None)
+
+
+def create_llm_backend(client) -> LLMBackend:
+    """Builds the backend selected by LLM_BACKEND around the (possibly None) genai client."""
+    kind = os.getenv("LLM_BACKEND", "gemini").lower()
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cassette = os.getenv("LLM_CASSETTE", os.path.join(base_dir, "data", "cassettes", "default.jsonl"))
+
+    if kind == "gemini":
+        return GeminiBackend(client)
+    if kind == "fake":
+        print("INFO: LLM backend = FAKE (canned responses, no network).")
+        return FakeBackend.from_env()
+    if kind == "record":
+        print(f"INFO: LLM backend = RECORD → {cassette}")
+        return RecordingBackend(GeminiBackend(client), cassette)
+    if kind == "replay":
+        return ReplayBackend(cassette, replay_latency=os.getenv("LLM_REPLAY_LATENCY", "false").lower() == "true")
+    raise ValueError(f"Unknown LLM_BACKEND '{kind}' (expected gemini, fake, record or replay)")
@@ -0,0 +1,180 @@
+"""
+LLM Response Cache
+Two-tier cache (in-memory LRU + SQLite on disk) for deterministic Gemini calls.
+Caching is opt-in per call type: only call types listed in CACHE_TTLS are ever stored.
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+# Per call-type TTLs (seconds). Creative calls (interview questions) are deliberately absent.
+CACHE_TTLS = {
+    "router": 7 * 24 * 3600,
+    "auditor": 7 * 24 * 3600,
+    "critic": 7 * 24 * 3600,
+    "industry_detection": 30 * 24 * 3600,
+    "resume_analysis": 24 * 3600,
+}
+
+def _normalize(value):
+    """Turns prompt strings / genai types into a stable, whitespace-insensitive JSON-able value."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, type) and hasattr(value, "model_json_schema"):
+        # Response schema classes (llm_schemas) are keyed by their JSON schema
+        return value.model_json_schema()
+    if hasattr(type(value), "model_fields"):
+        # genai types (Content, GenerateContentConfig, ...) are pydantic models
+        return {k: _normalize(getattr(value, k)) for k in type(value).model_fields if getattr(value, k) is not None}
+    return value
+
+def request_fingerprint(model: str, contents, config=None, call_type: str = None) -> str:
+    """Stable hash of a Gemini request (model + normalized prompt + config)."""
+    payload = {
+        "call_type": call_type,
+        "model": model,
+        "contents": _normalize(contents),
+        "config": _normalize(config),
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, db_path: str = None, max_entries: int = 512, ttls: Dict[str, int] = None):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.db_path = db_path or os.path.join(base_dir, "data", "llm_cache.sqlite3")
+        self.max_entries = max_entries
+        self.ttls = ttls if ttls is not None else CACHE_TTLS
+
+        self._memory = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._counters = {}
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, call_type TEXT, value TEXT, expires_at REAL)"
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+
+    def is_cacheable(self, call_type: str) -> bool:
+        return bool(call_type) and call_type in self.ttls
+
+    def _count(self, call_type: str, field: str):
+        stats = self._counters.setdefault(call_type, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        stats[field] += 1
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        """Insert into the LRU tier, evicting the least recently used entry when full."""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_sync(self, call_type: str, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._count(call_type, "memory_hits")
+                    return value
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[1] > now:
+                self._remember(key, row[0], row[1])
+                self._count(call_type, "disk_hits")
+                return row[0]
+            if row:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+
+            self._count(call_type, "misses")
+            return None
+
+    def set_sync(self, call_type: str, key: str, value: str):
+        if not self.is_cacheable(call_type):
+            return
+        expires_at = time.time() + self.ttls[call_type]
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, call_type, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, call_type, value, expires_at)
+            )
+            self._conn.commit()
+
+    async def get(self, call_type: str, key: str) -> Optional[str]:
+        # SQLite lookups are blocking, keep them off the event loop
+        return await asyncio.to_thread(self.get_sync, call_type, key)
+
+    async def set(self, call_type: str, key: str, value: str):
+        await asyncio.to_thread(self.set_sync, call_type, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(c["memory_hits"] + c["disk_hits"] for c in self._counters.values())
+            misses = sum(c["misses"] for c in self._counters.values())
+            return {
+                "memory_entries": len(self._memory),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+                "by_call_type": {k: dict(v) for k, v in self._counters.items()},
+            }
+
+    def request_counts(self) -> Dict[Tuple[str, str], int]:
+        """{(call_type, "hit" | "miss"): count} for the llm_cache_requests_total counter."""
+        with self._lock:
+            counts = {}
+            for call_type, c in self._counters.items():
+                counts[(call_type, "hit")] = c["memory_hits"] + c["disk_hits"]
+                counts[(call_type, "miss")] = c["misses"]
+            return counts
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+# Singleton
+_llm_cache = None
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Returns the shared cache, or None when disabled via LLM_CACHE_ENABLED=false."""
+    global _llm_cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    if _llm_cache is None:
+        try:
+            _llm_cache = LLMCache(
+                db_path=os.getenv("LLM_CACHE_PATH") or None,
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+            )
+        except Exception as e:
+            print(f"WARNING: LLM cache unavailable ({e}). Continuing without caching.")
+            return None
+    return _llm_cache
@@ -0,0 +1,130 @@
+"""
+Shared LLM JSON Parser
+One place to turn raw model output (Gemini or local Llama) into a validated dict.
+Handles markdown fences and prose around the JSON, and validates against an
+llm_schemas model when one is given.
+"""
+
+import json
+from typing import Any, Dict, Optional, Type
+from pydantic import BaseModel, ValidationError
+
+
+class LLMJSONError(ValueError):
+    """Raised when model output cannot be parsed/validated as the expected JSON."""
+    def __init__(self, message: str, raw_text: str = ""):
+        super().__init__(message)
+        self.raw_text = raw_text
+
+
+def extract_json_text(text: str) -> str:
+    """
+    Returns the first balanced JSON object/array in `text`.
+    Works for bare JSON, ```json fenced blocks, and JSON surrounded by prose.
+    """
+    if not text:
+        raise LLMJSONError("Empty model output.", text or "")
+
+    start = None
+    for i, ch in enumerate(text):
+        if ch in "{[":
+            start = i
+            break
+    if start is None:
+        raise LLMJSONError("No JSON object found in model output.", text)
+
+    stack = []
+    in_string = False
+    escaped = False
+    pairs = {"{": "}", "[": "]"}
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in pairs:
+            stack.append(pairs[ch])
+        elif ch in "}]":
+            if not stack or stack.pop() != ch:
+                raise LLMJSONError("Unbalanced JSON brackets in model output.", text)
+            if not stack:
+                return text[start:i + 1]
+
+    raise LLMJSONError("Truncated JSON in model output.", text)
+
+
+class JSONCompletionTracker:
+    """
+    Incremental version of extract_json_text for streamed output: feed() text as it is
+    generated and it returns True once the first JSON object/array is balanced.
+    Lets local generation stop at the closing brace instead of running to max_new_tokens.
+    """
+    _pairs = {"{": "}", "[": "]"}
+
+    def __init__(self):
+        self.started = False
+        self.complete = False
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> bool:
+        for ch in text:
+            if self.complete:
+                break
+            if not self.started:
+                if ch in self._pairs:
+                    self.started = True
+                    self._stack.append(self._pairs[ch])
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in self._pairs:
+                self._stack.append(self._pairs[ch])
+            elif ch in "}]":
+                # A mismatched closer is left for parse_llm_json to reject; generation just goes on
+                if self._stack and self._stack[-1] == ch:
+                    self._stack.pop()
+                    self.complete = not self._stack
+        return self.complete
+
+
+def parse_llm_json(text: str, schema: Optional[Type[BaseModel]] = None) -> Dict[str, Any]:
+    """Parses (and optionally validates) model output. Raises LLMJSONError on failure."""
+    json_text = extract_json_text(text)
+    try:
+        data = json.loads(json_text)
+    except json.JSONDecodeError as e:
+        raise LLMJSONError(f"Invalid JSON: {e}", text)
+
+    if schema is None:
+        return data
+    if not isinstance(data, dict):
+        raise LLMJSONError(f"Expected a JSON object for {schema.__name__}.", text)
+    try:
+        return schema.model_validate(data).model_dump(by_alias=True)
+    except ValidationError as e:
+        raise LLMJSONError(f"Schema validation failed for {schema.__name__}: {e}", text)
+
+
+def is_valid_llm_json(text: str, schema: Optional[Type[BaseModel]] = None) -> bool:
+    try:
+        parse_llm_json(text, schema)
+        return True
+    except LLMJSONError:
+        return False
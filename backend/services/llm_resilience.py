@@ -0,0 +1,263 @@
+"""
+LLM Resilience Layer
+Wraps every Gemini attempt made by GeminiService._generate:
+
+1. Jittered exponential retry for transient failures (429, 5xx, timeouts, network errors).
+2. AIMD concurrency limiter: the in-flight limit grows by ~1 per window of successes and
+   is halved on rate-limit responses, replacing the fixed semaphore.
+3. Circuit breaker: after repeated transient failures, calls fail fast for a cool-down
+   period instead of piling up behind a slow upstream; one probe call closes it again.
+4. Pluggable fallbacks per call type (e.g. the local Llama path in IntelligenceService)
+   used when the breaker is open or retries are exhausted.
+"""
+
+import os
+import time
+import random
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    from google.genai import errors as genai_errors
+except ImportError:
+    genai_errors = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+TRANSIENT_ERRORS = {"rate_limit", "server", "timeout", "network"}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when Gemini is marked unhealthy and no fallback produced a result."""
+    def __init__(self, message: str, retry_after: float = 0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def classify_error(error: BaseException) -> str:
+    """Maps an exception to rate_limit / server / timeout / network / client / other."""
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if genai_errors is not None and isinstance(error, genai_errors.APIError):
+        code = getattr(error, "code", None) or 0
+        if code == 429 or getattr(error, "status", None) == "RESOURCE_EXHAUSTED":
+            return "rate_limit"
+        if code >= 500:
+            return "server"
+        return "client"
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return "network"
+    if isinstance(error, (ConnectionError, OSError)):
+        return "network"
+    return "other"
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = None, base_delay: float = None, max_delay: float = None, rng: random.Random = None):
+        self.max_attempts = max(1, max_attempts if max_attempts is not None else int(os.getenv("GEMINI_RETRY_ATTEMPTS", "3")))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv("GEMINI_RETRY_BASE_DELAY", "0.5"))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv("GEMINI_RETRY_MAX_DELAY", "8"))
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt: int, kind: str = None) -> float:
+        """Full-jitter backoff; rate limits back off one step further than other failures."""
+        exponent = attempt + (1 if kind == "rate_limit" else 0)
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** exponent)))
+
+
+class AIMDLimiter:
+    """
+    Adaptive in-flight limit. Waiters are plain futures from the running loop, so the
+    singleton can be shared by requests served on different event loops (e.g. TestClient).
+    """
+    def __init__(self, initial: int = None, min_limit: int = None, max_limit: int = None, decrease_factor: float = 0.5, cooldown_seconds: float = 1.0):
+        self.max_limit = max_limit if max_limit is not None else int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+        self.min_limit = max(1, min_limit if min_limit is not None else int(os.getenv("GEMINI_MIN_CONCURRENCY", "1")))
+        self.limit = float(min(self.max_limit, initial if initial is not None else self.max_limit))
+        self.decrease_factor = decrease_factor
+        self.cooldown_seconds = cooldown_seconds
+        self.in_flight = 0
+        self._waiters: List[asyncio.Future] = []
+        self._last_decrease = 0.0
+
+    def _capacity(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self):
+        """FIFO: a free slot is handed straight to the oldest waiter, so late callers cannot barge in."""
+        if self.in_flight < self._capacity() and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Cancelled after being handed a slot: pass it on instead of leaking it
+                self.in_flight = max(0, self.in_flight - 1)
+                self._wake()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, outcome: str = None):
+        """`outcome`: 'ok' grows the limit additively, 'rate_limit' shrinks it multiplicatively."""
+        self.in_flight = max(0, self.in_flight - 1)
+        if outcome == "ok":
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / max(self.limit, 1.0))
+        elif outcome == "rate_limit":
+            now = time.monotonic()
+            # One burst of 429s from the same window only halves the limit once
+            if now - self._last_decrease >= self.cooldown_seconds:
+                self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+                self._last_decrease = now
+                print(f"WARNING: Gemini rate limited. Concurrency limit lowered to {self._capacity()}.")
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self._capacity():
+            waiter = self._waiters.pop(0)
+            if not waiter.done():
+                self.in_flight += 1  # The slot belongs to the waiter from here on
+                waiter.set_result(None)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+        self.failure_threshold = failure_threshold if failure_threshold is not None else int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5"))
+        self.reset_timeout = reset_timeout if reset_timeout is not None else float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)) if self.state == "open" else 0.0
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if self.retry_after() > 0:
+                return False
+            self.state = "half_open"
+            self._probe_in_flight = False
+        # half_open: exactly one probe at a time
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def release_probe(self):
+        """The probe was cancelled before it could report: let the next call probe instead."""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        if self.state != "closed":
+            print("INFO: Gemini circuit closed (probe succeeded).")
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            print(f"WARNING: Gemini circuit OPEN after {self.failures} failures. Failing fast for {self.reset_timeout:.0f}s.")
+
+
+Fallback = Callable[[Any, Any, str], Awaitable[Optional[str]]]
+
+
+class LLMResilience:
+    def __init__(self, retry: RetryPolicy = None, limiter: AIMDLimiter = None, breaker: CircuitBreaker = None):
+        self.retry = retry or RetryPolicy()
+        self.limiter = limiter or AIMDLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self._fallbacks: Dict[str, Fallback] = {}
+        self._stats = {"calls": 0, "retries": 0, "failures": 0, "fast_failures": 0, "fallbacks": 0}
+
+    def register_fallback(self, call_types, fallback: Fallback):
+        """`fallback(contents, config, call_type)` returns text, or None to give up."""
+        for call_type in ([call_types] if isinstance(call_types, str) else call_types):
+            self._fallbacks[call_type] = fallback
+
+    async def _fallback_or_raise(self, call_type: str, contents, config, error: BaseException) -> Tuple[str, bool]:
+        fallback = self._fallbacks.get(call_type)
+        if fallback is not None:
+            try:
+                text = await fallback(contents, config, call_type)
+            except Exception as e:
+                print(f"WARNING: Fallback for {call_type} failed: {e}")
+                text = None
+            if text:
+                self._stats["fallbacks"] += 1
+                print(f"INFO: {call_type} served by fallback ({type(error).__name__}).")
+                return text, True
+        raise error
+
+    async def call(self, attempt: Callable[[], Awaitable[str]], call_type: str, timeout: float, contents=None, config=None, can_retry: Callable[[], bool] = None) -> Tuple[str, bool]:
+        """
+        Runs `attempt()` under the limiter, timeout, retry policy and breaker.
+        Returns (text, served_by_fallback). `can_retry()` lets streaming callers refuse
+        a retry once chunks were already emitted.
+        """
+        self._stats["calls"] += 1
+        if not self.breaker.allow():
+            self._stats["fast_failures"] += 1
+            error = CircuitOpenError("Gemini is temporarily unavailable (circuit open).", self.breaker.retry_after())
+            return await self._fallback_or_raise(call_type, contents, config, error)
+
+        try:
+            for attempt_no in range(self.retry.max_attempts):
+                await self.limiter.acquire()
+                outcome = None
+                try:
+                    result = await asyncio.wait_for(attempt(), timeout=timeout)
+                    outcome = "ok"
+                except Exception as e:
+                    kind = classify_error(e)
+                    outcome = kind
+                    if kind not in TRANSIENT_ERRORS:
+                        # Upstream answered (e.g. 400): healthy as far as the breaker is concerned
+                        self.breaker.record_success()
+                        raise
+                    self.breaker.record_failure()
+                    self._stats["failures"] += 1
+                    last_error = e
+                    last_kind = kind
+                finally:
+                    self.limiter.release(outcome)
+
+                if outcome == "ok":
+                    self.breaker.record_success()
+                    return result, False
+
+                is_last = attempt_no == self.retry.max_attempts - 1
+                if is_last or (can_retry is not None and not can_retry()) or not self.breaker.allow():
+                    break
+                self._stats["retries"] += 1
+                delay = self.retry.delay(attempt_no, last_kind)
+                print(f"WARNING: {call_type} failed ({last_kind}: {type(last_error).__name__}). Retry {attempt_no + 1} in {delay:.2f}s.")
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # A cancelled half-open probe never records an outcome; without this the breaker stays half-open for good
+            self.breaker.release_probe()
+            raise
+
+        return await self._fallback_or_raise(call_type, contents, config, last_error)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "concurrency_limit": self.limiter._capacity(),
+            "in_flight": self.limiter.in_flight,
+            "circuit": self.breaker.state
+        }
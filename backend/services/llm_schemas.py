@@ -0,0 +1,100 @@
+"""
+LLM Output Schemas
+Pydantic models describing every JSON document we ask Gemini (or the local model) for.
+They are used twice: as `response_schema` for constrained generation, and to validate
+the parsed output in llm_json.parse_llm_json.
+
+`gemini_schema = False` marks models with free-form keys (e.g. round names, "Day 1"),
+which the Gemini Developer API cannot constrain; those only get JSON mode + validation.
+"""
+
+from typing import ClassVar, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class LLMSchema(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    gemini_schema: ClassVar[bool] = True
+
+
+# --- Interview flow ---
+
+class ResumeAnalysis(LLMSchema):
+    ats_score: float
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+    tips: List[str] = []
+
+class VibeAnalysis(LLMSchema):
+    confidence_score: float
+    hesitation_level: str
+    assertiveness: str
+    technical_depth: str
+
+class StarAnalysis(LLMSchema):
+    has_situation: bool
+    has_task: bool
+    has_action: bool
+    has_result: bool
+    missing_parts: List[str] = []
+
+class AnswerEvaluation(LLMSchema):
+    score: float = Field(ge=0, le=10)
+    feedback: str
+    executive_summary: str
+    vibe_analysis: VibeAnalysis
+    star_analysis: StarAnalysis
+    can_proceed: bool
+
+class CompetencyBreakdown(LLMSchema):
+    technical_skills: float = Field(alias="Technical Skills")
+    communication: float = Field(alias="Communication")
+    leadership: float = Field(alias="Leadership")
+    problem_solving: float = Field(alias="Problem Solving")
+
+class Scorecard(LLMSchema):
+    overall_score: float
+    final_verdict: str
+    key_strengths: List[str]
+    key_weaknesses: List[str]
+    competency_breakdown: CompetencyBreakdown
+    recruiter_closing_note: str
+
+class LearningRoadmap(LLMSchema):
+    gemini_schema: ClassVar[bool] = False
+    focus_areas: List[str]
+    curriculum: Dict[str, str]
+    resources: List[str] = []
+
+
+# --- Discovery agents ---
+
+class RouterDecision(LLMSchema):
+    is_ambiguous: bool
+    suggested_query: str
+    detected_industry: Optional[str] = None
+    detected_location: Optional[str] = None
+    reasoning: str = ""
+
+class AuditResult(LLMSchema):
+    is_identity_verified: bool
+    is_location_matched: bool
+    relevant_snippets: str
+    audit_trail: List[str] = []
+    confidence_boost: int = 0
+
+class CompanyProfile(LLMSchema):
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+    gemini_schema: ClassVar[bool] = False
+    name: str
+    industry: str
+    size: Optional[str] = None
+    interview_style: str
+    difficulty_level: Optional[str] = None
+    cultural_values: List[str] = []
+    intelligence_reconciliation: Optional[str] = None
+    interview_rounds: Dict[str, Dict]
+    red_flags: List[str] = []
+    average_process_duration: Optional[str] = None
+    interview_count: Optional[str] = None
+    role_company_alignment: Optional[str] = None
@@ -0,0 +1,366 @@
+"""
+Local Inference Worker
+Dynamic batching in front of the local fine-tuned Llama model.
+
+A single daemon thread owns the model. Callers enqueue prompts and await a future; the worker
+takes the first waiting request, keeps collecting for LOCAL_BATCH_WINDOW_MS (or until
+LOCAL_BATCH_MAX_SIZE prompts), and runs them as one left-padded generate() call. Concurrent
+architect calls therefore share one forward pass per token instead of contending for the
+same weights from several threads or queueing behind each other.
+
+Every request carries its own budget, checked after each generated token by a stopping
+criterion: a token limit, a deadline, a cancel flag (set when the caller gives up), and for
+JSON calls the moment the output forms a balanced object. A row that hits any of them stops;
+once every row in the batch has stopped, generate() returns and the CPU is free again.
+
+Requests can also carry a JSON schema: a logits processor then lets through only the
+best-scoring token that keeps the output valid under it (json_grammar.py), so a completed
+constrained generation always parses.
+
+Prompts can declare a static `prefix` (e.g. the architect's policy block). The generator
+encodes each distinct prefix once, keeps its past-key-values, and for later requests copies
+that cache and prefills only the variable suffix.
+
+The worker only needs a `generate_batch(requests) -> [(text, stop_reason)]` callable, so the
+batching logic runs (and is tested) without torch; TransformersBatchGenerator is the real one.
+"""
+
+import os
+import copy
+import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .llm_json import JSONCompletionTracker
+from .json_grammar import JSONSchemaMatcher, constrained_choice
+from .metrics import LOCAL_BATCH_SIZE, LOCAL_BATCH_SECONDS, LOCAL_PREFILL_TOKENS
+
+_STOP = object()
+
+
+class GenerationRequest:
+    """One prompt plus its budget. `check()` is called with each newly generated piece of text."""
+    def __init__(self, prompt: str, max_new_tokens: int = 450, time_budget: float = None, stop_on_json: bool = False, prefix: str = None, schema: Dict[str, Any] = None):
+        self.prompt = prompt
+        # Only a true prefix of the prompt can come from the KV-cache
+        self.prefix = prefix if prefix and prompt.startswith(prefix) and len(prompt) > len(prefix) else None
+        self.max_new_tokens = max_new_tokens
+        self.deadline = time.monotonic() + time_budget if time_budget else None
+        self.grammar = JSONSchemaMatcher(schema) if schema else None
+        self.stop_on_json = stop_on_json or self.grammar is not None
+        self.future: Future = Future()
+        self.stop_reason: Optional[str] = None
+        self._cancelled = threading.Event()
+        self._json = JSONCompletionTracker() if self.stop_on_json else None
+        self._tokens = 0
+
+    def cancel(self):
+        """Caller gave up: drop the request if queued, stop its row at the next token if running."""
+        self._cancelled.set()
+        self.future.cancel()
+
+    def check(self, new_text: str = "") -> Optional[str]:
+        """Feeds one step's output; returns why this row should stop (sticky once set), or None."""
+        if self.stop_reason is None:
+            self._tokens += 1
+            if self._cancelled.is_set():
+                self.stop_reason = "cancelled"
+            elif self._json is not None and self._json.feed(new_text):
+                self.stop_reason = "json_complete"
+            elif self._tokens >= self.max_new_tokens:
+                self.stop_reason = "max_tokens"
+            elif self.deadline is not None and time.monotonic() >= self.deadline:
+                self.stop_reason = "deadline"
+        return self.stop_reason
+
+
+def group_by_prefix(requests: List[GenerationRequest]) -> List[Tuple[Optional[str], List[int]]]:
+    """Splits a batch into rows sharing one prefix (indices kept in order); one generate() each."""
+    groups: Dict[Optional[str], List[int]] = {}
+    for i, request in enumerate(requests):
+        groups.setdefault(request.prefix, []).append(i)
+    return list(groups.items())
+
+
+class TransformersBatchGenerator:
+    """Greedy batched generation for a causal LM. Returns only the newly generated text per prompt."""
+    def __init__(self, model, tokenizer, repetition_penalty: float = 1.1, prefix_cache_size: int = None):
+        import torch
+        from transformers import StoppingCriteria, StoppingCriteriaList, LogitsProcessor, LogitsProcessorList, DynamicCache
+        self._torch = torch
+        self._new_cache = DynamicCache
+        self.model = model
+        self.tokenizer = tokenizer
+        self.repetition_penalty = repetition_penalty
+        # prefix text -> (prefix token ids, past-key-values); LRU so a changed prompt template ages out
+        self.prefix_cache_size = prefix_cache_size if prefix_cache_size is not None else int(os.getenv("LOCAL_PREFIX_CACHE_SIZE", "4"))
+        self._prefixes: "OrderedDict[str, Tuple[Any, Any]]" = OrderedDict()
+        self.prefix_stats = {"hits": 0, "misses": 0, "reused_tokens": 0, "prefilled_tokens": 0}
+        # Decoder-only models must be padded on the left so every prompt ends at the same position
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+        generator = self
+
+        class RequestBudgets(StoppingCriteria):
+            """Per-row stop flags: generate() ends once every row has hit EOS or its budget."""
+            def __init__(self, requests):
+                self.requests = requests
+
+            def __call__(self, input_ids, scores, **kwargs):
+                last = input_ids[:, -1].tolist()
+                done = [
+                    # Single-token decode keeps braces/quotes intact, which is all the JSON tracker needs
+                    request.check(generator.tokenizer.decode([token], skip_special_tokens=True)) is not None
+                    for request, token in zip(self.requests, last)
+                ]
+                return generator._torch.tensor(done, dtype=generator._torch.bool, device=input_ids.device)
+
+        class SchemaConstraint(LogitsProcessor):
+            """Greedy constrained decoding: each constrained row keeps only its best schema-valid token."""
+            def __init__(self, requests):
+                self.requests = requests
+                self.started = False
+
+            def __call__(self, input_ids, scores):
+                last = input_ids[:, -1].tolist() if self.started else None
+                self.started = True  # The first call sees the prompt's last token, not a generated one
+                for row, request in enumerate(self.requests):
+                    if request.grammar is None or request.stop_reason is not None:
+                        continue
+                    if last is not None:
+                        request.grammar.feed(generator._token_text(last[row]))
+                    token = generator._constrained_token(request.grammar, scores[row])
+                    scores[row] = float("-inf")
+                    scores[row, token] = 0.0
+                return scores
+
+        self._criteria = lambda requests: StoppingCriteriaList([RequestBudgets(requests)])
+        self._constraints = lambda requests: LogitsProcessorList([SchemaConstraint(requests)])
+        self._vocab_text: Optional[List[str]] = None
+        self._char_tokens: Dict[str, int] = {}
+        self.grammar_top_k = max(1, int(os.getenv("LOCAL_GRAMMAR_TOP_K", "48")))
+        self.grammar_stats = {"constrained_tokens": 0, "forced_tokens": 0}
+
+    def _vocab(self) -> List[str]:
+        if self._vocab_text is None:
+            # One decode per vocab entry, once; special tokens map to "" so the grammar never picks them
+            special = set(self.tokenizer.all_special_ids)
+            texts = self.tokenizer.batch_decode([[i] for i in range(len(self.tokenizer))], clean_up_tokenization_spaces=False)
+            self._vocab_text = ["" if i in special else text for i, text in enumerate(texts)]
+            for i, text in enumerate(self._vocab_text):
+                if len(text) == 1:
+                    self._char_tokens.setdefault(text, i)
+        return self._vocab_text
+
+    def _token_text(self, token: int) -> str:
+        vocab = self._vocab()
+        return vocab[token] if token < len(vocab) else ""  # The model's vocab can be padded past the tokenizer's
+
+    def _eos_token(self) -> int:
+        eos = getattr(self.model.generation_config, "eos_token_id", None)
+        if isinstance(eos, (list, tuple)):
+            eos = eos[0] if eos else None
+        return eos if eos is not None else self.tokenizer.eos_token_id
+
+    def _constrained_token(self, grammar: JSONSchemaMatcher, row_scores) -> int:
+        """Best of the top-k tokens the grammar accepts; a forced single character if none does."""
+        self._vocab()
+        ranked = self._torch.topk(row_scores, min(self.grammar_top_k, row_scores.shape[-1])).indices.tolist()
+        token, forced = constrained_choice(
+            grammar, ranked, self._token_text, self._char_tokens,
+            score=lambda t: row_scores[t].item(), eos_token=self._eos_token()
+        )
+        self.grammar_stats["constrained_tokens"] += 1
+        self.grammar_stats["forced_tokens"] += int(forced)
+        return token
+
+    def warm_prefix(self, prefix: str):
+        """Encodes a prefix ahead of the first request that uses it (e.g. right after the model loads)."""
+        self._prefix_state(prefix)
+
+    def _prefix_state(self, prefix: str):
+        if prefix in self._prefixes:
+            self._prefixes.move_to_end(prefix)
+            self.prefix_stats["hits"] += 1
+            return self._prefixes[prefix]
+        self.prefix_stats["misses"] += 1
+        prefix_ids = self.tokenizer(prefix, return_tensors="pt")["input_ids"].to(self.model.device)
+        with self._torch.no_grad():
+            cache = self.model(input_ids=prefix_ids, past_key_values=self._new_cache(), use_cache=True).past_key_values
+        self._prefixes[prefix] = (prefix_ids, cache)
+        while len(self._prefixes) > max(1, self.prefix_cache_size):
+            self._prefixes.popitem(last=False)
+        return prefix_ids, cache
+
+    def _inputs(self, requests: List[GenerationRequest], prefix: Optional[str]) -> Dict[str, Any]:
+        if prefix is None:
+            inputs = dict(self.tokenizer([r.prompt for r in requests], return_tensors="pt", padding=True).to(self.model.device))
+            self.prefix_stats["prefilled_tokens"] += int(inputs["attention_mask"].sum())
+            return inputs
+        prefix_ids, cache = self._prefix_state(prefix)
+        # Suffixes are tokenized on their own and appended, so the ids always start with the cached ones.
+        # Left padding lands between prefix and suffix; the mask hides it and positions skip it.
+        suffix = self.tokenizer([r.prompt[len(prefix):] for r in requests], return_tensors="pt", padding=True, add_special_tokens=False).to(self.model.device)
+        rows = len(requests)
+        past = copy.deepcopy(cache)  # generate() appends to the cache in place; the stored one stays clean
+        if rows > 1:
+            past.batch_repeat_interleave(rows)
+        self.prefix_stats["reused_tokens"] += prefix_ids.shape[1] * rows
+        self.prefix_stats["prefilled_tokens"] += int(suffix["attention_mask"].sum())
+        return {
+            "input_ids": self._torch.cat([prefix_ids.expand(rows, -1), suffix["input_ids"]], dim=1),
+            "attention_mask": self._torch.cat([self._torch.ones((rows, prefix_ids.shape[1]), dtype=suffix["attention_mask"].dtype, device=prefix_ids.device), suffix["attention_mask"]], dim=1),
+            "past_key_values": past,
+        }
+
+    def __call__(self, requests: List[GenerationRequest]) -> List[Tuple[str, str]]:
+        results: List[Optional[Tuple[str, str]]] = [None] * len(requests)
+        for prefix, indices in group_by_prefix(requests):
+            group = [requests[i] for i in indices]
+            for i, result in zip(indices, self._generate(group, prefix)):
+                results[i] = result
+        return results
+
+    def _generate(self, requests: List[GenerationRequest], prefix: Optional[str]) -> List[Tuple[str, str]]:
+        reused, prefilled = self.prefix_stats["reused_tokens"], self.prefix_stats["prefilled_tokens"]
+        inputs = self._inputs(requests, prefix)
+        LOCAL_PREFILL_TOKENS.inc(self.prefix_stats["reused_tokens"] - reused, kind="reused")
+        LOCAL_PREFILL_TOKENS.inc(self.prefix_stats["prefilled_tokens"] - prefilled, kind="prefilled")
+        if any(r.grammar is not None for r in requests):
+            inputs["logits_processor"] = self._constraints(requests)
+        with self._torch.no_grad():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=max(r.max_new_tokens for r in requests),
+                do_sample=False,          # Greedy: batching does not change the result
+                repetition_penalty=self.repetition_penalty,
+                use_cache=True,
+                pad_token_id=self.tokenizer.pad_token_id,
+                stopping_criteria=self._criteria(requests)
+            )
+        new_tokens = outputs[:, inputs["input_ids"].shape[1]:]
+        # Greedy decoding is prefix-stable: a shorter request's answer is a prefix of the batch's
+        return [
+            (self.tokenizer.decode(row[:r.max_new_tokens], skip_special_tokens=True).strip(), r.stop_reason or "eos")
+            for row, r in zip(new_tokens, requests)
+        ]
+
+
+class LocalInferenceWorker:
+    def __init__(
+        self,
+        generate_batch: Callable[[List[GenerationRequest]], List[Tuple[str, str]]],
+        max_batch_size: int = None,
+        batch_window: float = None
+    ):
+        self.generate_batch = generate_batch
+        self.max_batch_size = max(1, max_batch_size if max_batch_size is not None else int(os.getenv("LOCAL_BATCH_MAX_SIZE", "4")))
+        self.batch_window = batch_window if batch_window is not None else int(os.getenv("LOCAL_BATCH_WINDOW_MS", "50")) / 1000
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._stats = {"requests": 0, "batches": 0, "batched_prompts": 0, "cancelled": 0, "expired": 0, "errors": 0}
+        self._stop_reasons: Dict[str, int] = {}
+        self._thread = threading.Thread(target=self._run, name="local-inference", daemon=True)
+        self._thread.start()
+
+    # --- Client side ---
+
+    def submit(self, prompt: str, max_new_tokens: int = 450, time_budget: float = None, stop_on_json: bool = False, prefix: str = None, schema: Dict[str, Any] = None) -> GenerationRequest:
+        if not self._thread.is_alive():
+            raise RuntimeError("Local inference worker is stopped.")
+        request = GenerationRequest(prompt, max_new_tokens, time_budget, stop_on_json, prefix, schema)
+        self._stats["requests"] += 1
+        self._queue.put(request)
+        return request
+
+    async def generate(self, prompt: str, max_new_tokens: int = 450, timeout: float = None, stop_on_json: bool = False, prefix: str = None, schema: Dict[str, Any] = None) -> str:
+        """
+        Queues a prompt and awaits its text. `timeout` is the generation's time budget: a row still
+        running at the deadline stops and TimeoutError is raised. If the awaiting task is cancelled,
+        the row stops at its next token. `prefix` marks the static start of the prompt for KV reuse;
+        `schema` (a JSON schema) constrains decoding so the output is valid under it.
+        """
+        request = self.submit(prompt, max_new_tokens, timeout, stop_on_json, prefix, schema)
+        try:
+            # Small grace so the worker's own deadline check normally fires first
+            return await asyncio.wait_for(asyncio.wrap_future(request.future), None if timeout is None else timeout + 1.0)
+        finally:
+            if not request.future.done():
+                request.cancel()
+
+    def stop(self, timeout: float = 5.0):
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # --- Worker thread ---
+
+    def _collect(self, first: GenerationRequest) -> List[GenerationRequest]:
+        batch = [first]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)  # finish this batch, then stop
+                break
+            batch.append(item)
+        # Requests whose caller already gave up are skipped, and so are those whose budget ran out in the queue
+        live = [r for r in batch if r.future.set_running_or_notify_cancel()]
+        self._stats["cancelled"] += len(batch) - len(live)
+        runnable = []
+        for request in live:
+            if request.deadline is not None and time.monotonic() >= request.deadline:
+                self._stats["expired"] += 1
+                request.future.set_exception(TimeoutError("Local generation budget ran out while queued."))
+            else:
+                runnable.append(request)
+        return runnable
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = self._collect(item)
+            if not batch:
+                continue
+            started = time.perf_counter()
+            try:
+                outputs = self.generate_batch(batch)
+            except Exception as e:
+                self._stats["errors"] += 1
+                print(f"ERROR: Local batch generation failed ({len(batch)} prompts): {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            elapsed = time.perf_counter() - started
+            self._stats["batches"] += 1
+            self._stats["batched_prompts"] += len(batch)
+            LOCAL_BATCH_SIZE.observe(len(batch))
+            LOCAL_BATCH_SECONDS.observe(elapsed)
+            for request, (text, reason) in zip(batch, outputs):
+                self._stop_reasons[reason] = self._stop_reasons.get(reason, 0) + 1
+                if reason == "deadline":
+                    request.future.set_exception(TimeoutError("Local generation exceeded its time budget."))
+                else:
+                    # Cancelled rows resolve too; nobody is waiting on them any more
+                    request.future.set_result(text)
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self._stats["batches"]
+        return {
+            **self._stats,
+            "stop_reasons": dict(self._stop_reasons),
+            "queued": self._queue.qsize(),
+            "avg_batch_size": round(self._stats["batched_prompts"] / batches, 2) if batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "batch_window_ms": round(self.batch_window * 1000),
+        }
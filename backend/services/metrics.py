@@ -0,0 +1,268 @@
+"""
+Metrics Registry
+Small, dependency-free counters / gauges / histograms rendered in the Prometheus text
+exposition format (version 0.0.4) at GET /metrics.
+
+All metrics are defined at the bottom of this file so the catalogue lives in one place.
+Values are per process: with several uvicorn workers, scrape each worker or aggregate
+by instance.
+"""
+
+import time
+import math
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LOOKUP_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0, 10.0, 60.0, 300.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 45.0, 60.0, 120.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable, extra: Tuple[str, str] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Set directly, or computed at scrape time by `set_function(fn)` (fn returns {label_tuple: value} or a number)."""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._function: Optional[Callable] = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, fn: Callable):
+        self._function = fn
+
+    def samples(self):
+        values = dict(self._values)
+        if self._function is not None:
+            try:
+                computed = self._function()
+            except Exception as e:
+                print(f"WARNING: Gauge {self.name} callback failed: {e}")
+                computed = {}
+            values.update(computed if isinstance(computed, dict) else {(): computed})
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in sorted(values.items())]
+
+
+class CounterFunction(Gauge):
+    """A monotonic total kept elsewhere (e.g. by the LLM cache), read at scrape time via `set_function(fn)`."""
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple, Dict] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        return self._series.get(self._key(labels), {}).get("count", 0)
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            items = sorted((k, {"counts": list(v["counts"]), "sum": v["sum"], "count": v["count"]}) for k, v in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series["counts"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames))
+
+    def counter_function(self, name, help_text, labelnames=()) -> CounterFunction:
+        return self.register(CounterFunction(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+REGISTRY = Registry()
+
+# --- Catalogue ---
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency (until response headers for SSE endpoints).",
+    ("method", "route", "status")
+)
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "llm_call_duration_seconds", "GeminiService call latency per call type, including retries.",
+    ("call_type", "outcome"), buckets=LLM_BUCKETS
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens reported by the LLM backend per call type.",
+    ("call_type", "kind")
+)
+LANGGRAPH_NODE_SECONDS = REGISTRY.histogram(
+    "langgraph_node_duration_seconds", "Discovery agent node latency.",
+    ("node",), buckets=LLM_BUCKETS
+)
+DISCOVERY_TIER_HITS = REGISTRY.counter(
+    "discovery_tier_hits_total", "Company intelligence lookups by the tier that answered them.",
+    ("tier",)
+)
+DISCOVERY_TIER_SECONDS = REGISTRY.histogram(
+    "discovery_tier_duration_seconds", "Latency of each company intelligence tier, by whether it answered.",
+    ("tier", "result"), buckets=LOOKUP_BUCKETS
+)
+DB_POOL_CONNECTIONS = REGISTRY.gauge(
+    "db_pool_connections", "SQLAlchemy connection pool usage.",
+    ("state",)
+)
+GEMINI_CONCURRENCY_LIMIT = REGISTRY.gauge(
+    "gemini_concurrency_limit", "Current AIMD limit on in-flight Gemini calls."
+)
+GEMINI_IN_FLIGHT = REGISTRY.gauge(
+    "gemini_in_flight", "Gemini calls currently in flight."
+)
+GEMINI_CIRCUIT_OPEN = REGISTRY.gauge(
+    "gemini_circuit_open", "1 while the Gemini circuit breaker is open or half-open."
+)
+LLM_CACHE_REQUESTS = REGISTRY.counter_function(
+    "llm_cache_requests_total", "LLM response cache lookups by call type since start (hit = memory or disk tier).",
+    ("call_type", "result")
+)
+LOCAL_BATCH_SIZE = REGISTRY.histogram(
+    "local_inference_batch_size", "Prompts per local model generate() call.",
+    buckets=(1, 2, 4, 8, 16, 32)
+)
+LOCAL_BATCH_SECONDS = REGISTRY.histogram(
+    "local_inference_batch_seconds", "Local model generate() latency per batch.",
+    buckets=LLM_BUCKETS
+)
+ARCHITECT_OUTCOMES = REGISTRY.counter(
+    "architect_outcomes_total", "Architect profiles by source: local, or Gemini after invalid / missing / unavailable local output.",
+    ("outcome",)
+)
+ARCHITECT_HEDGE_WINS = REGISTRY.counter(
+    "architect_hedge_wins_total", "Hedged architect races by the backend whose valid profile came first (none = both failed).",
+    ("winner",)
+)
+ARCHITECT_HEDGE_SECONDS = REGISTRY.histogram(
+    "architect_hedge_seconds", "Per-backend time in a hedged architect race, from that backend's start until it won, failed, finished late or was cancelled.",
+    ("backend", "result"), buckets=LLM_BUCKETS
+)
+LOCAL_PREFILL_TOKENS = REGISTRY.counter(
+    "local_inference_prefill_tokens_total", "Prompt tokens per local generate() row, prefilled or reused from the prefix KV-cache.",
+    ("kind",)
+)
+
+
+def pool_snapshot(engine) -> Dict[Tuple, float]:
+    """Reads QueuePool-style counters; pools without them (e.g. SQLite's) report nothing."""
+    pool = engine.pool
+    snapshot = {}
+    for state, attr in (("size", "size"), ("checked_out", "checkedout"), ("checked_in", "checkedin"), ("overflow", "overflow")):
+        fn = getattr(pool, attr, None)
+        if callable(fn):
+            # QueuePool.overflow() is negative until pool_size connections exist
+            snapshot[(state,)] = max(0, fn()) if state == "overflow" else fn()
+    return snapshot
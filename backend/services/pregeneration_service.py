@@ -0,0 +1,115 @@
+"""
+Pre-generation Service
+While the candidate is typing, we already know most of what the next request will need:
+the next round's opening question (`get_next_round` gives the round name), the company
+intel and the transcript-summary fold. This service runs that work in the background and
+keeps each result in a per-session slot with an expiry, so `submit_answer` can skip the
+LLM round-trip when the slot is still valid.
+
+Slots are keyed: a result is only used if the caller asks with the same key it was
+produced for (e.g. same round / transcript length), otherwise it is dropped.
+"""
+
+import os
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class PregenerationService:
+    def __init__(self, ttl_seconds: float = None, enabled: bool = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("PREGEN_TTL_SECONDS", "900"))
+        self.enabled = enabled if enabled is not None else os.getenv("PREGEN_ENABLED", "true").lower() == "true"
+        self._slots: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, kind: str, outcome: str):
+        counters = self._stats.setdefault(kind, {"scheduled": 0, "hits": 0, "misses": 0, "stale": 0})
+        counters[outcome] += 1
+
+    def _drop(self, slot_id: Tuple[int, str]):
+        slot = self._slots.pop(slot_id, None)
+        if slot and not slot["task"].done():
+            slot["task"].cancel()
+
+    def _prune(self):
+        now = time.monotonic()
+        for slot_id in [s for s, slot in self._slots.items() if slot["expires_at"] < now]:
+            self._drop(slot_id)
+
+    def schedule(self, session_id: int, kind: str, key: Hashable, factory: Callable[[], Awaitable[Any]], ttl_seconds: float = None):
+        """
+        Starts `factory()` in the background and stores it in the (session, kind) slot.
+        An existing slot with the same key is kept (the work is already in flight).
+        """
+        if not self.enabled or session_id is None:
+            return
+        self._prune()
+        slot_id = (session_id, kind)
+        existing = self._slots.get(slot_id)
+        if existing and existing["key"] == key:
+            return
+        self._drop(slot_id)
+
+        async def _run():
+            try:
+                return await factory()
+            except Exception as e:
+                print(f"WARNING: Pre-generation '{kind}' for session {session_id} failed: {e}")
+                raise
+
+        task = asyncio.create_task(_run())
+        # Failures are reported by _run; mark them retrieved so asyncio does not warn again
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._slots[slot_id] = {
+            "key": key,
+            "task": task,
+            "expires_at": time.monotonic() + (ttl_seconds or self.ttl_seconds)
+        }
+        self._count(kind, "scheduled")
+
+    async def take(self, session_id: int, kind: str, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Consumes the slot. Returns (True, result) if a valid result exists (awaiting it
+        if it is still in flight), otherwise (False, None) and the caller does the work itself.
+        """
+        slot = self._slots.pop((session_id, kind), None)
+        if slot is None:
+            self._count(kind, "misses")
+            return False, None
+
+        task = slot["task"]
+        if slot["key"] != key or slot["expires_at"] < time.monotonic() or task.get_loop() is not asyncio.get_running_loop():
+            if not task.done():
+                task.cancel()
+            self._count(kind, "stale")
+            return False, None
+
+        try:
+            # Still in flight: waiting costs less than starting the same call again
+            result = await task
+        except Exception:
+            self._count(kind, "misses")
+            return False, None
+
+        self._count(kind, "hits")
+        print(f"LOG: Using pre-generated '{kind}' for session {session_id}.")
+        return True, result
+
+    def discard(self, session_id: int):
+        """Drops every slot of a session (e.g. when the interview ends)."""
+        for slot_id in [s for s in self._slots if s[0] == session_id]:
+            self._drop(slot_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"slots": len(self._slots), "by_kind": {k: dict(v) for k, v in self._stats.items()}}
+
+
+# Singleton
+_pregeneration_service = None
+
+def get_pregeneration_service() -> PregenerationService:
+    global _pregeneration_service
+    if _pregeneration_service is None:
+        _pregeneration_service = PregenerationService()
+    return _pregeneration_service
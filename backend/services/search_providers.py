@@ -0,0 +1,184 @@
+"""
+Search Providers
+Pluggable web search behind the discovery researcher, selected with SEARCH_PROVIDER:
+
+- ddgs : DuckDuckGo through a pool of reused DDGS clients (no new session per query)
+- stub : offline fixtures from data/search_fixtures.json with configurable latency; queries
+         without a fixture get deterministic synthesized results
+
+Every provider caps in-flight searches (SEARCH_MAX_CONCURRENCY). The ddgs provider also keeps
+non-empty results in an on-disk TTL cache keyed by query (SEARCH_CACHE_TTL_SECONDS), so the
+same company researched again within the TTL never touches the network.
+"""
+
+import os
+import re
+import json
+import time
+import queue
+import random
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from duckduckgo_search import DDGS
+
+from .llm_cache import LLMCache
+from .llm_backends import parse_latency
+from .llm_resilience import AIMDLimiter
+
+CACHE_CALL_TYPE = "web_search"
+
+
+def search_cache_key(provider: str, query: str, max_results: int) -> str:
+    normalized = " ".join((query or "").lower().split())
+    return hashlib.sha256(f"{provider}|{max_results}|{normalized}".encode("utf-8")).hexdigest()
+
+
+class SearchProvider:
+    """Interface: `search` returns a list of {title, href, body} dicts ([] on failure)."""
+    name = "base"
+
+    def __init__(self, max_concurrency: int = 4, cache: Optional[LLMCache] = None):
+        # Fixed-size limiter (min == max): a plain concurrency cap usable from any event loop
+        self.max_concurrency = max(1, max_concurrency)
+        self._limiter = AIMDLimiter(initial=self.max_concurrency, min_limit=self.max_concurrency, max_limit=self.max_concurrency)
+        self.cache = cache
+        self._stats = {"searches": 0, "cache_hits": 0, "errors": 0}
+
+    async def _fetch(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def search(self, query: str, max_results: int = 8) -> List[Dict[str, Any]]:
+        self._stats["searches"] += 1
+        key = search_cache_key(self.name, query, max_results)
+        if self.cache is not None:
+            cached = await self.cache.get(CACHE_CALL_TYPE, key)
+            if cached is not None:
+                self._stats["cache_hits"] += 1
+                return json.loads(cached)
+
+        await self._limiter.acquire()
+        try:
+            results = await self._fetch(query, max_results)
+        except Exception as e:
+            self._stats["errors"] += 1
+            print(f"SEARCH ERROR: {e}")
+            return []
+        finally:
+            self._limiter.release()
+
+        # Empty results are not cached: they are usually a transient block or timeout
+        if results and self.cache is not None:
+            await self.cache.set(CACHE_CALL_TYPE, key, json.dumps(results, ensure_ascii=False))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "provider": self.name, "in_flight": self._limiter.in_flight, "max_concurrency": self.max_concurrency}
+
+
+class DDGSProvider(SearchProvider):
+    name = "ddgs"
+
+    def __init__(self, max_concurrency: int = 4, cache: Optional[LLMCache] = None, timeout: int = 10):
+        super().__init__(max_concurrency, cache)
+        self.timeout = timeout
+        self._pool: "queue.LifoQueue[DDGS]" = queue.LifoQueue()
+        self._stats["clients_created"] = 0
+
+    def _checkout(self) -> DDGS:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            self._stats["clients_created"] += 1
+            return DDGS(timeout=self.timeout)
+
+    def _search_sync(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        client = self._checkout()
+        # On an exception (rate limit, broken session) the client is dropped, not returned to the pool
+        results = list(client.text(query, max_results=max_results))
+        # A search abandoned at the researcher's budget still returns its client here
+        if self._pool.qsize() < self.max_concurrency:
+            self._pool.put(client)
+        return results
+
+    async def _fetch(self, query, max_results):
+        return await asyncio.to_thread(self._search_sync, query, max_results)
+
+
+class StubSearchProvider(SearchProvider):
+    """Offline provider for tests and benchmarks. Fixture keys match as substrings of the query."""
+    name = "stub"
+
+    def __init__(self, fixtures_path: str = None, fixtures: Dict[str, List[Dict[str, Any]]] = None, latency: str = "fixed:0", seed: int = None, max_concurrency: int = 4):
+        super().__init__(max_concurrency, cache=None)
+        self.fixtures = {k.lower(): v for k, v in (fixtures or {}).items()}
+        if fixtures_path and os.path.exists(fixtures_path):
+            with open(fixtures_path, "r", encoding="utf-8") as f:
+                self.fixtures.update({k.lower(): v for k, v in json.load(f).items()})
+        self.latency = parse_latency(latency)
+        self._rng = random.Random(seed)
+        self.queries: List[str] = []
+
+    @classmethod
+    def from_env(cls, fixtures_path: str) -> "StubSearchProvider":
+        seed = os.getenv("SEARCH_STUB_SEED")
+        return cls(
+            fixtures_path=fixtures_path,
+            latency=os.getenv("SEARCH_STUB_LATENCY", "fixed:0.3"),
+            seed=int(seed) if seed else None,
+            max_concurrency=int(os.getenv("SEARCH_MAX_CONCURRENCY", "4"))
+        )
+
+    def respond(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        text = query.lower()
+        matches = [key for key in self.fixtures if key in text]
+        if matches:
+            return self.fixtures[max(matches, key=len)][:max_results]
+        # Deterministic stand-in results so any company can run through discovery offline
+        slug = re.sub(r"[^a-z0-9]+", "-", text).strip("-")
+        return [
+            {"title": f"{query} - result {i + 1}", "href": f"https://search.stub/{slug}/{i + 1}", "body": f"Stub result {i + 1} for '{query}'."}
+            for i in range(min(max_results, 3))
+        ]
+
+    async def _fetch(self, query, max_results):
+        self.queries.append(query)
+        await asyncio.sleep(self.latency(self._rng))
+        return self.respond(query, max_results)
+
+
+def create_search_provider() -> SearchProvider:
+    """Builds the provider selected by SEARCH_PROVIDER."""
+    kind = os.getenv("SEARCH_PROVIDER", "ddgs").lower()
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    max_concurrency = int(os.getenv("SEARCH_MAX_CONCURRENCY", "4"))
+
+    if kind == "ddgs":
+        cache = None
+        ttl = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "21600"))
+        if ttl > 0:
+            try:
+                cache = LLMCache(
+                    db_path=os.getenv("SEARCH_CACHE_PATH") or os.path.join(base_dir, "data", "search_cache.sqlite3"),
+                    max_entries=256,
+                    ttls={CACHE_CALL_TYPE: ttl}
+                )
+            except Exception as e:
+                print(f"WARNING: Search cache unavailable ({e}). Continuing without caching.")
+        return DDGSProvider(max_concurrency=max_concurrency, cache=cache)
+    if kind == "stub":
+        fixtures = os.getenv("SEARCH_FIXTURES", os.path.join(base_dir, "data", "search_fixtures.json"))
+        print(f"INFO: Search provider = STUB ({fixtures}, no network).")
+        return StubSearchProvider.from_env(fixtures)
+    raise ValueError(f"Unknown SEARCH_PROVIDER '{kind}' (expected ddgs or stub)")
+
+
+# Singleton
+_search_provider = None
+
+def get_search_provider() -> SearchProvider:
+    global _search_provider
+    if _search_provider is None:
+        _search_provider = create_search_provider()
+    return _search_provider
@@ -0,0 +1,89 @@
+"""
+Task Graph Executor
+Tiny async DAG runner used by request handlers that fan out several slow LLM calls.
+Every node starts as soon as its own dependencies are done, so wall-clock time is
+the longest dependency chain rather than the sum of all calls.
+
+Speculative nodes (`keep_if`) start immediately and are cancelled/discarded as soon
+as the node they depend on for the decision finishes with a "no".
+"""
+
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+
+class TaskGraph:
+    def __init__(self, name: str = "graph"):
+        self.name = name
+        self._nodes = {}
+        self.timings: Dict[str, float] = {}
+        self.discarded = set()
+
+    def add(self, name: str, fn: Callable[[Dict[str, Any]], Awaitable[Any]], deps: Iterable[str] = (), keep_if: Optional[Tuple[str, Callable[[Any], bool]]] = None):
+        """
+        Registers a node. `fn(results)` receives the results of finished nodes.
+        Dependencies must already be registered, which keeps the graph acyclic.
+        `keep_if=(node, predicate)` makes this node speculative: it runs right away,
+        but is cancelled and dropped if `predicate(results[node])` is False.
+        """
+        if name in self._nodes:
+            raise ValueError(f"Duplicate task graph node '{name}'")
+        deps = tuple(deps)
+        for dep in deps + ((keep_if[0],) if keep_if else ()):
+            if dep not in self._nodes:
+                raise ValueError(f"Node '{name}' depends on unknown node '{dep}'")
+        self._nodes[name] = {"fn": fn, "deps": deps, "keep_if": keep_if}
+
+    async def run(self) -> Dict[str, Any]:
+        """Runs every node; returns {name: result} for all kept nodes. Re-raises the first failure."""
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        started = time.perf_counter()
+
+        async def keep(name: str) -> bool:
+            decider, predicate = self._nodes[name]["keep_if"]
+            try:
+                return bool(predicate(await tasks[decider]))
+            except Exception:
+                return False
+
+        async def run_node(name: str):
+            node = self._nodes[name]
+            for dep in node["deps"]:
+                await tasks[dep]
+            try:
+                value = await node["fn"](results)
+            except Exception:
+                # A failed speculation only matters if it would have been kept
+                if node["keep_if"] and not await keep(name):
+                    self.discarded.add(name)
+                    return None
+                raise
+            results[name] = value
+            self.timings[name] = time.perf_counter() - started
+            return value
+
+        async def guard(name: str):
+            if not await keep(name):
+                self.discarded.add(name)
+                tasks[name].cancel()
+
+        for name in self._nodes:
+            tasks[name] = asyncio.create_task(run_node(name), name=f"{self.name}:{name}")
+        guards = [asyncio.create_task(guard(name)) for name, node in self._nodes.items() if node["keep_if"]]
+
+        try:
+            pending = set(tasks.values())
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+                for name, task in tasks.items():
+                    if task in done and name not in self.discarded and not task.cancelled() and task.exception():
+                        raise task.exception()
+        finally:
+            for task in list(tasks.values()) + guards:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks.values(), *guards, return_exceptions=True)
+
+        return {name: value for name, value in results.items() if name not in self.discarded}
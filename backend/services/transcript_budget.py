@@ -0,0 +1,90 @@
+"""
+Transcript Budget Manager
+Keeps multi-turn question generation at a roughly constant prompt size:
+the last N turns are sent verbatim, older turns are folded into a rolling
+summary that is stored on the session and only extended with new turns.
+"""
+
+import os
+from typing import Optional, Dict, Any, List, Tuple
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English prose)."""
+    if not text:
+        return 0
+    return len(text) // 4 + 1
+
+def _turn_line(turn: Dict[str, Any]) -> str:
+    speaker = "Interviewer" if turn.get("role") == "assistant" else "Candidate"
+    return f"{speaker}: {turn.get('content', '')}"
+
+
+class TranscriptBudget:
+    def __init__(self, keep_turns: int = None, token_budget: int = None, max_summary_chars: int = 2000):
+        keep_turns = keep_turns if keep_turns is not None else int(os.getenv("TRANSCRIPT_KEEP_TURNS", "6"))
+        # Always keep an even number of turns so the verbatim window starts on an interviewer turn
+        self.keep_turns = max(2, keep_turns - (keep_turns % 2))
+        self.token_budget = token_budget if token_budget is not None else int(os.getenv("TRANSCRIPT_TOKEN_BUDGET", "1500"))
+        self.max_summary_chars = max_summary_chars
+
+    def plan(self, transcript: List[Dict[str, Any]], summary_state: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int]:
+        """
+        Splits the transcript into (turns_to_fold, verbatim_turns, new_boundary).
+        Turns before `summary_state['turns_folded']` are already in the summary.
+        """
+        already_folded = (summary_state or {}).get("turns_folded", 0)
+        if already_folded > len(transcript):
+            # Transcript was reset (new round) without resetting the summary
+            already_folded = 0
+
+        boundary = max(already_folded, len(transcript) - self.keep_turns)
+        boundary -= boundary % 2
+
+        # Token budget: fold further (in question/answer pairs) while the verbatim window is too large
+        while len(transcript) - boundary > 2:
+            window_tokens = sum(estimate_tokens(t.get("content", "")) for t in transcript[boundary:])
+            if window_tokens <= self.token_budget:
+                break
+            boundary += 2
+
+        boundary = max(boundary, already_folded)
+        return transcript[already_folded:boundary], transcript[boundary:], boundary
+
+    def extractive_summary(self, previous: str, turns: List[Dict[str, Any]]) -> str:
+        """LLM-free fallback: append clipped turn lines to the existing summary."""
+        lines = [previous] if previous else []
+        lines += [_turn_line(t)[:200] for t in turns]
+        return "\n".join(lines)[-self.max_summary_chars:]
+
+    async def compact(self, transcript: List[Dict[str, Any]], summary_state: Optional[Dict[str, Any]], summarize) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Folds any newly aged-out turns into the summary.
+        `summarize(previous_summary, turn_lines)` is an async callable (normally Gemini).
+        Returns (new_summary_state, verbatim_turns).
+        """
+        state = summary_state or {}
+        if state.get("turns_folded", 0) > len(transcript):
+            state = {}
+        to_fold, recent, boundary = self.plan(transcript, state)
+        previous = state.get("text", "")
+
+        text = previous
+        if to_fold:
+            try:
+                text = await summarize(previous, [_turn_line(t) for t in to_fold])
+                text = (text or "").strip()[:self.max_summary_chars] or self.extractive_summary(previous, to_fold)
+            except Exception as e:
+                print(f"WARNING: Transcript summarization failed ({e}). Using extractive summary.")
+                text = self.extractive_summary(previous, to_fold)
+
+        return {"text": text, "turns_folded": boundary}, recent
+
+
+# Singleton
+_transcript_budget = None
+
+def get_transcript_budget() -> TranscriptBudget:
+    global _transcript_budget
+    if _transcript_budget is None:
+        _transcript_budget = TranscriptBudget()
+    return _transcript_budget
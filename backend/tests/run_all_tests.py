@@ -47,6 +47,26 @@ TESTS = [
     ("Fuzzy Matching",      "tests/test_fuzzy_matching.py",     False, False),
     ("Company Intel",       "tests/test_company_intel.py",      False, False),
     ("Memory Service",      "tests/test_memory_service.py",     False, False),
+    ("LLM Cache",           "tests/test_llm_cache.py",          False, False),
+    ("Transcript Budget",   "tests/test_transcript_budget.py",  False, False),
+    ("LLM JSON Parser",     "tests/test_llm_json.py",           False, False),
+    ("Task Graph",          "tests/test_task_graph.py",         False, False),
+    ("Pre-generation",      "tests/test_pregeneration.py",      False, False),
+    ("LLM Backends",        "tests/test_llm_backends.py",       False, False),
+    ("LLM Resilience",      "tests/test_llm_resilience.py",     False, False),
+    ("Local Inference",     "tests/test_local_inference.py",    False, False),
+    ("Model Warm-Up",       "tests/test_model_warmup.py",       False, False),
+    ("CPU Model",           "tests/test_cpu_model.py",          False, False),
+    ("JSON Grammar",        "tests/test_json_grammar.py",       False, False),
+    ("Architect Hedge",     "tests/test_architect_hedge.py",    False, False),
+    ("Metrics",             "tests/test_metrics.py",            False, False),
+    ("Discovery Store",     "tests/test_discovery_store.py",    False, False),
+    ("Search Providers",    "tests/test_search_providers.py",   False, False),
+    ("Researcher",          "tests/test_researcher.py",         False, False),
+    ("Tier Resolver",       "tests/test_tier_resolver.py",      False, False),
+    ("Discovery Lease",     "tests/test_discovery_lease.py",    False, False),
+    ("Discovery Jobs",      "tests/test_discovery_jobs.py",     False, False),
+    ("Discovery Pre-Warm",  "tests/test_prewarm.py",            False, False),
     ("API Endpoints",       "tests/test_api_endpoints.py",      True,  False),
     ("Intelligence Agent",  "tests/test_intelligence_agent.py", False, True),
 ]
@@ -0,0 +1,245 @@
+"""
+====================================================================
+ TEST: Architect Hedge — Local Model vs Gemini, First Valid Wins
+====================================================================
+ Tests the hedged architect in intelligence_service.py. The local
+ model is a fake batch function that streams its reply token by
+ token through the real LocalInferenceWorker (so cancellation stops
+ the row exactly as it would with torch); Gemini is an async fake
+ with a fixed latency. No torch, no API key needed.
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_architect_hedge.py
+
+ WHAT IT TESTS:
+   ✅ ARCHITECT_HEDGE / ARCHITECT_HEDGE_DELAY_SECONDS parsing
+   ✅ The faster valid backend wins and the other call is cancelled
+   ✅ A cancelled local row stops at its next token
+   ✅ Gemini waits for the delay, or starts early when the local attempt fails
+   ✅ Wins, per-backend timings and fallback counts in /health and /metrics
+   ✅ A valid local profile that lost the race is counted as outrun
+====================================================================
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.intelligence_service as intelligence_module
+from services.intelligence_service import IntelligenceService, _hedge_delay
+from services.local_inference import LocalInferenceWorker
+from services.llm_json import LLMJSONError
+from services.metrics import ARCHITECT_HEDGE_WINS
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+def with_env(**values):
+    saved = {k: os.environ.get(k) for k in values}
+    for k, v in values.items():
+        if v is None:
+            os.environ.pop(k, None)
+        else:
+            os.environ[k] = v
+    return saved
+
+
+def profile(name):
+    return {"name": name, "industry": "Tech", "interview_style": "Structured", "interview_rounds": {"Coding": {"focus": "DSA"}}}
+
+
+def make_state(company="Acme"):
+    return {
+        "company_name": company, "industry": "Tech", "job_description": None, "research_data": None,
+        "is_synthetic": False, "confidence_score": 60, "generated_profile": None, "is_valid": False,
+        "iterations": 0, "sources": [], "search_query": None, "audited_data": "Acme runs a coding round.",
+        "audit_log": [], "error": None
+    }
+
+
+class FakeLocal:
+    """Streams `reply` in 8-character tokens, `token_seconds` apart, honouring each request's budget."""
+    def __init__(self):
+        self.reply, self.token_seconds = json.dumps(profile("Local")), 0.01
+        self.stop_reasons = []
+
+    def __call__(self, requests):
+        results = []
+        for request in requests:
+            text, reason = "", None
+            for i in range(0, len(self.reply), 8):
+                time.sleep(self.token_seconds)
+                text += self.reply[i:i + 8]
+                reason = request.check(self.reply[i:i + 8])
+                if reason:
+                    break
+            self.stop_reasons.append(reason or "eos")
+            results.append((text, reason or "eos"))
+        return results
+
+
+class FakeGemini:
+    def __init__(self):
+        self.seconds, self.result = 0.05, profile("Gemini")
+        self.started, self.cancelled = [], 0
+
+    async def generate_json(self, prompt, call_type="generate_json", schema=None, **kwargs):
+        self.started.append(time.perf_counter())
+        try:
+            await asyncio.sleep(self.seconds)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def run_node(service):
+    started = time.perf_counter()
+    state = await service.architect_node(make_state())
+    return state, time.perf_counter() - started
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — ARCHITECT HEDGE TEST SUITE")
+    print("="*65)
+
+    # ── 1. Settings ──────────────────────────────────────────────
+    print("\n[1] Settings")
+    saved = with_env(ARCHITECT_HEDGE=None, ARCHITECT_HEDGE_DELAY_SECONDS=None)
+    try:
+        check("Hedging off by default", _hedge_delay() is None)
+        with_env(ARCHITECT_HEDGE="TRUE")
+        check("Both at once by default when on", _hedge_delay() == 0.0)
+        with_env(ARCHITECT_HEDGE_DELAY_SECONDS="2.5")
+        check("Delay override", _hedge_delay() == 2.5)
+        with_env(ARCHITECT_HEDGE_DELAY_SECONDS="-1")
+        check("Negative delay clamped", _hedge_delay() == 0.0)
+    finally:
+        with_env(**saved)
+
+    libs = intelligence_module.HAS_LOCAL_ML_LIBS
+    intelligence_module.HAS_LOCAL_ML_LIBS = False
+    service = IntelligenceService()
+    intelligence_module.HAS_LOCAL_ML_LIBS = libs
+    local, gemini = FakeLocal(), FakeGemini()
+    service._inference = LocalInferenceWorker(local, batch_window=0.0)
+    service.model_state = "ready"
+    intelligence_module.gemini_service.generate_json = gemini.generate_json
+    saved = with_env(ARCHITECT_HEDGE="true", ARCHITECT_HEDGE_DELAY_SECONDS="0", LOCAL_GENERATION_TIMEOUT_SECONDS="10")
+    try:
+        # ── 2. Race ──────────────────────────────────────────────
+        print("\n[2] Race")
+        gemini.seconds = 2.0
+        state, elapsed = await run_node(service)
+        check("Fast local model wins", state["generated_profile"]["name"] == "Local" and elapsed < 1.5, f"{elapsed:.2f}s")
+        check("Slow Gemini call cancelled", len(gemini.started) == 1 and gemini.cancelled == 1)
+
+        local.token_seconds, gemini.seconds = 0.2, 0.1
+        state, elapsed = await run_node(service)
+        await asyncio.sleep(0.3)  # let the cancelled row reach its next token
+        check("Fast Gemini wins", state["generated_profile"]["name"] == "Gemini" and elapsed < 1.0, f"{elapsed:.2f}s")
+        check("Losing local row stopped", local.stop_reasons[-1] == "cancelled", local.stop_reasons)
+
+        # ── 3. Delay ─────────────────────────────────────────────
+        print("\n[3] Delay")
+        os.environ["ARCHITECT_HEDGE_DELAY_SECONDS"] = "1"
+        local.token_seconds, gemini.started = 0.005, []
+        state, _ = await run_node(service)
+        check("Local answers inside the delay → Gemini never called", state["generated_profile"]["name"] == "Local" and not gemini.started)
+
+        local.reply = json.dumps(profile("Local"))[:30]
+        local.token_seconds, gemini.seconds = 0.01, 0.05
+        state, elapsed = await run_node(service)
+        check("Invalid local output starts Gemini before the delay", state["generated_profile"]["name"] == "Gemini" and elapsed < 0.9, f"{elapsed:.2f}s")
+
+        local.token_seconds = 0.2
+        local.reply = json.dumps(profile("Local"))
+        started = time.perf_counter()
+        gemini.started = []
+        state, _ = await run_node(service)
+        waited = gemini.started[0] - started if gemini.started else None
+        check("Slow local model → Gemini joins after the delay", state["generated_profile"]["name"] == "Gemini" and waited is not None and 0.9 <= waited < 1.5, waited)
+
+        # ── 4. Failures ──────────────────────────────────────────
+        print("\n[4] Failures")
+        local.reply, local.token_seconds = "{\"name\": ", 0.01
+        gemini.result = LLMJSONError("Truncated JSON in model output.", "{")
+        state, _ = await run_node(service)
+        check("Both invalid → no profile, error set", state["generated_profile"] is None and state["error"], state["error"])
+        gemini.result = profile("Gemini")
+
+        os.environ["ARCHITECT_HEDGE"] = "false"
+        gemini.started = []
+        started = time.perf_counter()
+        state, _ = await run_node(service)
+        check("Hedging off: Gemini only after the local attempt", state["generated_profile"]["name"] == "Gemini" and gemini.started[0] - started > 0.01)
+
+        # ── 5. Stats ─────────────────────────────────────────────
+        print("\n[5] Stats")
+        stats = service.model_status()["architect"]
+        hedge = stats["hedge"]
+        check("Wins per backend", hedge["wins"] == {"local": 2, "gemini": 3, "none": 1}, hedge["wins"])
+        check("Mean time to win per backend", all(hedge["mean_win_seconds"][b] is not None for b in ("local", "gemini")), hedge["mean_win_seconds"])
+        check("Cancelled local rows counted as outrun", stats["outrun"] == 2 and stats["local"] == 2, stats)
+        check("Outrun counts as a Gemini fallback", stats["gemini_fallback_rate"] == round(5 / 7, 3), stats["gemini_fallback_rate"])
+
+        # Both backends finish in the same loop turn: exactly one answer is counted for local
+        os.environ["ARCHITECT_HEDGE"] = "true"
+        os.environ["ARCHITECT_HEDGE_DELAY_SECONDS"] = "0"
+        finished = asyncio.Event()
+        async def gemini_then_signal(prompt, **kwargs):
+            await asyncio.sleep(0.05)
+            finished.set()
+            return profile("Gemini")
+        async def local_right_after(prompt):
+            await finished.wait()
+            return "local", profile("Local")
+        intelligence_module.gemini_service.generate_json = gemini_then_signal
+        service._architect_local = local_right_after
+        before = dict(service.architect_outcomes), dict(service.hedge_wins)
+        state, _ = await run_node(service)
+        del service._architect_local
+        outcomes = {k: service.architect_outcomes[k] - before[0][k] for k in ("local", "outrun")}
+        wins = {k: service.hedge_wins[k] - before[1][k] for k in ("local", "gemini")}
+        check("Discarded local profile counted as outrun, not local",
+              (outcomes["local"], outcomes["outrun"]) == (wins["local"], wins["gemini"]) and sum(wins.values()) == 1, (outcomes, wins))
+
+        check("Wins exported to /metrics", ARCHITECT_HEDGE_WINS.value(winner="gemini") >= 3 and "architect_hedge_seconds_bucket" in intelligence_module.ARCHITECT_HEDGE_SECONDS.render())
+    finally:
+        with_env(**saved)
+        intelligence_module.gemini_service.__dict__.pop("generate_json", None)
+        service._inference.stop()
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL ARCHITECT HEDGE TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,222 @@
+"""
+====================================================================
+ TEST: Discovery Jobs — Priority Queue & Bounded Worker Pool
+====================================================================
+ Tests discovery_jobs.py in isolation (resolver and pipeline are
+ asyncio.sleep stubs; no API key needed).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_discovery_jobs.py
+
+ WHAT IT TESTS:
+   ✅ Known companies come back as an already-finished job
+   ✅ Unknown companies are queued and submit() returns immediately
+   ✅ No more than `workers` pipelines run at once
+   ✅ Higher-priority jobs run first; resubmits dedupe and bump priority
+   ✅ report_progress() events reach the job (poll and stream)
+   ✅ Full queue is rejected; failures are reported
+   ✅ Priority bumps before start(); tier reported by the pipeline
+   ✅ Concurrent submits for one company share a job
+   ✅ Jobs can be polled and streamed from another worker process
+====================================================================
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.discovery_jobs import (
+    DiscoveryJobQueue, DiscoveryQueueFull, SharedJobTable, report_progress,
+    PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_BULK
+)
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+KNOWN = {"google": {"name": "Google"}}
+
+async def resolver(company_name):
+    profile = KNOWN.get(company_name.lower())
+    return ("curated", profile) if profile else (None, None)
+
+
+def make_runner(order, running, peak, delay=0.05):
+    async def runner(company_name, job_description=None):
+        order.append(company_name)
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        try:
+            report_progress("node_started", node="router")
+            await asyncio.sleep(delay)
+            report_progress("node_finished", node="router")
+            if company_name.startswith("Broken"):
+                return {"error": "no data"}
+            # Persisted, like the discovery store, so the resolver knows it next time
+            KNOWN[company_name.lower()] = {"name": company_name}
+            return {"name": company_name}
+        finally:
+            running[0] -= 1
+    return runner
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — DISCOVERY JOBS TEST SUITE")
+    print("="*65)
+
+    order, running, peak = [], [0], [0]
+    jobs = DiscoveryJobQueue(workers=2, max_queued=50, resolver=resolver, runner=make_runner(order, running, peak))
+    jobs.start()
+
+    # ── 1. Submission ────────────────────────────────────────────
+    print("\n[1] Submission")
+    job = await jobs.submit("Google")
+    check("Known company finished instantly", job.status == "done" and job.tier == "curated" and order == [])
+    started = time.perf_counter()
+    job = await jobs.submit("Acme Stealth", "JD text")
+    check("Unknown company queued without waiting", job.status == "queued" and time.perf_counter() - started < 0.01)
+    await jobs.wait(job.id, timeout=2)
+    check("Worker finished the job", job.status == "done" and job.result == {"name": "Acme Stealth"} and job.tier == "agentic")
+    stages = [e["stage"] for e in job.events]
+    check("Progress events recorded", stages == ["queued", "started", "node_started", "node_finished", "done"], stages)
+
+    # ── 2. Bounded pool ──────────────────────────────────────────
+    print("\n[2] Bounded Worker Pool")
+    batch = [await jobs.submit(f"Startup {i}") for i in range(8)]
+    await asyncio.gather(*(jobs.wait(j.id, timeout=5) for j in batch))
+    check("At most 2 pipelines at once", peak[0] == 2, peak[0])
+    check("All 8 jobs done", all(j.status == "done" for j in batch))
+
+    # ── 3. Priorities & dedup ────────────────────────────────────
+    print("\n[3] Priorities and Dedup")
+    order.clear()
+    blockers = [await jobs.submit(f"Blocker {i}", priority=PRIORITY_BULK) for i in range(2)]
+    await asyncio.sleep(0.01)  # both workers busy
+    bulk = await jobs.submit("Bulk Co", priority=PRIORITY_BULK)
+    background = await jobs.submit("Background Co", priority=PRIORITY_BACKGROUND)
+    bumped = await jobs.submit("Late Co", priority=PRIORITY_BULK)
+    same = await jobs.submit("  late co ", priority=PRIORITY_INTERACTIVE)
+    check("Resubmit returns the active job", same is bumped and bumped.priority == PRIORITY_INTERACTIVE)
+    await asyncio.gather(*(jobs.wait(j.id, timeout=5) for j in blockers + [bulk, background, bumped]))
+    check("Runs in priority order", order[2:] == ["Late Co", "Background Co", "Bulk Co"], order)
+    check("Bumped job ran once", order.count("Late Co") == 1)
+
+    # ── 4. Streaming & helpers ───────────────────────────────────
+    print("\n[4] Event Stream")
+    job = await jobs.submit("Streamed Co")
+    streamed = [event["stage"] async for event in jobs.events(job.id)]
+    check("Stream follows the job to completion", streamed[-1] == "done" and "node_finished" in streamed, streamed)
+    replay = [event["stage"] async for event in jobs.events(job.id, since=3)]
+    check("Replay from a cursor", replay == streamed[3:])
+
+    intel = await jobs.intel_if_ready("Streamed Co")
+    check("intel_if_ready: finished discovery", intel == {"name": "Streamed Co"})
+    intel = await jobs.intel_if_ready("Google")
+    check("intel_if_ready: known company", intel == {"name": "Google"})
+    intel = await jobs.intel_if_ready("Never Seen Co")
+    check("intel_if_ready: unknown company queued, no wait", intel is None and jobs.active_job("never seen co") is not None)
+
+    # ── 5. Failures & limits ─────────────────────────────────────
+    print("\n[5] Failures and Limits")
+    job = await jobs.submit("Broken Co")
+    await jobs.wait(job.id, timeout=2)
+    check("Pipeline error → failed job", job.status == "failed" and job.error == "no data" and job.to_dict()["result"] is None)
+    await jobs.stop()
+
+    small = DiscoveryJobQueue(workers=1, max_queued=2, resolver=resolver, runner=make_runner([], [0], [0]))
+    await small.submit("Queued A")
+    await small.submit("Queued B")
+    try:
+        await small.submit("Queued C")
+        check("Full queue rejected", False)
+    except DiscoveryQueueFull:
+        check("Full queue rejected", True)
+    check("Known company still served when full", (await small.submit("Google")).status == "done")
+
+    # ── 6. Before start & tiers ──────────────────────────────────
+    print("\n[6] Before Start and Tiers")
+    async def memory_runner(company_name, job_description=None):
+        # What get_intelligence does when another worker saved the company meanwhile
+        report_progress("resolved", tier="gold")
+        return {"name": company_name}
+    early = DiscoveryJobQueue(workers=1, max_queued=5, resolver=resolver, runner=memory_runner)
+    job = await early.submit("Gold Co", priority=PRIORITY_BULK)
+    try:
+        same = await early.submit("Gold Co", priority=PRIORITY_INTERACTIVE)
+        check("Priority bump before start()", same is job and job.priority == PRIORITY_INTERACTIVE)
+    except AttributeError as e:
+        check("Priority bump before start()", False, e)
+    early.start()
+    await early.wait(job.id, timeout=2)
+    check("Tier taken from the pipeline", job.status == "done" and job.tier == "gold", job.tier)
+    await early.stop()
+
+    # ── 7. Concurrent submits ────────────────────────────────────
+    print("\n[7] Concurrent Submits")
+    async def slow_resolver(company_name):
+        await asyncio.sleep(0.02)
+        return await resolver(company_name)
+    racing = DiscoveryJobQueue(workers=1, max_queued=5, resolver=slow_resolver, runner=make_runner([], [0], [0]))
+    submitted = await asyncio.gather(
+        racing.submit("Racing Co", priority=PRIORITY_BULK), racing.submit("racing co"), racing.submit("Racing Co", priority=PRIORITY_INTERACTIVE)
+    )
+    job = submitted[0]
+    check("Submits during the lookup share one job", all(j is job for j in submitted) and len(racing._jobs) == 1, len(racing._jobs))
+    check("Queued once at the best priority", job.status == "queued" and job.priority == PRIORITY_INTERACTIVE
+          and [e["stage"] for e in job.events] == ["queued"] and racing.queued_count() == 1)
+    known = await asyncio.gather(*(racing.submit("Google") for _ in range(3)))
+    check("Known company resolved once, not left active", all(j is known[0] and j.status == "done" for j in known) and racing.active_job("Google") is None)
+
+    # ── 8. Across workers ────────────────────────────────────────
+    print("\n[8] Across Workers")
+    with tempfile.TemporaryDirectory() as data_dir:
+        db_path = os.path.join(data_dir, "leases.sqlite3")
+        owner = DiscoveryJobQueue(workers=1, max_queued=5, resolver=resolver, runner=make_runner([], [0], [0], delay=0.2),
+                                  shared=SharedJobTable(db_path=db_path, poll_seconds=0.02))
+        other = DiscoveryJobQueue(workers=1, max_queued=5, resolver=resolver, runner=make_runner([], [0], [0]),
+                                  shared=SharedJobTable(db_path=db_path, poll_seconds=0.02))
+        owner.start()
+        job = await owner.submit("Shared Co")
+        seen = await other.lookup(job.id)
+        check("Other worker sees the job", other.get(job.id) is None and seen is not None and seen["status"] in ("queued", "running"), seen and seen["status"])
+        stages = [e["stage"] async for e in other.events(job.id)]
+        check("Other worker streams it to the end", stages[0] == "queued" and stages[-1] == "done" and "node_finished" in stages, stages)
+        seen = await other.lookup(job.id)
+        check("Result readable from the other worker", seen["status"] == "done" and seen["result"] == {"name": "Shared Co"}, seen["status"])
+        check("Unknown job without a company → None", await other.lookup("expired-job") is None)
+        seen = await other.lookup("expired-job", "shared co")
+        check("Expired job answered from memory by company", seen is not None and seen["status"] == "done" and seen["result"]["name"] == "Shared Co")
+        await owner.stop()
+        owner._shared._conn.close()
+        other._shared._conn.close()
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL DISCOVERY JOBS TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
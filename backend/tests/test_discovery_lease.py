@@ -0,0 +1,148 @@
+"""
+====================================================================
+ TEST: Discovery Lease — Cross-Process Single-Flight
+====================================================================
+ Tests discovery_lease.py against a temporary SQLite file. Separate
+ DiscoveryLeaseManager instances (and real worker processes) stand
+ in for uvicorn workers.
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_discovery_lease.py
+
+ WHAT IT TESTS:
+   ✅ One leader runs the pipeline; followers get its persisted result
+   ✅ Failures are shared, then retried after the failure TTL
+   ✅ A dead leader's lease expires and a follower takes over
+   ✅ A cancelled leader releases its lease immediately
+   ✅ Four worker processes run one pipeline between them
+====================================================================
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.discovery_lease import DiscoveryLeaseManager
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+def worker_process(db_path: str, runs_path: str, queue):
+    """One 'uvicorn worker': asks for the same company as its siblings."""
+    async def leader():
+        with open(runs_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        await asyncio.sleep(0.5)
+        return {"name": "Acme Stealth", "leader_pid": os.getpid()}
+
+    manager = DiscoveryLeaseManager(db_path=db_path, poll_seconds=0.05)
+    result = asyncio.run(manager.single_flight("acme stealth", leader))
+    queue.put(result)
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — DISCOVERY LEASE TEST SUITE")
+    print("="*65)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        db_path = os.path.join(data_dir, "leases.sqlite3")
+        workers = [DiscoveryLeaseManager(db_path=db_path, ttl_seconds=0.3, poll_seconds=0.02, failure_ttl=0.2) for _ in range(4)]
+        runs = []
+
+        def pipeline(result, delay=0.2):
+            async def leader():
+                runs.append(result)
+                await asyncio.sleep(delay)
+                return result
+            return leader
+
+        # ── 1. Leader / followers ────────────────────────────────────
+        print("\n[1] Leader and Followers")
+        results = await asyncio.gather(*(w.single_flight("acme", pipeline({"name": "Acme"})) for w in workers))
+        check("Pipeline ran once across 4 workers", len(runs) == 1, len(runs))
+        check("Followers got the leader's result", all(r == {"name": "Acme"} for r in results))
+        check("Roles recorded", sum(w.stats()["led"] for w in workers) == 1 and sum(w.stats()["followed"] for w in workers) == 3)
+        result = await workers[2].single_flight("acme", pipeline({"name": "Again"}))
+        check("Late request served from the persisted result", result == {"name": "Acme"} and len(runs) == 1)
+
+        # ── 2. Failures ──────────────────────────────────────────────
+        print("\n[2] Failures")
+        runs.clear()
+        results = await asyncio.gather(*(w.single_flight("broken", pipeline({"error": "no data"})) for w in workers))
+        check("Failure shared, not re-run by followers", len(runs) == 1 and all("error" in r for r in results))
+        await asyncio.sleep(0.25)
+        await workers[0].single_flight("broken", pipeline({"name": "Broken"}, delay=0))
+        check("Failure retried after failure TTL", len(runs) == 2)
+
+        # ── 3. Expiry & takeover ─────────────────────────────────────
+        print("\n[3] Expiry and Takeover")
+        check("Crashed leader claims the lease", workers[0].try_acquire("orphan"))
+        # No heartbeat from workers[0]: it 'crashed'
+        started = time.monotonic()
+        runs.clear()
+        result = await workers[1].single_flight("orphan", pipeline({"name": "Orphan"}, delay=0))
+        waited = time.monotonic() - started
+        check("Follower took over after the TTL", result == {"name": "Orphan"} and 0.2 < waited < 1.0, f"{waited:.2f}s")
+        check("Takeover counted", workers[1].stats()["takeovers"] == 1)
+
+        runs.clear()
+        results = await asyncio.gather(*(w.single_flight("long", pipeline({"name": "Long"}, delay=0.8)) for w in workers))
+        check("Heartbeat keeps a slow leader's lease alive", len(runs) == 1 and all(r == {"name": "Long"} for r in results), len(runs))
+
+        leader_task = asyncio.create_task(workers[0].single_flight("cancelled", pipeline({"name": "X"}, delay=5)))
+        await asyncio.sleep(0.05)
+        leader_task.cancel()
+        await asyncio.gather(leader_task, return_exceptions=True)
+        check("Cancelled leader released the lease", workers[1].try_acquire("cancelled"))
+
+        for w in workers:
+            w._conn.close()
+
+        # ── 4. Real processes ────────────────────────────────────────
+        print("\n[4] Worker Processes")
+        runs_path = os.path.join(data_dir, "runs.txt")
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        processes = [ctx.Process(target=worker_process, args=(os.path.join(data_dir, "procs.sqlite3"), runs_path, queue)) for _ in range(4)]
+        for p in processes:
+            p.start()
+        results = [queue.get(timeout=60) for _ in processes]
+        for p in processes:
+            p.join(timeout=10)
+        with open(runs_path) as f:
+            pipeline_runs = f.read().split()
+        check("One pipeline across 4 processes", len(pipeline_runs) == 1, pipeline_runs)
+        check("Every process got the leader's result", len({r["leader_pid"] for r in results}) == 1)
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL DISCOVERY LEASE TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
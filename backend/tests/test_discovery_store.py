@@ -0,0 +1,167 @@
+"""
+====================================================================
+ TEST: Discovery Store — In-Memory Discovery Index
+====================================================================
+ Tests discovery_store.py against a temporary data directory
+ (the real data/ files are never touched).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_discovery_store.py
+
+ WHAT IT TESTS:
+   ✅ Gold / stealth / quarantine tiers resolve in order
+   ✅ Names are matched case- and whitespace-insensitively
+   ✅ Unchanged files are not re-parsed
+   ✅ Externally modified files are reloaded by mtime
+   ✅ New discoveries are appended to the log and indexed without a reload
+   ✅ Concurrent writers (separate store instances) lose nothing
+   ✅ Torn log lines are skipped until complete
+   ✅ Compaction folds the log into the snapshot; other instances follow
+   ✅ Corrupt files keep the last good index
+====================================================================
+"""
+
+import sys
+import os
+import json
+import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.discovery_store import DiscoveryStore, normalize_name
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+def write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — DISCOVERY STORE TEST SUITE")
+    print("="*65)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        gold = os.path.join(data_dir, "discoveries.json")
+        stealth = os.path.join(data_dir, "stealth_registry.json")
+        quarantine = os.path.join(data_dir, "quarantine_discoveries.json")
+        write(gold, [{"company_name": "AP Guru", "interview_intelligence_profile": {"name": "AP Guru", "tier": "gold"}}])
+        write(stealth, {"Acme Corp": {"name": "Acme Corp", "tier": "stealth"}, "Ap Guru": {"tier": "stealth-shadowed"}})
+        write(quarantine, [{"company_name": "Shady Inc", "interview_intelligence_profile": {"tier": "quarantine"}}])
+
+        # check_interval=0: every async call re-checks mtimes
+        store = DiscoveryStore(data_dir=data_dir, check_interval=0)
+
+        # ── 1. Tiered lookup ─────────────────────────────────────────
+        print("\n[1] Tiered Lookup")
+        tier, profile = await store.lookup("  ap   GURU ")
+        check("Gold hit, normalized name", tier == "gold" and profile["tier"] == "gold", tier)
+        check("Gold shadows stealth for the same name", profile["tier"] != "stealth-shadowed")
+        tier, _ = await store.lookup("acme corp")
+        check("Stealth registry hit", tier == "stealth")
+        tier, _ = await store.lookup("Shady Inc")
+        check("Quarantine hit", tier == "quarantine")
+        tier, profile = await store.lookup("Unknown Startup")
+        check("Miss returns (None, None)", tier is None and profile is None)
+        check("normalize_name", normalize_name(" Foo\tBar ") == "foo bar")
+
+        # ── 2. mtime reload ──────────────────────────────────────────
+        print("\n[2] Incremental Reload")
+        check("Unchanged files are not re-parsed", store.refresh() == [])
+        write(stealth, {"Acme Corp": {"tier": "stealth"}, "New Startup": {"tier": "stealth"}})
+        os.utime(stealth, ns=(1, 10**18))
+        tier, _ = await store.lookup("new startup")
+        check("Externally modified file reloaded", tier == "stealth")
+        check("Only the changed file was reloaded", store.stats()["reloads"] == 4, store.stats())
+
+        # ── 3. Persisting discoveries ────────────────────────────────
+        print("\n[3] Persisting Discoveries")
+        added = await store.add_discovery("Fresh Co", {"name": "Fresh Co"})
+        tier, _ = await store.lookup("fresh co")
+        check("New discovery indexed", added and tier == "gold")
+        with open(gold + ".log.jsonl", encoding="utf-8") as f:
+            logged = [json.loads(line)["company_name"] for line in f]
+        check("Appended to the log, snapshot untouched", logged == ["Fresh Co"] and len(json.load(open(gold))) == 1)
+        check("Own write does not trigger a reload", store.refresh() == [])
+        check("Duplicate discovery skipped", not await store.add_discovery("FRESH CO", {}))
+        await store.add_discovery("Maybe Ltd", {"name": "Maybe Ltd"}, quarantine=True)
+        tier, _ = await store.lookup("maybe ltd")
+        check("Quarantined discovery indexed", tier == "quarantine")
+        names = await store.all_names()
+        check("Suggestion names cover gold + stealth only", "Fresh Co" in names and "Acme Corp" in names and "Maybe Ltd" not in names)
+
+        # ── 4. Concurrent writers ────────────────────────────────────
+        print("\n[4] Concurrent Writers")
+        # Separate instances share nothing but the file lock, like separate worker processes
+        writers = [DiscoveryStore(data_dir=data_dir, check_interval=0) for _ in range(4)]
+        names = [f"Company {i}" for i in range(40)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda i: writers[i % 4]._append_sync("gold", names[i // 2], {"n": i}), range(80)))
+        check("Each name written exactly once", sum(results) == 40, sum(results))
+        with open(gold + ".log.jsonl", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        check("No interleaved or lost lines", len(lines) == 41)
+
+        with open(gold + ".log.jsonl", "ab") as f:
+            f.write(b'{"company_name": "Torn Co", "interview_intel')
+        store.refresh()
+        check("Torn last line skipped", (await store.lookup("torn co"))[0] is None)
+        with open(gold + ".log.jsonl", "ab") as f:
+            f.write(b'ligence_profile": {}}\n')
+        store.refresh()
+        check("Completed line picked up", (await store.lookup("torn co"))[0] == "gold")
+
+        # ── 5. Compaction ────────────────────────────────────────────
+        print("\n[5] Compaction")
+        follower = DiscoveryStore(data_dir=data_dir, check_interval=0)
+        follower.refresh()
+        moved = store.compact()
+        with open(gold, encoding="utf-8") as f:
+            on_disk = [d["company_name"] for d in json.load(f)]
+        check("Log folded into discoveries.json", moved == 43 and len(on_disk) == 43 and on_disk[:2] == ["AP Guru", "Fresh Co"], moved)
+        check("Logs truncated", os.path.getsize(gold + ".log.jsonl") == 0 and os.path.getsize(quarantine + ".log.jsonl") == 0)
+        check("Nothing to compact twice", store.compact() == 0)
+        await follower.add_discovery("After Compaction", {})
+        tier, _ = await follower.lookup("company 7")
+        check("Other instance follows the compacted snapshot", tier == "gold" and len(follower._tiers["gold"].index) == 44)
+        tier, _ = await store.lookup("after compaction")
+        check("Post-compaction append visible everywhere", tier == "gold")
+
+        # ── 6. Corrupt file ──────────────────────────────────────────
+        print("\n[6] Corrupt File")
+        with open(stealth, "w", encoding="utf-8") as f:
+            f.write("{ half written")
+        os.utime(stealth, ns=(1, 2 * 10**18))
+        tier, _ = await store.lookup("acme corp")
+        check("Last good index kept", tier == "stealth")
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL DISCOVERY STORE TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,196 @@
+"""
+====================================================================
+ TEST: JSON Grammar — Schema-Constrained Local Decoding
+====================================================================
+ Tests json_grammar.py (the incremental schema matcher and token
+ choice used by the local generator) and the architect's outcome
+ accounting. Decoding is simulated with a toy vocabulary and a
+ "model" that prefers prose, so no torch and no API key are needed.
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_json_grammar.py
+
+ WHAT IT TESTS:
+   ✅ Valid CompanyProfile documents are accepted character by character
+   ✅ Prose, unknown/duplicate keys, wrong types and early closes are rejected
+   ✅ Constrained decoding of a prose-loving model always yields a valid profile
+   ✅ The architect passes the schema and records local vs Gemini outcomes
+====================================================================
+"""
+
+import sys
+import os
+import json
+import random
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.intelligence_service as intelligence_module
+from services.intelligence_service import IntelligenceService, ARCHITECT_JSON_SCHEMA
+from services.json_grammar import JSONSchemaMatcher, constrained_choice, MAX_WHITESPACE_RUN
+from services.local_inference import LocalInferenceWorker
+from services.llm_json import parse_llm_json
+from services.llm_schemas import CompanyProfile
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+PROFILE = {
+    "name": "Acme", "industry": "Tech", "size": None, "interview_style": 'Fast, "bar-raiser" led – über strict',
+    "cultural_values": ["Ownership", "Writing"],
+    "interview_rounds": {"Coding": {"focus": "DSA", "weights": [1, 2.5, -3e2, True, None, {}]}},
+    "red_flags": []
+}
+
+TARGET = json.dumps(PROFILE, indent=1)
+PROSE = ["Sure", "!", " Here", " is", " the", " profile", ":", "```", "json"]
+VOCAB = PROSE + ['"name"', '"industry"', '"interview_style"', '"interview_rounds"', '"red_flags"', ": ", ", ", "\n ", "null", "true", "Acme", " Tech"]
+VOCAB += [ch for ch in sorted(set(TARGET)) if ch not in VOCAB]
+
+
+def simulate(seed, top_k=None, max_steps=2000):
+    """
+    Greedy decoding over VOCAB with a "model" that would rather open with a chatty preamble:
+    before the document starts prose tokens score highest, tokens continuing TARGET next,
+    the rest is noise. Returns (text, forced count).
+    """
+    rng = random.Random(seed)
+    grammar = JSONSchemaMatcher(ARCHITECT_JSON_SCHEMA)
+    char_tokens = {text: i for i, text in enumerate(VOCAB) if len(text) == 1}
+    eos = len(VOCAB)
+    text, forced_count = "", 0
+    for _ in range(max_steps):
+        scores = [rng.random() + (5 if token in PROSE and not text else 0) + (3 if TARGET.startswith(text + token) else 0) for token in VOCAB]
+        ranked = sorted(range(len(VOCAB)), key=lambda t: -scores[t])[:top_k]
+        token, forced = constrained_choice(grammar, ranked, lambda t: VOCAB[t], char_tokens, lambda t: scores[t], eos)
+        forced_count += forced
+        if token == eos:
+            break
+        if not grammar.feed(VOCAB[token]):
+            raise AssertionError(f"Chosen token {VOCAB[token]!r} rejected after {text!r}")
+        text += VOCAB[token]
+    return text, forced_count
+
+
+def make_state(company="Acme"):
+    return {
+        "company_name": company, "industry": "Tech", "job_description": None, "research_data": None,
+        "is_synthetic": False, "confidence_score": 60, "generated_profile": None, "is_valid": False,
+        "iterations": 0, "sources": [], "search_query": None, "audited_data": "Acme runs a coding round.",
+        "audit_log": [], "error": None
+    }
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — JSON GRAMMAR TEST SUITE")
+    print("="*65)
+
+    # ── 1. Matcher ───────────────────────────────────────────────
+    print("\n[1] Schema Matcher")
+    for label, text in (("compact", json.dumps(PROFILE)), ("indented", json.dumps(PROFILE, indent=2, ensure_ascii=False))):
+        grammar = JSONSchemaMatcher(ARCHITECT_JSON_SCHEMA)
+        check(f"Valid profile accepted ({label})", grammar.feed(text) and grammar.complete)
+    grammar = JSONSchemaMatcher(ARCHITECT_JSON_SCHEMA)
+    check("Leading prose rejected", not grammar.accepts("Sure") and not grammar.accepts("```") and grammar.accepts(" \n{"))
+    grammar.feed('{"name": "Acme"')
+    check("Close before required keys rejected", not grammar.accepts("}"))
+    check("Duplicate key rejected", not grammar.accepts(', "name"'))
+    check("Undeclared key rejected", not grammar.accepts(', "headquarters"') and grammar.accepts(', "in'))
+    check("Key prefix accepted mid-token", grammar.accepts(', "interview_'))
+    grammar.feed(', "industry": ')
+    check("Wrong type rejected", not grammar.accepts("42") and not grammar.accepts("[") and grammar.accepts('"Tech"'))
+    check("Raw newline in string rejected", not grammar.accepts('"Te\nch"') and grammar.accepts('"Te\\nch \\u00e9"'))
+    check("Bad escape rejected", not grammar.accepts('"\\x41"'))
+    grammar.feed('"Tech", "interview_style": "x", "interview_rounds": {"R1": {"n": 1')
+    check("Free-form round values accept numbers", grammar.accepts(".5e-3}}}") and not grammar.accepts(".}"))
+    check("Whitespace runs are capped", grammar.accepts(" " * MAX_WHITESPACE_RUN + "}") and not grammar.accepts(" " * (MAX_WHITESPACE_RUN + 1)))
+    grammar.feed("}}}")
+    check("Complete after the closing brace", grammar.complete and grammar.accepts("\n") and not grammar.accepts(" trailing"))
+
+    # ── 2. Constrained decoding ──────────────────────────────────
+    print("\n[2] Constrained Decoding")
+    outputs = [simulate(seed) for seed in range(20)]
+    valid = 0
+    for text, _ in outputs:
+        try:
+            parse_llm_json(text, CompanyProfile)
+            json.loads(text)
+            valid += 1
+        except Exception:
+            pass
+    check("Every completed generation is a valid profile", valid == len(outputs), f"{valid}/{len(outputs)}")
+    check("No prose leaked into the output", not any(text.lstrip().startswith(("Sure", "Here", "`")) for text, _ in outputs))
+    text, forced = simulate(7, top_k=3)
+    check("Forced characters keep top-3 decoding valid", forced > 0 and parse_llm_json(text, CompanyProfile)["name"] is not None, f"{forced} forced")
+    grammar = JSONSchemaMatcher(ARCHITECT_JSON_SCHEMA)
+    grammar.feed(json.dumps(PROFILE))
+    check("EOS once complete", constrained_choice(grammar, [0, 1], lambda t: VOCAB[t], {}, lambda t: 0.0, eos_token=99) == (99, False))
+
+    # ── 3. Architect outcomes ────────────────────────────────────
+    print("\n[3] Architect Outcomes")
+    libs = intelligence_module.HAS_LOCAL_ML_LIBS
+    intelligence_module.HAS_LOCAL_ML_LIBS = False
+    service = IntelligenceService()
+    intelligence_module.HAS_LOCAL_ML_LIBS = libs
+
+    seen = []
+    replies = []
+    def fake_batch(requests):
+        seen.extend(requests)
+        return [(replies.pop(0), "json_complete") for _ in requests]
+
+    gemini_calls = []
+    async def fake_gemini_json(prompt, call_type="generate_json", schema=None, **kwargs):
+        gemini_calls.append(call_type)
+        return dict(PROFILE, name="From Gemini")
+
+    service._inference = LocalInferenceWorker(fake_batch, batch_window=0.01)
+    intelligence_module.gemini_service.generate_json = fake_gemini_json
+    try:
+        service.model_state = "ready"
+        replies.append(json.dumps(PROFILE))
+        state = await service.architect_node(make_state())
+        check("Valid local profile used", state["generated_profile"]["name"] == "Acme" and not gemini_calls)
+        check("Schema and prefix sent with the request", seen[0].grammar is not None and seen[0].prefix == intelligence_module.ARCHITECT_PROMPT_PREFIX)
+
+        replies.append(json.dumps(PROFILE)[:40])
+        state = await service.architect_node(make_state())
+        check("Truncated local output → Gemini", state["generated_profile"]["name"] == "From Gemini" and gemini_calls == ["architect"])
+
+        service.model_state = "loading"
+        await service.architect_node(make_state())
+        stats = service.model_status()["architect"]
+        check("Outcomes counted", stats["local"] == 1 and stats["invalid"] == 1 and stats["not_ready"] == 1, stats)
+        check("Fallback rate ignores not-ready calls", stats["gemini_fallback_rate"] == 0.5, stats["gemini_fallback_rate"])
+    finally:
+        del intelligence_module.gemini_service.generate_json
+        service._inference.stop()
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL JSON GRAMMAR TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
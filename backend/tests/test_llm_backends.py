@@ -0,0 +1,164 @@
+"""
+====================================================================
+ TEST: LLM Backends — Fake, Record/Replay & Gemini Stand-in Server
+====================================================================
+ Tests llm_backends.py and scripts/fake_gemini_server.py. No API key
+ or network needed (the stand-in server runs on localhost).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_llm_backends.py
+
+ WHAT IT TESTS:
+   ✅ Latency specs parse into samplers
+   ✅ Prompts are classified into call types
+   ✅ Canned output validates against every llm_schemas model
+   ✅ Recording + replay round-trip (timestamps masked, order kept)
+   ✅ Replay miss raises CassetteMissError
+   ✅ google-genai SDK works against the stand-in server (plain + stream)
+====================================================================
+"""
+
+import sys
+import os
+import json
+import random
+import asyncio
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from services.llm_backends import (
+    FakeBackend, RecordingBackend, ReplayBackend, GeminiBackend, CassetteMissError,
+    parse_latency, classify_prompt, CANNED_RESPONSES
+)
+from services.llm_json import parse_llm_json
+from services.llm_schemas import ResumeAnalysis, AnswerEvaluation, Scorecard, LearningRoadmap, RouterDecision, AuditResult, CompanyProfile
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — LLM BACKENDS TEST SUITE")
+    print("="*65)
+
+    # ── 1. Latency specs ──────────────────────────────────────────
+    print("\n[1] Latency Distributions")
+    rng = random.Random(7)
+    check("Fixed", parse_latency("fixed:0.5")(rng) == 0.5)
+    samples = [parse_latency("uniform:0.2,0.4")(rng) for _ in range(200)]
+    check("Uniform stays in range", 0.2 <= min(samples) and max(samples) <= 0.4)
+    samples = sorted(parse_latency("lognormal:0.8,0.4")(rng) for _ in range(500))
+    check("Lognormal median ≈ 0.8", 0.7 < samples[250] < 0.9, f"{samples[250]:.2f}")
+    try:
+        parse_latency("pareto:1")
+        check("Unknown distribution rejected", False)
+    except ValueError:
+        check("Unknown distribution rejected", True)
+
+    # ── 2. Canned output ─────────────────────────────────────────
+    print("\n[2] Prompt Classification & Canned Output")
+    check("Evaluation prompt classified", classify_prompt("... RATING CRITERIA (1-10) ...") == "evaluate_answer")
+    check("Repair prompt maps to its schema", classify_prompt("supposed to be a single JSON object matching the Scorecard schema") == "master_report")
+    check("Unknown prompt is a question", classify_prompt("Please ask the first Technical question.") == "interview_question")
+
+    schemas = {
+        "resume_analysis": ResumeAnalysis, "evaluate_answer": AnswerEvaluation, "master_report": Scorecard,
+        "learning_roadmap": LearningRoadmap, "router": RouterDecision, "auditor": AuditResult, "architect": CompanyProfile
+    }
+    invalid = []
+    for call_type, schema in schemas.items():
+        try:
+            parse_llm_json(json.dumps(CANNED_RESPONSES[call_type]), schema)
+        except Exception as e:
+            invalid.append(f"{call_type}: {e}")
+    check("Canned JSON validates against all schemas", not invalid, invalid)
+
+    fake = FakeBackend(latency="fixed:0")
+    response = await fake.generate("m", "anything", call_type="evaluate_answer_repair")
+    check("Repair call gets base-type output", json.loads(response.text)["score"] == 7.0)
+    chunks = [c async for c in fake.stream("m", "Please ask the next question.", call_type="interview_question")]
+    check("Stream yields several chunks", len(chunks) > 1 and "".join(c.text for c in chunks) == CANNED_RESPONSES["interview_question"])
+    check("Usage reported on last chunk", chunks[-1].usage_metadata.candidates_token_count > 0)
+
+    # ── 3. Record / replay ───────────────────────────────────────
+    print("\n[3] Record & Replay")
+    cassette = os.path.join(tempfile.mkdtemp(), "cassette.jsonl")
+    counter = {"n": 0}
+
+    class CountingBackend(FakeBackend):
+        async def generate(self, model, contents, config=None, call_type=None):
+            counter["n"] += 1
+            response = await super().generate(model, contents, config, call_type)
+            response.text = f"{response.text} #{counter['n']}"
+            return response
+
+    recorder = RecordingBackend(CountingBackend(), cassette)
+    await recorder.generate("m", "Current Date/Time: 2026-01-01 10:00:00. Hello", call_type="generate_text")
+    await recorder.generate("m", "Current Date/Time: 2026-01-01 10:00:05. Hello", call_type="generate_text")
+    [c async for c in recorder.stream("m", "Stream me", call_type="interview_question")]
+    with open(cassette, encoding="utf-8") as f:
+        lines = f.readlines()
+    check("Every call appended to cassette", len(lines) == 3, len(lines))
+
+    replay = ReplayBackend(cassette)
+    first = await replay.generate("m", "Current Date/Time: 2027-06-30 23:59:59. Hello", call_type="generate_text")
+    second = await replay.generate("m", "Current Date/Time: 2027-06-30 23:59:59. Hello", call_type="generate_text")
+    check("Timestamps masked in key", first.text.endswith("#1"), first.text)
+    check("Duplicate requests replay in order", second.text.endswith("#2"), second.text)
+    streamed = "".join([c.text async for c in replay.stream("m", "Stream me", call_type="interview_question")])
+    check("Recorded stream replays", streamed == CANNED_RESPONSES["interview_question"])
+    try:
+        await replay.generate("m", "Never recorded", call_type="generate_text")
+        check("Replay miss raises", False)
+    except CassetteMissError:
+        check("Replay miss raises", True)
+
+    # ── 4. Stand-in server ───────────────────────────────────────
+    print("\n[4] Gemini Stand-in Server (google-genai SDK)")
+    from fake_gemini_server import create_server
+    from google import genai
+    from google.genai import types
+
+    server = create_server(port=0, latency="fixed:0")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = genai.Client(api_key="fake", http_options=types.HttpOptions(base_url=f"http://127.0.0.1:{server.server_address[1]}"))
+        backend = GeminiBackend(client)
+        response = await backend.generate("gemini-2.0-flash", "Analyze this company name: 'Acme'", types.GenerateContentConfig(response_mime_type="application/json"))
+        check("generateContent returns canned router JSON", json.loads(response.text)["is_ambiguous"] is False, response.text[:60])
+        check("Usage metadata parsed by SDK", response.usage_metadata.prompt_token_count > 0)
+        chunks = [c async for c in backend.stream("gemini-2.0-flash", "Please ask the first Technical question.")]
+        check("streamGenerateContent streams chunks", len(chunks) > 1 and "".join(c.text for c in chunks) == CANNED_RESPONSES["interview_question"], len(chunks))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL LLM BACKEND TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
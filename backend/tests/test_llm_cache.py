@@ -0,0 +1,110 @@
+"""
+====================================================================
+ TEST: LLM Response Cache
+====================================================================
+ Tests the llm_cache.py two-tier cache in isolation (no Gemini needed).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_llm_cache.py
+
+ WHAT IT TESTS:
+   ✅ Prompt fingerprint ignores whitespace, separates call types
+   ✅ Memory hit / disk hit / miss counters
+   ✅ LRU eviction of the in-memory tier
+   ✅ TTL expiry
+   ✅ Persistence across instances (SQLite tier)
+   ✅ Non-cacheable call types are never stored
+====================================================================
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.llm_cache import LLMCache, request_fingerprint
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — LLM CACHE TEST SUITE")
+    print("="*65)
+
+    tmp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(tmp_dir, "llm_cache.sqlite3")
+
+    # ── 1. Fingerprints ───────────────────────────────────────────
+    print("\n[1] Prompt Fingerprints")
+    a = request_fingerprint("gemini-2.0-flash", "Analyze   this\n company: 'Acme'", call_type="router")
+    b = request_fingerprint("gemini-2.0-flash", "Analyze this company: 'Acme'", call_type="router")
+    c = request_fingerprint("gemini-2.0-flash", "Analyze this company: 'Acme'", call_type="auditor")
+    d = request_fingerprint("gemini-1.5-pro", "Analyze this company: 'Acme'", call_type="router")
+    check("Whitespace-insensitive", a == b)
+    check("Call type is part of the key", b != c)
+    check("Model is part of the key", b != d)
+
+    # ── 2. Hit / miss counters ────────────────────────────────────
+    print("\n[2] Memory & Disk Tiers")
+    cache = LLMCache(db_path=db_path, max_entries=2, ttls={"router": 60, "short": 1})
+    check("Miss on empty cache", cache.get_sync("router", "k1") is None)
+    cache.set_sync("router", "k1", "v1")
+    check("Memory hit after set", cache.get_sync("router", "k1") == "v1")
+
+    fresh = LLMCache(db_path=db_path, max_entries=2, ttls={"router": 60})
+    check("Disk hit from a new instance", fresh.get_sync("router", "k1") == "v1")
+    check("Disk hit promoted to memory", fresh.get_sync("router", "k1") == "v1")
+    stats = fresh.stats()["by_call_type"]["router"]
+    check("Counters tracked", stats == {"memory_hits": 1, "disk_hits": 1, "misses": 0}, stats)
+    totals = cache.stats()
+    check("Hit rate reported", totals["hits"] == 1 and totals["misses"] == 1 and totals["hit_rate"] == 0.5, totals)
+    check("Counts for /metrics", cache.request_counts() == {("router", "hit"): 1, ("router", "miss"): 1}, cache.request_counts())
+
+    # ── 3. LRU eviction ───────────────────────────────────────────
+    print("\n[3] LRU Eviction")
+    cache.set_sync("router", "k2", "v2")
+    cache.get_sync("router", "k1")          # k1 becomes most recently used
+    cache.set_sync("router", "k3", "v3")    # evicts k2 from memory
+    check("Memory tier bounded", cache.stats()["memory_entries"] == 2)
+    check("LRU entry evicted from memory", "k2" not in cache._memory)
+    check("Recently used entry kept", "k1" in cache._memory)
+    check("Evicted entry still on disk", cache.get_sync("router", "k2") == "v2")
+
+    # ── 4. TTL & opt-in ───────────────────────────────────────────
+    print("\n[4] TTL Expiry & Opt-in")
+    cache.set_sync("short", "k4", "v4")
+    check("Fresh entry served", cache.get_sync("short", "k4") == "v4")
+    time.sleep(1.1)
+    check("Expired entry dropped", cache.get_sync("short", "k4") is None)
+    cache.set_sync("interview_question", "k5", "v5")
+    check("Non-cacheable call type not stored", cache.get_sync("interview_question", "k5") is None)
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL LLM CACHE TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all()
+    sys.exit(0 if success else 1)
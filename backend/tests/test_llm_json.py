@@ -0,0 +1,131 @@
+"""
+====================================================================
+ TEST: Shared LLM JSON Parser & Output Schemas
+====================================================================
+ Tests llm_json.py + llm_schemas.py in isolation (no Gemini needed).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_llm_json.py
+
+ WHAT IT TESTS:
+   ✅ Bare JSON, ```json fences and surrounding prose are all parsed
+   ✅ Braces inside strings don't confuse the extractor
+   ✅ Truncated / non-JSON output raises LLMJSONError (no silent defaults)
+   ✅ Schema validation coerces types and rejects out-of-range scores
+   ✅ Aliased keys ("Technical Skills") survive the round trip
+   ✅ Streaming tracker spots the end of the first JSON object
+====================================================================
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.llm_json import parse_llm_json, extract_json_text, LLMJSONError, JSONCompletionTracker
+from services.llm_schemas import AnswerEvaluation, Scorecard, CompanyProfile
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+def raises(fn):
+    try:
+        fn()
+        return False
+    except LLMJSONError:
+        return True
+
+
+EVALUATION = {
+    "score": "7.5",
+    "feedback": "Solid answer {with braces} in text",
+    "executive_summary": "Good.",
+    "vibe_analysis": {"confidence_score": 7, "hesitation_level": "Low", "assertiveness": "ok", "technical_depth": "Moderate"},
+    "star_analysis": {"has_situation": True, "has_task": True, "has_action": False, "has_result": False, "missing_parts": ["A", "R"]},
+    "can_proceed": True
+}
+
+
+def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — LLM JSON PARSER TEST SUITE")
+    print("="*65)
+
+    raw = json.dumps(EVALUATION)
+
+    # ── 1. Extraction ─────────────────────────────────────────────
+    print("\n[1] JSON Extraction")
+    check("Bare JSON", parse_llm_json(raw)["score"] == "7.5")
+    check("```json fenced", parse_llm_json(f"```json\n{raw}\n```")["executive_summary"] == "Good.")
+    check("Prose around JSON", parse_llm_json(f"Here is the evaluation:\n{raw}\nHope this helps!")["can_proceed"] is True)
+    check("Braces inside strings", extract_json_text('x {"a": "}{", "b": 1} y') == '{"a": "}{", "b": 1}')
+    check("Truncated output raises", raises(lambda: parse_llm_json(raw[:-10])))
+    check("No JSON raises", raises(lambda: parse_llm_json("I cannot help with that.")))
+    check("Empty output raises", raises(lambda: parse_llm_json("")))
+
+    # ── 2. Schema validation ──────────────────────────────────────
+    print("\n[2] Schema Validation")
+    evaluation = parse_llm_json(raw, AnswerEvaluation)
+    check("Score coerced to float", evaluation["score"] == 7.5, evaluation["score"])
+    bad_score = dict(EVALUATION, score=75)
+    check("Out-of-range score rejected", raises(lambda: parse_llm_json(json.dumps(bad_score), AnswerEvaluation)))
+    missing = {k: v for k, v in EVALUATION.items() if k != "feedback"}
+    check("Missing required field rejected", raises(lambda: parse_llm_json(json.dumps(missing), AnswerEvaluation)))
+    check("Array where object expected rejected", raises(lambda: parse_llm_json("[1, 2]", AnswerEvaluation)))
+
+    scorecard = parse_llm_json(json.dumps({
+        "overall_score": 8, "final_verdict": "HIRE", "key_strengths": ["a"], "key_weaknesses": ["b"],
+        "competency_breakdown": {"Technical Skills": 8, "Communication": 7, "Leadership": 6, "Problem Solving": 9},
+        "recruiter_closing_note": "ok"
+    }), Scorecard)
+    check("Aliased keys preserved", "Technical Skills" in scorecard["competency_breakdown"], list(scorecard["competency_breakdown"]))
+
+    profile = parse_llm_json(json.dumps({
+        "name": "Acme", "industry": "Tech", "interview_style": "Fast",
+        "interview_rounds": {"Coding": {"focus": "DSA"}}, "hq": "Pune"
+    }), CompanyProfile)
+    check("Profile keeps free-form rounds", profile["interview_rounds"] == {"Coding": {"focus": "DSA"}})
+    check("Profile keeps extra keys", profile.get("hq") == "Pune")
+
+    # ── 3. Streaming completion ───────────────────────────────────
+    print("\n[3] JSON Completion Tracker")
+    def complete_after(pieces):
+        tracker = JSONCompletionTracker()
+        for i, piece in enumerate(pieces):
+            if tracker.feed(piece):
+                return i
+        return None
+    check("Completes on the closing brace", complete_after(["Sure: ", '{"a": ', "[1, {", '"b": 2}]', "}", " more"]) == 4)
+    check("Braces and escaped quotes in strings ignored", complete_after(['{"a": "}', '\\"}', '"', "}"]) == 3)
+    check("Top-level array", complete_after(["[1, ", "2]"]) == 1)
+    check("Unbalanced output never completes", complete_after([raw[:-10]]) is None)
+    tracker = JSONCompletionTracker()
+    tracker.feed(raw + " trailing {")
+    check("Stays complete after the object", tracker.complete and tracker.feed("}") is True)
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL LLM JSON TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,237 @@
+"""
+====================================================================
+ TEST: LLM Resilience — Retry, AIMD Limiter & Circuit Breaker
+====================================================================
+ Tests llm_resilience.py in isolation (attempts are local stubs that
+ raise google-genai errors; no API key or network needed).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_llm_resilience.py
+
+ WHAT IT TESTS:
+   ✅ Errors are classified (429 / 5xx / timeout / client)
+   ✅ Jittered backoff stays within its cap
+   ✅ AIMD limit halves on 429 and grows back on success
+   ✅ Limiter blocks callers above the limit, FIFO, without leaking slots
+   ✅ Transient failures are retried; client errors are not
+   ✅ Breaker opens, fails fast, and closes after a probe
+   ✅ A cancelled half-open probe does not wedge the breaker
+   ✅ Fallback serves the call when Gemini is unavailable
+====================================================================
+"""
+
+import sys
+import os
+import random
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.genai import errors
+from services.llm_resilience import (
+    LLMResilience, RetryPolicy, AIMDLimiter, CircuitBreaker, CircuitOpenError, classify_error
+)
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+def api_error(code):
+    cls = errors.ClientError if code < 500 else errors.ServerError
+    return cls(code, {"error": {"code": code, "message": "stub", "status": "RESOURCE_EXHAUSTED" if code == 429 else "ERROR"}})
+
+
+def flaky(failures, code=503, result="OK"):
+    """Attempt stub: raises `failures` times, then succeeds."""
+    state = {"calls": 0}
+    async def attempt():
+        state["calls"] += 1
+        if state["calls"] <= failures:
+            raise api_error(code)
+        return result
+    return attempt, state
+
+
+def make(threshold=3, attempts=3):
+    return LLMResilience(
+        retry=RetryPolicy(max_attempts=attempts, base_delay=0.001, max_delay=0.01),
+        limiter=AIMDLimiter(initial=4, min_limit=1, max_limit=4, cooldown_seconds=0),
+        breaker=CircuitBreaker(failure_threshold=threshold, reset_timeout=0.1)
+    )
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — LLM RESILIENCE TEST SUITE")
+    print("="*65)
+
+    # ── 1. Classification & backoff ──────────────────────────────
+    print("\n[1] Error Classification & Backoff")
+    kinds = [classify_error(e) for e in (api_error(429), api_error(503), asyncio.TimeoutError(), api_error(400), ValueError())]
+    check("429/5xx/timeout/client/other", kinds == ["rate_limit", "server", "timeout", "client", "other"], kinds)
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=4, rng=random.Random(1))
+    delays = [policy.delay(a) for a in range(10) for _ in range(20)]
+    check("Backoff capped at max_delay", max(delays) <= 4 and min(delays) >= 0, f"max={max(delays):.2f}")
+
+    # ── 2. AIMD limiter ──────────────────────────────────────────
+    print("\n[2] AIMD Concurrency Limiter")
+    limiter = AIMDLimiter(initial=8, min_limit=1, max_limit=8, cooldown_seconds=0)
+    await limiter.acquire()
+    limiter.release("rate_limit")
+    check("Limit halved on 429", limiter._capacity() == 4, limiter._capacity())
+    for _ in range(20):
+        await limiter.acquire()
+        limiter.release("ok")
+    check("Limit grows back additively", 6 <= limiter._capacity() <= 8, f"{limiter.limit:.2f}")
+
+    limiter = AIMDLimiter(initial=2, min_limit=1, max_limit=2)
+    await limiter.acquire()
+    await limiter.acquire()
+    third = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    check("Third caller waits at limit 2", not third.done())
+    limiter.release("ok")
+    await asyncio.wait_for(third, 1)
+    check("Released slot wakes the waiter", third.done() and limiter.in_flight == 2)
+
+    limiter = AIMDLimiter(initial=1, min_limit=1, max_limit=1)
+    await limiter.acquire()
+    order = []
+    async def queued(name):
+        await limiter.acquire()
+        order.append(name)
+    first = asyncio.create_task(queued("first"))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(queued("second"))
+    await asyncio.sleep(0.01)
+    limiter.release("ok")   # hands the slot to `first`...
+    first.cancel()          # ...which is cancelled before it resumes
+    await asyncio.gather(first, return_exceptions=True)
+    await asyncio.sleep(0.01)
+    check("Slot of a cancelled waiter passes to the next", second.done() and order == ["second"] and limiter.in_flight == 1, (order, limiter.in_flight))
+    limiter.release("ok")
+
+    await limiter.acquire()
+    order.clear()
+    waiters = [asyncio.create_task(queued(n)) for n in ("a", "b", "c")]
+    await asyncio.sleep(0.01)
+    for _ in range(3):
+        limiter.release("ok")
+        await asyncio.sleep(0.01)
+    done, pending = await asyncio.wait(waiters, timeout=1)
+    for task in pending:
+        task.cancel()
+    check("Waiters served in FIFO order", order == ["a", "b", "c"], order)
+
+    # ── 3. Retry ─────────────────────────────────────────────────
+    print("\n[3] Retry")
+    resilience = make()
+    attempt, state = flaky(2)
+    text, from_fallback = await resilience.call(attempt, "generate_text", timeout=1)
+    check("Transient failures retried to success", text == "OK" and state["calls"] == 3 and not from_fallback, state)
+
+    attempt, state = flaky(1, code=400)
+    try:
+        await make().call(attempt, "generate_text", timeout=1)
+        check("Client error not retried", False)
+    except errors.ClientError:
+        check("Client error not retried", state["calls"] == 1, state)
+
+    attempt, state = flaky(1)
+    try:
+        await make().call(attempt, "generate_text", timeout=1, can_retry=lambda: False)
+        check("Streaming call not retried after output", False)
+    except errors.ServerError:
+        check("Streaming call not retried after output", state["calls"] == 1)
+
+    async def hang():
+        await asyncio.sleep(1)
+    try:
+        await make(attempts=1).call(hang, "generate_text", timeout=0.05)
+        check("Hung call times out", False)
+    except asyncio.TimeoutError:
+        check("Hung call times out", True)
+
+    # ── 4. Circuit breaker ───────────────────────────────────────
+    print("\n[4] Circuit Breaker")
+    resilience = make(threshold=3, attempts=3)
+    attempt, state = flaky(99)
+    try:
+        await resilience.call(attempt, "generate_text", timeout=1)
+    except errors.ServerError:
+        pass
+    check("Breaker opens after threshold", resilience.breaker.state == "open", resilience.breaker.state)
+    try:
+        await resilience.call(attempt, "generate_text", timeout=1)
+        check("Open breaker fails fast", False)
+    except CircuitOpenError:
+        check("Open breaker fails fast", state["calls"] == 3, state)
+
+    await asyncio.sleep(0.15)
+    attempt, state = flaky(0)
+    text, _ = await resilience.call(attempt, "generate_text", timeout=1)
+    check("Probe closes the breaker", text == "OK" and resilience.breaker.state == "closed")
+
+    resilience = make(threshold=1, attempts=1)
+    attempt, _ = flaky(99)
+    try:
+        await resilience.call(attempt, "generate_text", timeout=1)
+    except errors.ServerError:
+        pass
+    await asyncio.sleep(0.15)
+    probe = asyncio.create_task(resilience.call(hang, "generate_text", timeout=1))
+    await asyncio.sleep(0.02)
+    probe.cancel()
+    await asyncio.gather(probe, return_exceptions=True)
+    attempt, state = flaky(0)
+    try:
+        text, _ = await resilience.call(attempt, "generate_text", timeout=1)
+    except CircuitOpenError:
+        text = None
+    check("Cancelled probe frees the half-open slot", text == "OK" and resilience.breaker.state == "closed", resilience.breaker.state)
+
+    # ── 5. Fallback ──────────────────────────────────────────────
+    print("\n[5] Pluggable Fallback")
+    resilience = make(threshold=1, attempts=1)
+    seen = []
+    async def local_model(contents, config, call_type):
+        seen.append((contents, call_type))
+        return "APPROVED (local)"
+    resilience.register_fallback(["critic"], local_model)
+    attempt, _ = flaky(99)
+    text, from_fallback = await resilience.call(attempt, "critic", timeout=1, contents="Review this profile")
+    check("Fallback used when retries exhausted", text == "APPROVED (local)" and from_fallback)
+    text, from_fallback = await resilience.call(attempt, "critic", timeout=1, contents="Review this profile")
+    check("Fallback used when breaker is open", from_fallback and len(seen) == 2)
+    try:
+        await resilience.call(attempt, "evaluate_answer", timeout=1)
+        check("No fallback → CircuitOpenError", False)
+    except CircuitOpenError:
+        check("No fallback → CircuitOpenError", True)
+    check("Stats tracked", resilience.stats()["fallbacks"] == 2, resilience.stats())
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL LLM RESILIENCE TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
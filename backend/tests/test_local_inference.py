@@ -0,0 +1,281 @@
+"""
+====================================================================
+ TEST: Local Inference — Dynamic Batching Worker
+====================================================================
+ Tests local_inference.py. The batching worker runs against a fake
+ generate function; the real TransformersBatchGenerator runs against
+ a tiny randomly initialised GPT-2 on CPU when torch/transformers are
+ installed (that section is skipped otherwise). No API key needed.
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_local_inference.py
+
+ WHAT IT TESTS:
+   ✅ Concurrent prompts are batched within the window
+   ✅ Batches never exceed the max size; results go to the right caller
+   ✅ Timed-out requests are dropped before they run
+   ✅ A failing batch fails only its own requests
+   ✅ Early stop on balanced JSON; per-call token and time budgets
+   ✅ Cancelled generations stop and free the worker immediately
+   ✅ Static prompt prefixes reach the generator, grouped per batch
+   ✅ Prefix KV-cache reuse gives the same output as a full prefill (tiny model)
+   ✅ Left-padded batches match one-by-one generation (tiny model)
+====================================================================
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.local_inference import LocalInferenceWorker, TransformersBatchGenerator, GenerationRequest, group_by_prefix
+
+try:
+    import torch
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    HAS_TORCH = True
+except ImportError:
+    HAS_TORCH = False
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+class FakeModel:
+    """
+    Mimics generate(): `step` seconds of prefill regardless of batch size, then a token loop that
+    asks every row's request whether to stop, like the stopping criterion does. Prompts in
+    `scripts` emit those tokens; others emit one answer token.
+    """
+    def __init__(self, step=0.1, token_seconds=0.0):
+        self.step = step
+        self.token_seconds = token_seconds
+        self.scripts = {}
+        self.batches = []
+        self.threads = set()
+        self.fail_on = None
+        self.tokens_generated = 0
+        self.prefixes = []
+
+    def __call__(self, requests):
+        prompts = [r.prompt for r in requests]
+        self.batches.append(prompts)
+        self.prefixes.append([r.prefix for r in requests])
+        self.threads.add(threading.get_ident())
+        time.sleep(self.step)
+        if self.fail_on and self.fail_on in prompts:
+            raise RuntimeError("CUDA out of memory")
+        scripts = [self.scripts.get(r.prompt, [f"answer to {r.prompt} ({r.max_new_tokens})"]) for r in requests]
+        outputs = [[] for _ in requests]
+        finished = [False] * len(requests)
+        position = 0
+        while not all(finished):
+            for i, request in enumerate(requests):
+                if finished[i]:
+                    continue
+                if position >= len(scripts[i]):
+                    finished[i] = True  # EOS
+                    continue
+                outputs[i].append(scripts[i][position])
+                self.tokens_generated += 1
+                finished[i] = request.check(scripts[i][position]) is not None
+            position += 1
+            time.sleep(self.token_seconds)
+        return [("".join(out), r.stop_reason or "eos") for out, r in zip(outputs, requests)]
+
+
+def tiny_model():
+    words = "the acme interview has three rounds coding design behavioral onsite screen team final".split()
+    vocab = {"<eos>": 0, "<unk>": 1, **{w: i + 2 for i, w in enumerate(words)}}
+    backend = Tokenizer(models.WordLevel(vocab=vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=backend, eos_token="<eos>", unk_token="<unk>")
+    torch.manual_seed(0)
+    config = GPT2Config(vocab_size=len(vocab), n_positions=64, n_embd=32, n_layer=2, n_head=2, bos_token_id=0, eos_token_id=0)
+    return GPT2LMHeadModel(config).eval(), tokenizer
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — LOCAL INFERENCE TEST SUITE")
+    print("="*65)
+
+    # ── 1. Batching ──────────────────────────────────────────────
+    print("\n[1] Dynamic Batching")
+    model = FakeModel(step=0.1)
+    worker = LocalInferenceWorker(model, max_batch_size=4, batch_window=0.05)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(worker.generate(f"p{i}", max_new_tokens=10 + i) for i in range(4)))
+    elapsed = time.perf_counter() - started
+    check("4 concurrent prompts → 1 batch", len(model.batches) == 1 and len(model.batches[0]) == 4, model.batches)
+    check("Batched run takes one step, not four", elapsed < 0.3, f"{elapsed:.2f}s")
+    check("Each caller gets its own result", results == [f"answer to p{i} ({10 + i})" for i in range(4)], results)
+
+    model.batches.clear()
+    results = await asyncio.gather(*(worker.generate(f"q{i}") for i in range(10)))
+    check("Batches capped at max size", [len(b) for b in model.batches] == [4, 4, 2], [len(b) for b in model.batches])
+    check("All 10 answered in order", results == [f"answer to q{i} (450)" for i in range(10)])
+    check("Model only touched by the worker thread", len(model.threads) == 1 and threading.get_ident() not in model.threads)
+
+    model.batches.clear()
+    await worker.generate("alone")
+    check("Single prompt still served after the window", model.batches == [["alone"]])
+
+    # ── 2. Timeouts & errors ─────────────────────────────────────
+    print("\n[2] Timeouts and Errors")
+    model.batches.clear()
+    blocker = asyncio.ensure_future(worker.generate("blocker"))
+    await asyncio.sleep(0.06)  # blocker's batch is now running
+    try:
+        await worker.generate("impatient", timeout=0.01)
+        check("Caller timeout raised", False)
+    except asyncio.TimeoutError:
+        check("Caller timeout raised", True)
+    await blocker
+    await worker.generate("after")
+    check("Timed-out request never ran", all("impatient" not in b for b in model.batches), model.batches)
+    check("Expiry counted", worker.stats()["expired"] == 1)
+
+    model.fail_on = "poison"
+    results = await asyncio.gather(worker.generate("poison"), worker.generate("neighbour"), return_exceptions=True)
+    check("Failing batch fails its requests", all(isinstance(r, RuntimeError) for r in results))
+    model.fail_on = None
+    check("Worker survives the failure", await worker.generate("next") == "answer to next (450)")
+    stats = worker.stats()
+    check("Stats report batching", stats["batches"] >= 6 and stats["avg_batch_size"] > 1 and stats["errors"] == 1, stats)
+    worker.stop()
+    try:
+        worker.submit("late")
+        check("Stopped worker rejects work", False)
+    except RuntimeError:
+        check("Stopped worker rejects work", True)
+
+    # ── 3. Budgets & cancellation ────────────────────────────────
+    print("\n[3] Budgets and Cancellation")
+    model = FakeModel(step=0, token_seconds=0.01)
+    worker = LocalInferenceWorker(model, max_batch_size=4, batch_window=0.02)
+    model.scripts["profile"] = ["Here you go: ", "{", '"name": ', '"Acme}"', ", ", '"rounds": [1, 2]', "}", "\n\nHope", " this", " helps"]
+    text = await worker.generate("profile", stop_on_json=True)
+    check("Stops at the balanced JSON object", text == 'Here you go: {"name": "Acme}", "rounds": [1, 2]}', text)
+    text = await worker.generate("profile")
+    check("Plain text runs to EOS", text.endswith("helps"))
+
+    model.scripts["ramble"] = ["word "] * 1000
+    text = await worker.generate("ramble", max_new_tokens=5)
+    check("Token budget respected", text == "word " * 5)
+
+    started = time.perf_counter()
+    try:
+        await worker.generate("ramble", max_new_tokens=1000, timeout=0.2)
+        check("Time budget raises TimeoutError", False)
+    except TimeoutError:
+        elapsed = time.perf_counter() - started
+        check("Time budget raises TimeoutError", elapsed < 0.5, f"{elapsed:.2f}s")
+    tokens = model.tokens_generated
+    await asyncio.sleep(0.1)
+    check("Row stopped at the deadline (no tokens after)", model.tokens_generated == tokens)
+
+    task = asyncio.ensure_future(worker.generate("ramble", max_new_tokens=1000))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    started = time.perf_counter()
+    await worker.generate("quick")
+    elapsed = time.perf_counter() - started
+    check("Cancelled generation frees the worker at once", elapsed < 0.1, f"{elapsed:.2f}s")
+    check("Cancelled row stopped early", model.tokens_generated < tokens + 30, model.tokens_generated - tokens)
+
+    results = await asyncio.gather(
+        worker.generate("ramble", max_new_tokens=1000, timeout=0.1),
+        worker.generate("profile", stop_on_json=True),
+        return_exceptions=True
+    )
+    check("Budgets are per row within a batch", isinstance(results[0], TimeoutError) and results[1].endswith("[1, 2]}"), results)
+    reasons = worker.stats()["stop_reasons"]
+    check("Stop reasons recorded", {"json_complete", "max_tokens", "deadline", "cancelled", "eos"} <= set(reasons), reasons)
+    worker.stop()
+
+    # ── 4. Prefix reuse ──────────────────────────────────────────
+    print("\n[4] Prompt Prefixes")
+    policy = "POLICY: rounds, bias guard, schema.\n"
+    check("Prefix kept when the prompt starts with it", GenerationRequest(policy + "Acme", prefix=policy).prefix == policy)
+    check("Mismatched prefix ignored", GenerationRequest("Acme " + policy, prefix=policy).prefix is None)
+    check("Prefix equal to the whole prompt ignored", GenerationRequest(policy, prefix=policy).prefix is None)
+    batch = [GenerationRequest(policy + "A", prefix=policy), GenerationRequest("free text"), GenerationRequest(policy + "B", prefix=policy)]
+    check("Batch grouped by prefix, order kept", group_by_prefix(batch) == [(policy, [0, 2]), (None, [1])], group_by_prefix(batch))
+
+    model = FakeModel(step=0.05)
+    worker = LocalInferenceWorker(model, max_batch_size=4, batch_window=0.05)
+    results = await asyncio.gather(
+        worker.generate(policy + "Acme", prefix=policy),
+        worker.generate(policy + "Globex", prefix=policy),
+        worker.generate("plain")
+    )
+    check("Prefixed and plain prompts share a batch", len(model.batches) == 1 and model.prefixes[0] == [policy, policy, None], model.prefixes)
+    check("Answers still routed per caller", results[2] == "answer to plain (450)")
+    worker.stop()
+
+    # ── 5. Tiny model ────────────────────────────────────────────
+    print("\n[5] Tiny Model (CPU)")
+    if not HAS_TORCH:
+        print("  ⏩ torch / transformers not installed — skipping the real-model checks.")
+    else:
+        tiny, tokenizer = tiny_model()
+        generator = TransformersBatchGenerator(tiny, tokenizer)
+        prompts = ["the acme interview", "the acme interview has three rounds coding design", "team"]
+        solo = [generator([GenerationRequest(p, 8)])[0][0] for p in prompts]
+        batched = [text for text, _ in generator([GenerationRequest(p, 8) for p in prompts])]
+        check("Left-padded batch matches one-by-one", batched == solo, batched)
+        check("Only new tokens returned", not batched[1].startswith("the acme interview"))
+        short = generator([GenerationRequest(prompts[0], 3)] + [GenerationRequest(p, 8) for p in prompts[1:]])
+        check("Per-prompt token limit is a prefix", solo[0].startswith(short[0][0]) and short[0][1] in ("max_tokens", "eos"), short[0])
+        cancelled = GenerationRequest(prompts[0], 8)
+        cancelled.cancel()
+        started = time.perf_counter()
+        text, reason = generator([cancelled])[0]
+        check("Cancelled request stops after one token", reason == "cancelled" and len(text.split()) <= 1, (text, reason))
+        worker = LocalInferenceWorker(generator, max_batch_size=4, batch_window=0.05)
+        results = await asyncio.gather(*(worker.generate(p, max_new_tokens=8) for p in prompts))
+        check("Worker + tiny model", results == solo and worker.stats()["batches"] == 1, worker.stats())
+        worker.stop()
+
+        prefix = "the acme interview has three rounds"
+        suffixes = [" coding design", " team", " behavioral onsite screen final"]
+        full = [generator([GenerationRequest(prefix + s, 8)])[0][0] for s in suffixes]
+        generator.warm_prefix(prefix)
+        cached = [generator([GenerationRequest(prefix + s, 8, prefix=prefix)])[0][0] for s in suffixes]
+        check("Prefix-cached output matches full prefill", cached == full, cached)
+        batched = [text for text, _ in generator([GenerationRequest(prefix + s, 8, prefix=prefix) for s in suffixes])]
+        check("Batched suffixes (padded after the prefix) match", batched == full, batched)
+        stats = generator.prefix_stats
+        check("Prefix encoded once, then reused", stats["misses"] == 1 and stats["hits"] == 4 and stats["reused_tokens"] > 0, stats)
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL LOCAL INFERENCE TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,128 @@
+"""
+====================================================================
+ TEST: Metrics — Prometheus Text Exposition
+====================================================================
+ Tests metrics.py in isolation (fresh Registry, no server needed).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_metrics.py
+
+ WHAT IT TESTS:
+   ✅ Counters accumulate per label set
+   ✅ Histogram buckets are cumulative with +Inf, _sum and _count
+   ✅ Gauges and externally kept totals can be computed at scrape time
+   ✅ Label values are escaped; wrong label sets are rejected
+   ✅ DB pool snapshot reads QueuePool counters
+   ✅ The global catalogue renders
+====================================================================
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.metrics import Registry, REGISTRY, pool_snapshot
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — METRICS TEST SUITE")
+    print("="*65)
+
+    registry = Registry()
+    tokens = registry.counter("llm_tokens_total", "Tokens.", ("call_type", "kind"))
+    latency = registry.histogram("llm_call_duration_seconds", "Latency.", ("call_type",), buckets=(0.5, 1.0))
+    pool = registry.gauge("db_pool_connections", "Pool.", ("state",))
+
+    # ── 1. Counter ────────────────────────────────────────────────
+    print("\n[1] Counter")
+    tokens.inc(100, call_type="evaluate_answer", kind="prompt")
+    tokens.inc(50, call_type="evaluate_answer", kind="prompt")
+    tokens.inc(7, call_type="router", kind="output")
+    text = registry.render()
+    check("Values accumulate", 'llm_tokens_total{call_type="evaluate_answer",kind="prompt"} 150' in text)
+    check("TYPE line emitted", "# TYPE llm_tokens_total counter" in text)
+
+    # ── 2. Histogram ─────────────────────────────────────────────
+    print("\n[2] Histogram")
+    for value in (0.2, 0.7, 3.0):
+        latency.observe(value, call_type="evaluate_answer")
+    text = registry.render()
+    check("Buckets are cumulative", 'llm_call_duration_seconds_bucket{call_type="evaluate_answer",le="0.5"} 1' in text
+          and 'llm_call_duration_seconds_bucket{call_type="evaluate_answer",le="1"} 2' in text)
+    check("+Inf bucket counts everything", 'le="+Inf"} 3' in text)
+    check("_sum and _count", 'llm_call_duration_seconds_sum{call_type="evaluate_answer"} 3.9' in text
+          and 'llm_call_duration_seconds_count{call_type="evaluate_answer"} 3' in text)
+    with latency.time(call_type="router"):
+        pass
+    check("time() context manager observes", latency.count(call_type="router") == 1)
+
+    # ── 3. Gauge ─────────────────────────────────────────────────
+    print("\n[3] Gauge")
+    pool.set_function(lambda: {("checked_out",): 3, ("size",): 10})
+    text = registry.render()
+    check("Scrape-time values", 'db_pool_connections{state="checked_out"} 3' in text and 'db_pool_connections{state="size"} 10' in text)
+    cache_requests = registry.counter_function("llm_cache_requests_total", "Cache lookups.", ("call_type", "result"))
+    cache_requests.set_function(lambda: {("router", "hit"): 7})
+    text = registry.render()
+    check("Scrape-time totals typed as counters", "# TYPE llm_cache_requests_total counter" in text
+          and 'llm_cache_requests_total{call_type="router",result="hit"} 7' in text)
+
+    # ── 4. Labels ────────────────────────────────────────────────
+    print("\n[4] Labels")
+    tokens.inc(1, call_type='we"ird\n', kind="prompt")
+    check("Label values escaped", 'call_type="we\\"ird\\n"' in registry.render())
+    try:
+        tokens.inc(1, call_type="router")
+        check("Missing label rejected", False)
+    except ValueError:
+        check("Missing label rejected", True)
+
+    # ── 5. DB pool ───────────────────────────────────────────────
+    print("\n[5] DB Pool Snapshot")
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import QueuePool
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=4)
+    conn = engine.connect()
+    snapshot = pool_snapshot(engine)
+    conn.close()
+    check("Checked-out connections counted", snapshot.get(("checked_out",)) == 1 and snapshot.get(("size",)) == 4, snapshot)
+    check("Overflow never negative", snapshot.get(("overflow",)) == 0, snapshot)
+
+    # ── 6. Catalogue ─────────────────────────────────────────────
+    print("\n[6] Global Catalogue")
+    text = REGISTRY.render()
+    expected = ["http_request_duration_seconds", "llm_call_duration_seconds", "llm_tokens_total",
+                "langgraph_node_duration_seconds", "discovery_tier_hits_total", "db_pool_connections"]
+    check("All metric families declared", all(f"# TYPE {name}" in text for name in expected))
+    check("_total families are counters", all(line.endswith(" counter") for line in text.splitlines() if line.startswith("# TYPE") and line.split()[2].endswith("_total")))
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL METRICS TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,132 @@
+"""
+====================================================================
+ TEST: Pre-generation Service — Per-Session Background Slots
+====================================================================
+ Tests pregeneration_service.py in isolation (work is asyncio.sleep stubs).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_pregeneration.py
+
+ WHAT IT TESTS:
+   ✅ Finished slot is returned without redoing the work
+   ✅ In-flight slot is awaited, not restarted
+   ✅ Slots are single-use
+   ✅ Wrong key / expired slot is rejected
+   ✅ Failed pre-generation falls back to a miss
+   ✅ discard() cancels a session's in-flight work
+   ✅ Disabled service never schedules
+====================================================================
+"""
+
+import sys
+import os
+import time
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pregeneration_service import PregenerationService
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — PRE-GENERATION TEST SUITE")
+    print("="*65)
+
+    calls = []
+
+    def work(value, delay=0.05):
+        async def factory():
+            calls.append(value)
+            await asyncio.sleep(delay)
+            return value
+        return factory
+
+    pregen = PregenerationService(ttl_seconds=60, enabled=True)
+
+    # ── 1. Hit ────────────────────────────────────────────────────
+    print("\n[1] Finished Slot")
+    pregen.schedule(1, "opening_question", ("Technical", "Behavioral"), work("Q1"))
+    await asyncio.sleep(0.1)
+    hit, value = await pregen.take(1, "opening_question", ("Technical", "Behavioral"))
+    check("Pre-generated result returned", hit and value == "Q1", value)
+    check("Work ran once", calls == ["Q1"], calls)
+
+    hit, value = await pregen.take(1, "opening_question", ("Technical", "Behavioral"))
+    check("Slot is single-use", not hit)
+
+    # ── 2. In flight ─────────────────────────────────────────────
+    print("\n[2] In-Flight Slot")
+    pregen.schedule(1, "summary", ("Technical", 3), work("S1", delay=0.2))
+    pregen.schedule(1, "summary", ("Technical", 3), work("S1-dup", delay=0.2))
+    started = time.perf_counter()
+    hit, value = await pregen.take(1, "summary", ("Technical", 3))
+    elapsed = time.perf_counter() - started
+    check("In-flight work awaited", hit and value == "S1" and elapsed < 0.3, f"{elapsed:.2f}s")
+    check("Same key not scheduled twice", "S1-dup" not in calls, calls)
+
+    # ── 3. Invalid slots ─────────────────────────────────────────
+    print("\n[3] Stale Slots")
+    pregen.schedule(2, "summary", ("Technical", 3), work("S2"))
+    hit, _ = await pregen.take(2, "summary", ("Technical", 5))
+    check("Wrong key rejected", not hit)
+
+    short = PregenerationService(ttl_seconds=0.05, enabled=True)
+    short.schedule(2, "intel", ("Acme", None), work("I2", delay=0))
+    await asyncio.sleep(0.1)
+    hit, _ = await short.take(2, "intel", ("Acme", None))
+    check("Expired slot rejected", not hit)
+
+    async def broken():
+        raise RuntimeError("Gemini down")
+    pregen.schedule(3, "opening_question", "k", broken)
+    hit, _ = await pregen.take(3, "opening_question", "k")
+    check("Failed pre-generation is a miss", not hit)
+
+    # ── 4. Discard ───────────────────────────────────────────────
+    print("\n[4] Discard")
+    pregen.schedule(4, "opening_question", "k", work("Q4", delay=1.0))
+    await asyncio.sleep(0)
+    task = pregen._slots[(4, "opening_question")]["task"]
+    pregen.discard(4)
+    await asyncio.sleep(0)
+    check("In-flight work cancelled", task.cancelled())
+    check("Session slots removed", not any(s[0] == 4 for s in pregen._slots))
+
+    # ── 5. Disabled ──────────────────────────────────────────────
+    print("\n[5] Disabled")
+    off = PregenerationService(enabled=False)
+    off.schedule(5, "summary", "k", work("never"))
+    check("Nothing scheduled", "never" not in calls and off.stats()["slots"] == 0)
+
+    stats = pregen.stats()["by_kind"]
+    check("Stats tracked", stats["opening_question"]["hits"] == 1 and stats["summary"]["stale"] == 1, stats)
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL PRE-GENERATION TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
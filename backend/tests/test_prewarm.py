@@ -0,0 +1,152 @@
+"""
+====================================================================
+ TEST: Discovery Pre-Warming — Bulk CLI with Resumable Checkpoints
+====================================================================
+ Tests scripts/prewarm_discoveries.py with a stub IntelligenceService
+ and discovery store (no API key needed).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_prewarm.py
+
+ WHAT IT TESTS:
+   ✅ CSV / text / inline input, deduplicated by normalized name
+   ✅ Known companies are skipped without running a pipeline
+   ✅ Concurrency limit and rate budget are respected
+   ✅ Interrupted runs resume from the checkpoint; failures retried
+   ✅ Report counts tier outcomes and throughput
+====================================================================
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.prewarm_discoveries import load_companies, load_checkpoint, run_prewarm, RateBudget
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+class StubStore:
+    def __init__(self):
+        self.saved = {}
+
+    async def lookup(self, name):
+        tier = self.saved.get(name.lower())
+        return (tier, {"name": name}) if tier else (None, None)
+
+
+class StubService:
+    def __init__(self, store, delay=0.05):
+        self.store = store
+        self.delay = delay
+        self.runs = []
+        self.running = 0
+        self.peak = 0
+        self.broken = {"broken co"}
+
+    async def resolve_known_profile(self, name):
+        if name.lower() == "google":
+            return "curated", {"name": "Google"}
+        return await self.store.lookup(name)
+
+    async def get_intelligence(self, name, job_description=None):
+        self.runs.append((name, job_description))
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if name.lower() in self.broken:
+                return {"error": "no data"}
+            self.store.saved[name.lower()] = "quarantine" if name.startswith("Stealth") else "gold"
+            return {"name": name}
+        finally:
+            self.running -= 1
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — DISCOVERY PRE-WARM TEST SUITE")
+    print("="*65)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # ── 1. Input ─────────────────────────────────────────────────
+        print("\n[1] Input Parsing")
+        csv_path = os.path.join(tmp, "companies.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("Company_Name,Job_Description\nAcme,Backend role\nacme ,Duplicate\nGoogle,\n,No name\n")
+        rows = load_companies(csv_path, "Globex, ACME")
+        check("CSV + inline, deduplicated", [r["company_name"] for r in rows] == ["Acme", "Google", "Globex"], rows)
+        check("JD column read", rows[0]["job_description"] == "Backend role" and rows[1]["job_description"] is None)
+        txt_path = os.path.join(tmp, "companies.txt")
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write("# seed list\nInitech\n\nHooli\n")
+        check("Text file, comments skipped", [r["company_name"] for r in load_companies(txt_path)] == ["Initech", "Hooli"])
+
+        # ── 2. Run ───────────────────────────────────────────────────
+        print("\n[2] Bulk Run")
+        store = StubStore()
+        service = StubService(store)
+        checkpoint = os.path.join(tmp, "checkpoint.jsonl")
+        names = ["Google", "Broken Co", "Stealth One"] + [f"Startup {i}" for i in range(5)]
+        rows = [{"company_name": n, "job_description": None} for n in names]
+        report = await run_prewarm(rows, service, store, concurrency=2, rate_per_minute=0, checkpoint_path=checkpoint)
+        check("Known company skipped without a pipeline", "Google" not in [n for n, _ in service.runs])
+        check("Concurrency limit respected", service.peak == 2, service.peak)
+        check("Tier outcomes counted", report["outcomes"] == {"curated": 1, "failed": 1, "quarantine": 1, "gold": 5}, report["outcomes"])
+        check("Errors reported", report["errors"] == {"Broken Co": "no data"})
+        check("Throughput reported", report["processed"] == 8 and report["throughput_per_minute"] > 0)
+        check("Every company checkpointed", len(load_checkpoint(checkpoint)) == 8)
+
+        # ── 3. Resume ────────────────────────────────────────────────
+        print("\n[3] Resume")
+        service.runs.clear()
+        service.broken.clear()
+        more = rows + [{"company_name": "Late Co", "job_description": "JD"}]
+        report = await run_prewarm(more, service, store, concurrency=2, rate_per_minute=0, checkpoint_path=checkpoint)
+        check("Finished companies skipped on resume", report["skipped_from_checkpoint"] == 7, report["skipped_from_checkpoint"])
+        check("Failed company retried, new one run", sorted(n for n, _ in service.runs) == ["Broken Co", "Late Co"], service.runs)
+        service.runs.clear()
+        report = await run_prewarm(more, service, store, concurrency=2, rate_per_minute=0, checkpoint_path=checkpoint)
+        check("Fully warmed list does nothing", report["processed"] == 0 and service.runs == [])
+
+        dry = await run_prewarm([{"company_name": "Unknown Co"}] + rows[:1], service, store, checkpoint_path=checkpoint, dry_run=True)
+        check("Dry run only resolves tiers", dry["outcomes"] == {"needs_discovery": 1, "curated": 1} and service.runs == [])
+
+        # ── 4. Rate budget ───────────────────────────────────────────
+        print("\n[4] Rate Budget")
+        budget = RateBudget(per_minute=600)  # one start every 0.1s
+        started = time.perf_counter()
+        await asyncio.gather(*(budget.acquire() for _ in range(4)))
+        elapsed = time.perf_counter() - started
+        check("Starts spaced by the rate budget", 0.28 < elapsed < 0.6, f"{elapsed:.2f}s")
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL DISCOVERY PRE-WARM TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,200 @@
+"""
+====================================================================
+ TEST: Researcher — Concurrent Multi-Query Search
+====================================================================
+ Tests IntelligenceService.researcher_node through a DDGSProvider
+ whose DDGS client is a stub (no network, no API key needed).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_researcher.py
+
+ WHAT IT TESTS:
+   ✅ Recent, general and role queries run concurrently
+   ✅ Role query only when a role is found in the JD
+   ✅ Results deduplicated by URL and near-duplicate snippet
+   ✅ A hung query is dropped at the budget; the rest are kept
+   ✅ No results → synthetic fallback
+   ✅ The router's detected location reaches the general query (full graph)
+====================================================================
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.intelligence_service as intelligence_module
+import services.search_providers as search_module
+from services.search_providers import DDGSProvider
+from services.intelligence_service import IntelligenceService, _extract_role, _normalize_url, _merge_search_results
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+SHARED_POST = "Acme runs a recruiter screen, a take-home assignment and a final onsite loop with the team."
+
+RESPONSES = {
+    "RECENT": [
+        {"title": "Acme interview 2026", "href": "https://www.glassdoor.com/acme-2026/", "body": "Candidates in 2026 report a system design round at Acme."},
+        {"title": "Acme loop", "href": "https://blog.example.com/acme?utm_source=x", "body": SHARED_POST},
+    ],
+    "GENERAL": [
+        {"title": "Acme process", "href": "https://glassdoor.com/acme-2026", "body": "Duplicate URL with a different snippet."},
+        {"title": "Acme loop (repost)", "href": "https://mirror.example.org/acme", "body": SHARED_POST.replace("the team", "the team.")},
+        {"title": "Acme culture", "href": "https://acme.com/careers", "body": "Acme values ownership and writing things down."},
+    ],
+    "ROLE": [
+        {"title": "Acme backend engineer questions", "href": "https://leetcode.com/discuss/acme", "body": "Backend engineers at Acme get a concurrency coding question."},
+    ],
+}
+
+
+class StubDDGS:
+    calls = []
+    active = 0
+    peak = 0
+    delays = {}
+    lock = threading.Lock()
+
+    def __init__(self, timeout=10):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query, max_results=8):
+        label = "ROLE" if "engineer" in query.lower() else "GENERAL" if "process rounds" in query else "RECENT"
+        with StubDDGS.lock:
+            StubDDGS.calls.append(query)
+            StubDDGS.active += 1
+            StubDDGS.peak = max(StubDDGS.peak, StubDDGS.active)
+        try:
+            time.sleep(StubDDGS.delays.get(label, 0.2))
+            return RESPONSES.get(label, [])[:max_results]
+        finally:
+            with StubDDGS.lock:
+                StubDDGS.active -= 1
+
+
+def make_state(company, jd=None, query=None):
+    return {
+        "company_name": company, "industry": None, "job_description": jd, "research_data": None,
+        "is_synthetic": False, "confidence_score": 0, "generated_profile": None, "is_valid": False,
+        "iterations": 0, "sources": [], "search_query": query, "detected_location": None, "audited_data": None, "audit_log": [], "error": None
+    }
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — RESEARCHER TEST SUITE")
+    print("="*65)
+
+    original_ddgs = search_module.DDGS
+    original_provider = intelligence_module.get_search_provider
+    original_budget = intelligence_module.RESEARCH_BUDGET_SECONDS
+    search_module.DDGS = StubDDGS
+    provider = DDGSProvider(max_concurrency=4, cache=None)
+    intelligence_module.get_search_provider = lambda: provider
+    service = IntelligenceService.__new__(IntelligenceService)
+    try:
+        # ── 1. Helpers ───────────────────────────────────────────────
+        print("\n[1] Query Helpers")
+        check("Role from 'Position:' line", _extract_role("About us...\nPosition: Backend Engineer\nWe build") == "Backend Engineer")
+        check("Role from short first line", _extract_role("Senior Data Analyst\nYou will own dashboards.") == "Senior Data Analyst")
+        check("Role from JD body", _extract_role("We are hiring a staff software engineer to lead our platform work.").lower() == "staff software engineer")
+        check("No JD → no role", _extract_role(None) is None)
+        check("URL variants collapse", _normalize_url("https://www.a.com/x/?utm_source=y#top") == _normalize_url("http://a.com/x"))
+        merged = _merge_search_results([("A", [{"href": "https://a.com/1", "body": "one"}, {"href": "https://a.com/2", "body": "two"}]), ("B", [{"href": "https://b.com/1", "body": "three"}])])
+        check("Results interleaved across queries", [r["href"] for r in merged] == ["https://a.com/1", "https://b.com/1", "https://a.com/2"])
+
+        # ── 2. Concurrent fan-out ────────────────────────────────────
+        print("\n[2] Concurrent Fan-Out")
+        started = time.perf_counter()
+        state = await service.researcher_node(make_state("Acme", jd="Position: Backend Engineer\nBuild APIs.", query="Acme interview experience 2026"))
+        elapsed = time.perf_counter() - started
+        check("Three queries issued", len(StubDDGS.calls) == 3, StubDDGS.calls)
+        check("Queries ran concurrently", StubDDGS.peak == 3 and elapsed < 0.4, f"peak {StubDDGS.peak}, {elapsed:.2f}s")
+        urls = [s["url"] for s in state["sources"]]
+        check("Duplicate URL and reposted snippet dropped", len(urls) == 4 and "https://mirror.example.org/acme" not in urls, urls)
+        check("Every query contributed", {"[RECENT]", "[GENERAL]", "[ROLE]"} <= {line.split(" ")[0] for line in state["research_data"].splitlines()})
+        check("Role source labelled", any(s["title"].startswith("[ROLE] ") for s in state["sources"]))
+        check("Not synthetic", state["is_synthetic"] is False and state["confidence_score"] == 60, state["confidence_score"])
+
+        StubDDGS.calls.clear()
+        await service.researcher_node(make_state("Acme"))
+        check("No JD → no role query", len(StubDDGS.calls) == 2 and not any("engineer" in q for q in StubDDGS.calls), StubDDGS.calls)
+
+        # ── 3. Budget & fallback ─────────────────────────────────────
+        print("\n[3] Budget and Fallback")
+        intelligence_module.RESEARCH_BUDGET_SECONDS = 0.5
+        StubDDGS.delays = {"GENERAL": 2.0}
+        started = time.perf_counter()
+        state = await service.researcher_node(make_state("Acme", jd="Position: Backend Engineer"))
+        elapsed = time.perf_counter() - started
+        check("Hung query dropped at the budget", elapsed < 1.0, f"{elapsed:.2f}s")
+        check("Other queries kept", len(state["sources"]) == 3 and not state["is_synthetic"], len(state["sources"]))
+
+        StubDDGS.delays = {}
+        saved = dict(RESPONSES)
+        RESPONSES.clear()
+        state = await service.researcher_node(make_state("Nobody Knows Co"))
+        RESPONSES.update(saved)
+        check("Synthetic fallback without results", state["is_synthetic"] and state["sources"] == [] and state["confidence_score"] == 20)
+
+        # ── 4. Router → researcher (compiled graph) ──────────────────
+        print("\n[4] Router to Researcher")
+        async def fake_generate_json(prompt, call_type="generate_json", **kwargs):
+            return {"is_ambiguous": True, "suggested_query": "AZ interview questions 2026", "detected_industry": "Retail",
+                    "detected_location": "Pune", "reasoning": "stub"}
+        async def passthrough(state):
+            return state
+        async def approve(state):
+            state["is_valid"] = True
+            return state
+        intelligence_module.gemini_service.generate_json = fake_generate_json
+        graph_service = IntelligenceService.__new__(IntelligenceService)
+        graph_service.auditor_node = graph_service.architect_node = passthrough
+        graph_service.critic_node = approve
+        StubDDGS.calls.clear()
+        final_state = await graph_service.create_workflow().ainvoke(make_state("AZ"))
+        general = [q for q in StubDDGS.calls if "process rounds" in q]
+        check("Location survives the router → researcher edge", final_state.get("detected_location") == "Pune")
+        check("General query is location-aware", general == ["AZ Pune interview process rounds"], StubDDGS.calls)
+    finally:
+        intelligence_module.gemini_service.__dict__.pop("generate_json", None)
+        search_module.DDGS = original_ddgs
+        intelligence_module.get_search_provider = original_provider
+        intelligence_module.RESEARCH_BUDGET_SECONDS = original_budget
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL RESEARCHER TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,167 @@
+"""
+====================================================================
+ TEST: Search Providers — Pooled DDGS, TTL Cache, Offline Stub
+====================================================================
+ Tests search_providers.py with a stub DDGS client and a temporary
+ cache file (no network, no API key needed).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_search_providers.py
+
+ WHAT IT TESTS:
+   ✅ DDGS clients are pooled and reused across searches
+   ✅ In-flight searches are capped
+   ✅ Results are cached on disk by query and expire after the TTL
+   ✅ Empty results and errors are not cached; broken clients dropped
+   ✅ Stub provider serves fixtures and synthesized results offline
+====================================================================
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.search_providers as search_module
+from services.search_providers import DDGSProvider, StubSearchProvider, create_search_provider, CACHE_CALL_TYPE
+from services.llm_cache import LLMCache
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+class StubDDGS:
+    created = 0
+    calls = []
+    active = 0
+    peak = 0
+    fail_next = False
+    lock = threading.Lock()
+
+    def __init__(self, timeout=10):
+        with StubDDGS.lock:
+            StubDDGS.created += 1
+
+    def text(self, query, max_results=8):
+        with StubDDGS.lock:
+            StubDDGS.calls.append(query)
+            StubDDGS.active += 1
+            StubDDGS.peak = max(StubDDGS.peak, StubDDGS.active)
+            fail, StubDDGS.fail_next = StubDDGS.fail_next, False
+        try:
+            time.sleep(0.05)
+            if fail:
+                raise RuntimeError("202 Ratelimit")
+            if "nothing" in query:
+                return []
+            return [{"title": query, "href": f"https://example.com/{len(StubDDGS.calls)}", "body": "snippet"}][:max_results]
+        finally:
+            with StubDDGS.lock:
+                StubDDGS.active -= 1
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — SEARCH PROVIDERS TEST SUITE")
+    print("="*65)
+
+    original_ddgs = search_module.DDGS
+    search_module.DDGS = StubDDGS
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            cache_path = os.path.join(data_dir, "search_cache.sqlite3")
+            provider = DDGSProvider(max_concurrency=2, cache=LLMCache(db_path=cache_path, ttls={CACHE_CALL_TYPE: 60}))
+
+            # ── 1. Pool & concurrency ────────────────────────────────
+            print("\n[1] Pooled Clients")
+            for i in range(4):
+                await provider.search(f"sequential {i}")
+            check("Sequential searches reuse one client", StubDDGS.created == 1, StubDDGS.created)
+            await asyncio.gather(*(provider.search(f"parallel {i}") for i in range(6)))
+            check("In-flight searches capped", StubDDGS.peak == 2, StubDDGS.peak)
+            check("Pool never exceeds the cap", StubDDGS.created == 2, StubDDGS.created)
+
+            # ── 2. Cache ─────────────────────────────────────────────
+            print("\n[2] TTL Cache")
+            calls = len(StubDDGS.calls)
+            first = await provider.search("Acme interview process")
+            second = await provider.search("  acme   INTERVIEW process ")
+            check("Repeat query served from cache", first == second and len(StubDDGS.calls) == calls + 1)
+            check("Cache hit counted", provider.stats()["cache_hits"] == 1)
+            other = DDGSProvider(cache=LLMCache(db_path=cache_path, ttls={CACHE_CALL_TYPE: 60}))
+            check("Cache survives restart (on disk)", await other.search("Acme interview process") == first and len(StubDDGS.calls) == calls + 1)
+            await provider.search("Acme interview process", max_results=3)
+            check("max_results is part of the key", len(StubDDGS.calls) == calls + 2)
+
+            expiring = DDGSProvider(cache=LLMCache(db_path=os.path.join(data_dir, "short.sqlite3"), ttls={CACHE_CALL_TYPE: 0.1}))
+            await expiring.search("short lived")
+            await asyncio.sleep(0.15)
+            calls = len(StubDDGS.calls)
+            await expiring.search("short lived")
+            check("Entry expires after the TTL", len(StubDDGS.calls) == calls + 1)
+
+            # ── 3. Failures ──────────────────────────────────────────
+            print("\n[3] Failures")
+            calls = len(StubDDGS.calls)
+            await provider.search("nothing here")
+            await provider.search("nothing here")
+            check("Empty results not cached", len(StubDDGS.calls) == calls + 2)
+            created = StubDDGS.created
+            pooled = provider._pool.qsize()
+            StubDDGS.fail_next = True
+            results = await provider.search("rate limited query")
+            check("Error → empty results", results == [] and provider.stats()["errors"] == 1)
+            check("Broken client dropped from the pool", provider._pool.qsize() == pooled - 1 and StubDDGS.created == created)
+            check("Next search still works", len(await provider.search("after error")) == 1)
+            check("Limiter released", provider.stats()["in_flight"] == 0)
+    finally:
+        search_module.DDGS = original_ddgs
+
+    # ── 4. Stub provider ─────────────────────────────────────────────
+    print("\n[4] Stub Provider")
+    fixtures_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "search_fixtures.json")
+    stub = StubSearchProvider(fixtures_path=fixtures_path, latency="fixed:0.1", max_concurrency=2)
+    results = await stub.search("Acme Stealth interview questions 2026", 2)
+    check("Fixture matched by substring", len(results) == 2 and "glassdoor" in results[0]["href"])
+    results = await stub.search("Unheard Of Co interview process", 8)
+    check("Synthesized results for unknown queries", len(results) == 3 and results == await stub.search("Unheard Of Co interview process", 8))
+    started = time.perf_counter()
+    await asyncio.gather(*(stub.search(f"q{i}") for i in range(4)))
+    elapsed = time.perf_counter() - started
+    check("Stub latency and concurrency cap apply", 0.18 < elapsed < 0.35, f"{elapsed:.2f}s")
+
+    os.environ["SEARCH_PROVIDER"] = "stub"
+    try:
+        check("SEARCH_PROVIDER=stub selects the stub", isinstance(create_search_provider(), StubSearchProvider))
+    finally:
+        del os.environ["SEARCH_PROVIDER"]
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL SEARCH PROVIDER TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
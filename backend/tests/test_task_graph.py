@@ -0,0 +1,146 @@
+"""
+====================================================================
+ TEST: Task Graph — Async DAG Executor
+====================================================================
+ Tests task_graph.py in isolation (nodes are asyncio.sleep stubs).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_task_graph.py
+
+ WHAT IT TESTS:
+   ✅ Independent nodes run concurrently
+   ✅ Dependencies see their parents' results
+   ✅ Speculative node is kept when the decider says yes
+   ✅ Speculative node is cancelled/discarded when the decider says no
+   ✅ Failure of a discarded speculation is ignored
+   ✅ Real failures propagate and cancel the rest of the graph
+   ✅ Unknown dependencies are rejected
+====================================================================
+"""
+
+import sys
+import os
+import time
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.task_graph import TaskGraph
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+def sleeper(value, delay=0.1, log=None):
+    async def fn(results):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append("cancelled")
+            raise
+        return value(results) if callable(value) else value
+    return fn
+
+
+def build(score, spec_delay=0.1, log=None):
+    graph = TaskGraph("test")
+    graph.add("intel", sleeper("intel"))
+    graph.add("evaluation", sleeper({"score": score}), deps=["intel"])
+    graph.add("next_question", sleeper("Q1", delay=spec_delay, log=log), keep_if=("evaluation", lambda e: e["score"] >= 6))
+    graph.add("learning", sleeper(lambda r: f"learned {r['evaluation']['score']}"), deps=["evaluation"])
+    return graph
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — TASK GRAPH TEST SUITE")
+    print("="*65)
+
+    # ── 1. Critical path ──────────────────────────────────────────
+    print("\n[1] Wall Clock = Longest Chain")
+    started = time.perf_counter()
+    results = await build(8).run()
+    elapsed = time.perf_counter() - started
+    check("Runs in ~3 steps, not 4", elapsed < 0.35, f"{elapsed:.2f}s")
+    check("Dependent node saw parent result", results.get("learning") == "learned 8", results.get("learning"))
+
+    # ── 2. Speculation kept ──────────────────────────────────────
+    print("\n[2] Speculative Node Kept")
+    check("Next question kept on pass", results.get("next_question") == "Q1", results)
+
+    # ── 3. Speculation discarded ─────────────────────────────────
+    print("\n[3] Speculative Node Discarded")
+    log = []
+    graph = build(3, spec_delay=1.0, log=log)
+    started = time.perf_counter()
+    results = await graph.run()
+    elapsed = time.perf_counter() - started
+    check("Next question dropped on fail", "next_question" not in results, list(results))
+    check("Slow speculation cancelled early", log == ["cancelled"] and elapsed < 0.5, f"{elapsed:.2f}s {log}")
+
+    async def broken(results):
+        raise RuntimeError("Gemini down")
+
+    graph = TaskGraph("test")
+    graph.add("evaluation", sleeper({"score": 2}))
+    graph.add("next_question", broken, keep_if=("evaluation", lambda e: e["score"] >= 6))
+    results = await graph.run()
+    check("Failed speculation ignored when discarded", results == {"evaluation": {"score": 2}}, results)
+
+    # ── 4. Failure propagation ───────────────────────────────────
+    print("\n[4] Failure Propagation")
+    log = []
+    graph = TaskGraph("test")
+    graph.add("evaluation", broken)
+    graph.add("slow", sleeper("x", delay=1.0, log=log))
+    try:
+        await graph.run()
+        check("Error re-raised", False)
+    except RuntimeError as e:
+        check("Error re-raised", str(e) == "Gemini down")
+    check("Sibling nodes cancelled", log == ["cancelled"], log)
+
+    graph = TaskGraph("test")
+    graph.add("evaluation", sleeper({"score": 9}))
+    graph.add("next_question", broken, keep_if=("evaluation", lambda e: e["score"] >= 6))
+    try:
+        await graph.run()
+        check("Kept speculation failure re-raised", False)
+    except RuntimeError:
+        check("Kept speculation failure re-raised", True)
+
+    # ── 5. Validation ────────────────────────────────────────────
+    print("\n[5] Graph Validation")
+    graph = TaskGraph("test")
+    try:
+        graph.add("evaluation", broken, deps=["intel"])
+        check("Unknown dependency rejected", False)
+    except ValueError:
+        check("Unknown dependency rejected", True)
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL TASK GRAPH TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
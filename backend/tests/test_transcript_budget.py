@@ -0,0 +1,117 @@
+"""
+====================================================================
+ TEST: Transcript Budget — Rolling Transcript Compaction
+====================================================================
+ Tests transcript_budget.py in isolation (summarizer is stubbed).
+
+ HOW TO RUN:
+   cd backend
+   .\\venv\\Scripts\\python tests\\test_transcript_budget.py
+
+ WHAT IT TESTS:
+   ✅ Short transcripts are sent verbatim
+   ✅ Verbatim window is capped and starts on an interviewer turn
+   ✅ Only NEW turns are folded into the summary (incremental)
+   ✅ Token budget folds extra pairs when answers are long
+   ✅ Estimated prompt size stays flat as the round grows
+   ✅ Summarizer failure falls back to an extractive summary
+====================================================================
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.transcript_budget import TranscriptBudget, estimate_tokens
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  ✅ {name}", f"→ {detail}" if detail else "")
+    else:
+        failed += 1
+        print(f"  ❌ {name}", f"→ {detail}" if detail else "")
+
+
+def make_transcript(pairs, answer_len=80):
+    transcript = []
+    for i in range(pairs):
+        transcript.append({"role": "assistant", "content": f"Question {i}?"})
+        transcript.append({"role": "user", "content": f"Answer {i} " + "x" * answer_len})
+    return transcript
+
+
+async def run_all():
+    print("\n" + "="*65)
+    print(" INTERVIEW AI — TRANSCRIPT BUDGET TEST SUITE")
+    print("="*65)
+
+    folded_batches = []
+
+    async def fake_summarize(previous, turn_lines):
+        folded_batches.append(len(turn_lines))
+        return (previous + " | " if previous else "") + f"{len(turn_lines)} turns"
+
+    budget = TranscriptBudget(keep_turns=4, token_budget=10_000)
+
+    # ── 1. Short transcript ───────────────────────────────────────
+    print("\n[1] Short Transcript Stays Verbatim")
+    state, recent = await budget.compact(make_transcript(2), None, fake_summarize)
+    check("No folding needed", state["turns_folded"] == 0 and len(recent) == 4, state)
+    check("Summarizer not called", folded_batches == [])
+
+    # ── 2. Window + incremental folding ──────────────────────────
+    print("\n[2] Incremental Folding")
+    state, recent = await budget.compact(make_transcript(4), state, fake_summarize)
+    check("Window capped at keep_turns", len(recent) == 4, len(recent))
+    check("Window starts on interviewer turn", recent[0]["role"] == "assistant")
+    check("Older turns folded", state["turns_folded"] == 4 and folded_batches == [4], state)
+
+    state, recent = await budget.compact(make_transcript(5), state, fake_summarize)
+    check("Only new turns folded", folded_batches == [4, 2], folded_batches)
+    check("Summary extended, not rebuilt", state["text"] == "4 turns | 2 turns", state["text"])
+
+    # ── 3. Token budget ──────────────────────────────────────────
+    print("\n[3] Token Budget")
+    tight = TranscriptBudget(keep_turns=6, token_budget=300)
+    state, recent = await tight.compact(make_transcript(3, answer_len=1000), None, fake_summarize)
+    check("Long answers trigger extra folding", len(recent) == 2, len(recent))
+
+    # ── 4. Flat prompt size ──────────────────────────────────────
+    print("\n[4] Prompt Size Stays Flat")
+    sizes = []
+    state = None
+    for pairs in range(2, 11):
+        transcript = make_transcript(pairs)
+        state, recent = await budget.compact(transcript, state, fake_summarize)
+        sizes.append(sum(estimate_tokens(t["content"]) for t in recent) + estimate_tokens(state["text"]))
+    check("Verbatim size bounded over 10 turns", max(sizes) - min(sizes[2:]) < 60, sizes)
+
+    # ── 5. Fallback ──────────────────────────────────────────────
+    print("\n[5] Summarizer Failure")
+    async def broken(previous, turn_lines):
+        raise RuntimeError("Gemini down")
+    state, recent = await budget.compact(make_transcript(4), None, broken)
+    check("Extractive summary used", "Interviewer: Question 0?" in state["text"], state["text"][:60])
+
+    # ── Summary ────────────────────────────────────────────────────
+    total = passed + failed
+    print("\n" + "="*65)
+    print(f" RESULTS: {passed}/{total} passed | {failed} failed")
+    if failed == 0:
+        print(" 🎉 ALL TRANSCRIPT BUDGET TESTS PASSED!")
+    else:
+        print(" ⚠️  Some tests failed.")
+    print("="*65 + "\n")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
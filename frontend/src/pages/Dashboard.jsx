@@ -225,6 +225,26 @@ function Dashboard() {
     }, [messages, step]);
 
 
+    const pollDiscoveryJob = async (jobId, company) => {
+        for (let attempt = 0; attempt < 40; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, 3000));
+            try {
+                const res = await axios.get(`${API_BASE}/discovery/jobs/${jobId}`, {
+                    params: { company },
+                    headers: { 'Authorization': `Bearer ${token}` }
+                });
+                if (res.data.status === 'done') {
+                    setCompanyIntel(res.data.result);
+                    return;
+                }
+                if (res.data.status === 'failed') return;
+            } catch (err) {
+                // A 404 can come from a server worker that has not seen the job yet; keep polling
+                if (err.response && err.response.status !== 404 && err.response.status < 500) return;
+            }
+        }
+    };
+
     const startInterview = async () => {
         if (!resumeFile) {
             alert("Please upload your resume (PDF) to start a contextual AI interview. This helps our AI tailor questions specifically to your background!");
@@ -271,6 +291,10 @@ function Dashboard() {
             if (res.data.company_intelligence) {
                 setCompanyIntel(res.data.company_intelligence);
             }
+            // Unknown company: discovery runs as a background job, pick up its intel when it lands
+            if (res.data.discovery_job_id) {
+                pollDiscoveryJob(res.data.discovery_job_id, sessionData.target_company);
+            }
 
             clearInterval(interval);
             setPreparingStep(4);